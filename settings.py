@@ -81,6 +81,19 @@ LOCAL_DATA_DEBUG_FILE = os.path.join(LOCAL_DATA_DEBUG_DIR, "debug.json")
 LOCAL_DATA_DEPENDENCIES_DIR = os.path.join(LOCAL_DATA_DIR, "dependencies")
 # Directory to place any screenshots in.
 LOCAL_DATA_SCREENSHOTS_DIR = os.path.join(LOCAL_DATA_DIR, "screenshots")
+# Directory to place any generated cache files in (template atlas).
+LOCAL_DATA_CACHE_DIR = os.path.join(LOCAL_DATA_DIR, "cache")
+# Files that contain our packed template atlas, and the index used to read templates from the atlas.
+LOCAL_DATA_ATLAS_FILE = os.path.join(LOCAL_DATA_CACHE_DIR, "templates.atlas")
+LOCAL_DATA_ATLAS_INDEX_FILE = os.path.join(LOCAL_DATA_CACHE_DIR, "templates.json")
+# File containing the search regions learned from the locations templates have been found in.
+LOCAL_DATA_REGIONS_FILE = os.path.join(LOCAL_DATA_CACHE_DIR, "regions.json")
+# File containing the hit statistics used to order lists of images being searched for.
+LOCAL_DATA_ORDERING_FILE = os.path.join(LOCAL_DATA_CACHE_DIR, "ordering.json")
+# Directory containing the search telemetry recorded during each session.
+LOCAL_DATA_TELEMETRY_DIR = os.path.join(LOCAL_DATA_CACHE_DIR, "telemetry")
+# Directory containing the panel content index learned for each bot instance.
+LOCAL_DATA_PANELS_DIR = os.path.join(LOCAL_DATA_CACHE_DIR, "panels")
 # Directory that should be created dynamically when tesseract is extracted.
 LOCAL_DATA_TESSERACT_DEPENDENCY_DIR = os.path.join(LOCAL_DATA_DEPENDENCIES_DIR, "tesseract")
 # Directory that should be created dynamically when redis is extracted.
@@ -134,7 +147,7 @@ def user_directory():
     for path in [
         LOCAL_DATA_DIR, LOCAL_DATA_DB_DIR, LOCAL_DATA_DB_BACKUP_DIR, LOCAL_DATA_UPDATE_DIR,
         LOCAL_DATA_BACKUP_DIR, LOCAL_DATA_LOG_DIR, LOCAL_DATA_DEBUG_DIR, LOCAL_DATA_DEPENDENCIES_DIR,
-        LOCAL_DATA_SCREENSHOTS_DIR
+        LOCAL_DATA_SCREENSHOTS_DIR, LOCAL_DATA_CACHE_DIR, LOCAL_DATA_TELEMETRY_DIR, LOCAL_DATA_PANELS_DIR
     ]:
         # Create the specified local data directory if it does not currently exist.
         if not os.path.exists(path):
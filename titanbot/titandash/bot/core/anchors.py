@@ -0,0 +1,118 @@
+from .constants import ANCHOR_TOLERANCE, ANCHOR_MATCH_THRESHOLD, ANCHOR_MISS_THRESHOLD
+from .frame import as_frame
+from .maps import ANCHORS
+from .templates import registry
+
+from numpy.lib.stride_tricks import as_strided
+
+import numpy as np
+
+
+def _normalize(array, axis=None):
+    """
+    Normalize the specified array (or windows of an array along an axis) to a zero mean and unit variance.
+    """
+    array = array.astype(np.float32)
+    mean = array.mean(axis=axis, keepdims=True)
+    std = array.std(axis=axis, keepdims=True) + 1e-3
+
+    return (array - mean) / std
+
+
+class Anchor(object):
+    """
+    Anchor represents a template that only ever appears at one (or a few) known positions in game.
+
+    A fingerprint of the template (its normalized grayscale pixels) is computed once, anchored templates are
+    then verified by comparing the fingerprint against the same area of a frame at each known position,
+    through the mean absolute difference of both. Normalizing both allows for brightness changes (overlays)
+    of the area while still being a fraction of the cost of a template search.
+    """
+    __slots__ = ("image", "positions", "fingerprint", "width", "height")
+
+    def __init__(self, image, positions):
+        template = registry.get(image)
+
+        self.image = image
+        self.positions = positions
+        self.fingerprint = _normalize(template.gray)
+        self.width = template.width
+        self.height = template.height
+
+    def difference(self, gray, position, tolerance=ANCHOR_TOLERANCE):
+        """
+        Determine the smallest fingerprint difference found within the specified tolerance of the specified position.
+
+        Returns the difference and the position the difference was found at.
+        """
+        x1, y1 = max(0, position[0] - tolerance), max(0, position[1] - tolerance)
+        area = gray[y1:position[1] + self.height + tolerance, x1:position[0] + self.width + tolerance]
+
+        rows, cols = area.shape[0] - self.height + 1, area.shape[1] - self.width + 1
+        if rows < 1 or cols < 1:
+            return float("inf"), position
+
+        # Every window of our area (one per offset within the tolerance) is
+        # compared against the fingerprint in a single vectorized operation.
+        windows = as_strided(
+            area, shape=(rows, cols, self.height, self.width),
+            strides=area.strides + area.strides,
+            writeable=False
+        )
+        differences = np.abs(_normalize(windows, axis=(2, 3)) - self.fingerprint).mean(axis=(2, 3))
+        row, col = np.unravel_index(np.argmin(differences), differences.shape)
+
+        return float(differences[row, col]), (x1 + int(col), y1 + int(row))
+
+    def check(self, frame):
+        """
+        Check the specified frame for this anchor.
+
+        Returns a tuple containing the result and position, the result is True if the anchor is conclusively
+        found, False if it is conclusively not found, and None if the check is inconclusive.
+        """
+        gray = as_frame(frame).gray
+        best = min(self.difference(gray=gray, position=position) for position in self.positions)
+
+        if best[0] <= ANCHOR_MATCH_THRESHOLD:
+            return True, best[1]
+        if best[0] >= ANCHOR_MISS_THRESHOLD:
+            return False, (-1, -1)
+
+        return None, (-1, -1)
+
+
+class Anchors(object):
+    """
+    Collection of every anchored template, anchors are created when first checked.
+
+    Anchor positions are relative to a capture of the game screen (480x800), frames of any other size
+    (full window captures, regions) are always inconclusive.
+    """
+    def __init__(self, anchors=ANCHORS, size=(480, 800)):
+        self._positions = anchors
+        self._anchors = {}
+        self.size = size
+
+    def __contains__(self, image):
+        return isinstance(image, str) and image in self._positions
+
+    def get(self, image):
+        if image not in self._anchors:
+            self._anchors[image] = Anchor(image=image, positions=self._positions[image])
+
+        return self._anchors[image]
+
+    def check(self, frame, image):
+        """
+        Check the specified frame for the specified image, images that are not anchored are always inconclusive.
+        """
+        frame = as_frame(frame)
+        if image not in self or frame.size != self.size:
+            return None, (-1, -1)
+
+        return self.get(image).check(frame=frame)
+
+
+# Module level anchors, shared by every bot instance running in this process.
+anchors = Anchors()
@@ -0,0 +1,209 @@
+from settings import LOCAL_DATA_ATLAS_FILE, LOCAL_DATA_ATLAS_INDEX_FILE
+
+import numpy as np
+import cv2
+import os
+import json
+import uuid
+import hashlib
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Version of the atlas format, incremented whenever the layout of the atlas
+# or index changes so that older atlas files are rebuilt automatically.
+ATLAS_VERSION = 2
+
+
+class AtlasError(Exception):
+    pass
+
+
+def template_sources(images, artifacts=None):
+    """
+    Flatten the specified images dictionary (group -> name -> path) and optional artifacts
+    dictionary (name -> path) into a single dictionary of path -> name.
+    """
+    mappings = [d for d in images.values() if isinstance(d, dict)]
+    if artifacts:
+        mappings.append(artifacts)
+
+    sources = {}
+    for mapping in mappings:
+        for name, path in mapping.items():
+            sources.setdefault(path, name)
+
+    return sources
+
+
+def file_hash(path):
+    """
+    Generate the md5 hash of the file present at the specified path.
+    """
+    with open(path, "rb") as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+class TemplateAtlas(object):
+    """
+    TemplateAtlas represents every template image packed into a single binary file, containing the contiguous
+    grayscale pixel data of each template, along with a json index (path -> offset, dimensions, hash).
+
+    The atlas is opened read-only through a memory map, every bot instance (or worker process) running on
+    the same machine then shares a single copy of the templates through the page cache.
+
+    Every build writes its pixel data to a new file named after the build (ie: "templates.atlas.<build>"), the index
+    names the data file of its build. Data files are never replaced, so a data file that is memory mapped by another
+    process is never written over, and the index and data it names always belong to the same build.
+    """
+    def __init__(self, data, index, path=None):
+        self.data = data
+        self.index = index
+        self.path = path
+
+    def __len__(self):
+        return len(self.index["templates"])
+
+    def __contains__(self, path):
+        return path in self.index["templates"]
+
+    def get(self, path):
+        """
+        Retrieve the grayscale array of the template with the specified path. The array returned
+        is a read-only view into the memory mapped atlas.
+        """
+        entry = self.index["templates"][path]
+        return np.asarray(self.data[entry["offset"]:entry["offset"] + entry["width"] * entry["height"]]).reshape(entry["height"], entry["width"])
+
+    def current(self, sources):
+        """
+        Determine whether or not this atlas is current for the specified sources (path -> name). An atlas is no
+        longer current when templates were added or removed, or the hash of any source image has changed.
+        """
+        if self.index.get("version") != ATLAS_VERSION:
+            return False
+        if set(sources) != set(self.index["templates"]):
+            return False
+
+        return all(file_hash(path) == entry["hash"] for path, entry in self.index["templates"].items())
+
+    @staticmethod
+    def data_path(path, index):
+        """
+        Determine the path of the data file of the build the specified index belongs to, data files are present
+        alongside the specified atlas path.
+        """
+        return os.path.join(os.path.dirname(path), index["data"])
+
+    @classmethod
+    def open(cls, path=LOCAL_DATA_ATLAS_FILE, index_path=LOCAL_DATA_ATLAS_INDEX_FILE):
+        """
+        Open the atlas present at the specified path (read-only).
+        """
+        try:
+            with open(index_path, "r") as f:
+                index = json.load(f)
+            data_path = cls.data_path(path=path, index=index)
+            data = np.memmap(data_path, dtype=np.uint8, mode="r") if index["size"] else np.zeros(0, dtype=np.uint8)
+        except (OSError, ValueError, KeyError) as exc:
+            raise AtlasError("atlas: {path} could not be opened: {exc}".format(path=path, exc=exc))
+
+        if data.size != index["size"]:
+            raise AtlasError("atlas: {path} is incomplete ({size}/{expected} bytes).".format(path=data_path, size=data.size, expected=index["size"]))
+
+        return cls(data=data, index=index, path=data_path)
+
+    @staticmethod
+    def _remove(path):
+        """
+        Remove the specified file, a file that can not be removed (ie: memory mapped by another process on windows)
+        is left in place.
+        """
+        try:
+            os.remove(path)
+        except OSError as exc:
+            logger.debug("atlas file: {path} could not be removed: {exc}".format(path=path, exc=exc))
+
+    @classmethod
+    def build(cls, sources, path=LOCAL_DATA_ATLAS_FILE, index_path=LOCAL_DATA_ATLAS_INDEX_FILE):
+        """
+        Build a new atlas from the specified sources (path -> name), writing the atlas and index to the specified
+        paths.
+
+        Each build writes a new data file named after the build, then swaps the index into place last, so other
+        processes (or concurrent builds) never open a partially written atlas, or an index paired with the data of
+        another build. Files are written to unique temporary files in the same directory first. The data file of the
+        previous build is removed once it is no longer referenced.
+        """
+        directory = os.path.dirname(path) or "."
+        build = uuid.uuid4().hex
+
+        index = {"version": ATLAS_VERSION, "build": build, "data": "{name}.{build}".format(name=os.path.basename(path), build=build), "size": 0, "templates": {}}
+        data_path = cls.data_path(path=path, index=index)
+
+        try:
+            with open(index_path, "r") as f:
+                previous = cls.data_path(path=path, index=json.load(f))
+        except (OSError, ValueError, KeyError):
+            # Atlases built before data files were named after their build used the atlas path itself.
+            previous = path
+
+        descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                for source, name in sorted(sources.items()):
+                    gray = cv2.imread(source, 0)
+                    if gray is None:
+                        raise AtlasError("template image: {path} could not be read.".format(path=source))
+
+                    index["templates"][source] = {
+                        "name": name,
+                        "hash": file_hash(source),
+                        "offset": index["size"],
+                        "width": gray.shape[1],
+                        "height": gray.shape[0]
+                    }
+                    f.write(np.ascontiguousarray(gray).tobytes())
+                    index["size"] += gray.size
+        except Exception:
+            cls._remove(path=temporary)
+            raise
+
+        # The data file is named after this build, so it never replaces a file that is in use.
+        os.replace(temporary, data_path)
+
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(index_path) or ".", prefix=os.path.basename(index_path) + ".", suffix=".tmp")
+        with os.fdopen(descriptor, "w") as f:
+            json.dump(index, f)
+
+        # The index is swapped into place last, pairing it with our data file at once. If the index can not be
+        # replaced (ie: opened by another process on windows), our build is used directly by this process only.
+        try:
+            os.replace(temporary, index_path)
+        except OSError as exc:
+            logger.warning("template atlas index: {path} could not be replaced, using build {build} directly: {exc}".format(path=index_path, build=build, exc=exc))
+            cls._remove(path=temporary)
+        else:
+            if previous != data_path and os.path.exists(previous):
+                cls._remove(path=previous)
+
+        logger.info("template atlas built with {count} template(s) ({size} bytes).".format(count=len(index["templates"]), size=index["size"]))
+
+        data = np.memmap(data_path, dtype=np.uint8, mode="r") if index["size"] else np.zeros(0, dtype=np.uint8)
+        return cls(data=data, index=index, path=data_path)
+
+    @classmethod
+    def ensure(cls, sources, path=LOCAL_DATA_ATLAS_FILE, index_path=LOCAL_DATA_ATLAS_INDEX_FILE):
+        """
+        Open the atlas present at the specified path, rebuilding the atlas first if it does not exist
+        or is no longer current for the specified sources.
+        """
+        try:
+            atlas = cls.open(path=path, index_path=index_path)
+            if atlas.current(sources=sources):
+                return atlas
+        except AtlasError:
+            pass
+
+        return cls.build(sources=sources, path=path, index_path=index_path)
@@ -1,5 +1,5 @@
 from settings import (
-    STAGE_CAP, BOT_VERSION, GIT_COMMIT, LOCAL_DATA_SCREENSHOTS_DIR
+    STAGE_CAP, BOT_VERSION, GIT_COMMIT, LOCAL_DATA_SCREENSHOTS_DIR, LOCAL_DATA_TELEMETRY_DIR, LOCAL_DATA_PANELS_DIR
 )
 
 from django.utils import timezone
@@ -16,6 +16,18 @@ from titanauth.authentication.wrapper import AuthWrapper
 from .maps import *
 from .props import Props
 from .grabber import Grabber
+from .templates import registry
+from .regions import LearnedRegions
+from .ordering import CandidateOrdering
+from .changes import SearchCache
+from .screens import ScreenClassifier
+from .capture import CaptureThread
+from .scrolling import ScrollTracker
+from .tapping import TapDetector
+from .workers import vision_pool
+from .engines import engines
+from .panels import PanelIndex, ARTIFACTS_PANEL, PERKS_PANEL, STATS_PANEL, PANEL_END
+from .telemetry import SearchTelemetry
 from .stats import Stats
 from .wrap import DynamicAttrs
 from .decorators import BotProperty as bot_property
@@ -33,6 +45,7 @@ from apscheduler.schedulers.base import STATE_PAUSED, STATE_RUNNING, STATE_STOPP
 from apscheduler.schedulers.background import BackgroundScheduler
 
 import datetime
+import os
 import random
 import uuid
 
@@ -121,20 +134,42 @@ class Bot(object):
             attrs=GAME_COLORS,
             logger=self.logger
         )
+        # Decode every template image once, searches performed by
+        # any bot instance will read templates from memory.
+        registry.load(
+            images=IMAGES,
+            artifacts=ARTIFACT_MAP
+        )
         self.props = Props(
             instance=self.instance
         )
         self.grabber = Grabber(
             window=self.window,
-            logger=self.logger
+            logger=self.logger,
+            regions=LearnedRegions(
+                width=self.window.EMULATOR_WIDTH,
+                height=self.window.EMULATOR_HEIGHT
+            ),
+            ordering=CandidateOrdering(),
+            cache=SearchCache(),
+            capture=CaptureThread(window=self.window) if globals.capture_thread() else None,
+            pool=vision_pool if globals.vision_pool() and vision_pool.available else None,
+            telemetry=SearchTelemetry()
         )
+        if globals.vision_pool() and not vision_pool.available:
+            self.logger.warning("vision pool is enabled but unavailable (python 3.8+ is required), matching will take place in process.")
+
+        self.classifier = ScreenClassifier(telemetry=self.grabber.telemetry)
+        self.tap_detector = TapDetector()
+        self.panel_index = PanelIndex(path=os.path.join(LOCAL_DATA_PANELS_DIR, "{instance}.json".format(instance=self.instance.pk)))
         self.stats = Stats(
             instance=self.instance,
             images=self.images,
             window=self.window,
             grabber=self.grabber,
             configuration=configuration,
-            logger=self.logger.logger
+            logger=self.logger.logger,
+            panels=self.panel_index
         )
 
         self.instance.log = self.stats.session.log
@@ -179,6 +214,7 @@ class Bot(object):
         """
         Local click method for use with the bot, ensuring we pass the window being used into the click function.
         """
+        self.grabber.expire()
         click_on_point(
             point=point,
             window=self.window,
@@ -188,11 +224,13 @@ class Bot(object):
             pause=pause,
             offset=offset
         )
+        self.grabber.expire(after=True)
 
     def click_image(self, image, pos, button="left", pause=0.0):
         """
         Local image click method for use with the bot, ensuring we pass the window being used into the image click function.
         """
+        self.grabber.expire()
         click_on_image(
             window=self.window,
             image=image,
@@ -200,6 +238,7 @@ class Bot(object):
             button=button,
             pause=pause
         )
+        self.grabber.expire(after=True)
 
     def find_and_click(self, image, region=None, precision=0.8, button="left", pause=0.3, padding=None, log=None):
         """
@@ -241,6 +280,7 @@ class Bot(object):
         """
         Local drag method for use with the bot, ensuring we pass the window being used into the drag function.
         """
+        self.grabber.expire()
         drag_mouse(
             start=start,
             end=end,
@@ -248,6 +288,73 @@ class Bot(object):
             button=button,
             pause=pause
         )
+        self.grabber.expire(after=True)
+
+    def scroll_to(self, panel, item, end, find=None, limit=FUNCTION_LOOP_TIMEOUT):
+        """
+        Scroll the currently open panel (expected to be at its start) towards the specified end point, until the
+        specified find function returns True, or until the end of the panel is reached when no find function is given.
+
+        The distance the panel scrolled before the item was found (measured by our scroll tracker) is recorded into
+        our panel index, once learned, the panel is dragged directly to that distance and the item is verified. Items
+        not present at their learned distance are searched for back towards the start of the panel, and then onwards.
+        """
+        start = self.locs.scroll_start
+        length = abs(start[1] - end[1])
+        direction = 1 if end[1] > start[1] else -1
+
+        tracker = ScrollTracker(capture=lambda: self.grabber.snapshot(region=PANEL_COORDS["panel_scroll"], fresh=True))
+        tracker.start()
+        distance = self.panel_index.distance(panel=panel, item=item)
+
+        if distance:
+            # Dragging directly to our learned distance, the panel settles after each drag.
+            for drag in self.panel_index.drags(distance=distance, length=length):
+                self.drag(start=start, end=(start[0], start[1] + drag * direction), pause=0)
+                tracker.scrolled()
+
+            # The end of a panel can only be verified by dragging once more.
+            if find:
+                found = find()
+            else:
+                self.drag(start=start, end=end, pause=0)
+                found = tracker.scrolled().end
+
+            self.panel_index.count(jump=True, hit=found)
+            if found:
+                self.panel_index.record(panel=panel, item=item, distance=abs(tracker.offset))
+                return True
+
+            self.logger.debug("{item} was not present at its learned distance in the {panel} panel, scanning back and onwards...".format(item=item, panel=panel))
+            self.panel_index.forget(panel=panel, item=item)
+
+            # The end of a panel is never closer than its learned distance, only items are searched for back towards
+            # the start of the panel. Once the start is reached, the panel is scanned onwards from the start.
+            if find:
+                back = self.locs.scroll_bottom_end if direction > 0 else self.locs.scroll_top_end
+                for i in range(limit):
+                    self.drag(start=start, end=back, pause=0)
+                    if tracker.scrolled().end:
+                        break
+                    if find():
+                        self.panel_index.record(panel=panel, item=item, distance=abs(tracker.offset))
+                        return True
+
+        self.panel_index.count(jump=False)
+        for i in range(limit):
+            if find and find():
+                self.panel_index.record(panel=panel, item=item, distance=abs(tracker.offset))
+                return True
+
+            self.drag(start=start, end=end, pause=0)
+            if tracker.scrolled().end:
+                # The end of the panel is found once the panel no longer moves, the distance
+                # recorded is the distance scrolled until the panel stopped moving.
+                if not find:
+                    self.panel_index.record(panel=panel, item=item, distance=abs(tracker.offset))
+                return not find
+
+        return bool(find and find())
 
     @bot_property(queueable=True, tooltip="Reload and run functions that set local variables that are usually set once, this should be ran whenever a configuration is changed.")
     def reload(self):
@@ -840,8 +947,8 @@ class Bot(object):
                 self.logger.info("scrolling and levelling all heroes present.")
 
                 _loops = 0
-                _last = self.grabber.snapshot(region=PANEL_COORDS["panel_check"])
-                _current = _last
+                _scroll = ScrollTracker(capture=lambda: self.grabber.snapshot(region=PANEL_COORDS["panel_scroll"], fresh=True))
+                _scroll.start()
 
                 while True:
                     if _loops == FUNCTION_LOOP_TIMEOUT:
@@ -860,14 +967,11 @@ class Bot(object):
                     self.logger.info("dragging hero panel to next set of heroes...")
                     self.drag(
                         start=drag_start,
-                        end=drag_end,
-                        pause=2
+                        end=drag_end
                     )
 
-                    _last = _current
-                    _current = self.grabber.snapshot(region=PANEL_COORDS["panel_check"])
-
-                    if self.stats.images_duplicate(image_one=_last, image_two=_current):
+                    # Once the panel stops moving, the top is reached if the panel did not move at all.
+                    if _scroll.scrolled().end:
                         break
 
                 # Performing one additional heroes level after the top
@@ -961,12 +1065,10 @@ class Bot(object):
         # Begin by ensuring that the master panel is open and not collapsed.
         self.goto_master(collapsed=False)
 
-        # Looping through all in game skills, parsing out the current level.
-        for skill in SKILLS:
-            self.current_prestige_skill_levels[skill] = self.stats.skill_ocr(
-                region=SKILL_LEVEL_COORDS[skill]
-            )
-            self.logger.info("{skill} parsed as level {level}".format(skill=skill, level=self.current_prestige_skill_levels[skill]))
+        # Parsing out the current level of all in game skills at once.
+        for skill, level in self.stats.skill_levels(skills=SKILLS).items():
+            self.current_prestige_skill_levels[skill] = level
+            self.logger.info("{skill} parsed as level {level}".format(skill=skill, level=level))
 
     def enabled_skills(self):
         """
@@ -1064,17 +1166,18 @@ class Bot(object):
 
             # Should the skill in question be levelled to it's maximum amount available?
             if max_skill:
-                if self.grabber.point_is_color(point=color, color=self.colors.WHITE):
+                if self.grabber.probe(points=[color], colors=self.colors.WHITE)[0]:
                     self.click(
                         point=color,
                         pause=0.5
                     )
 
-        def can_level(key):
+        def can_level():
             """
-            Check to see if a skill can currently be levelled or not.
+            Check to see which skills can currently be levelled, the entire skills bar is checked at once.
             """
-            return not self.grabber.point_is_color(point=SKILL_CAN_LEVEL_LOCS[key], color=self.colors.SKILL_CANT_LEVEL)
+            keys = list(SKILL_CAN_LEVEL_LOCS)
+            return dict(zip(keys, ~self.grabber.probe(points=[SKILL_CAN_LEVEL_LOCS[key] for key in keys], colors=self.colors.SKILL_CANT_LEVEL)))
 
         def active(key):
             """
@@ -1095,6 +1198,10 @@ class Bot(object):
                     # for use with the skill levelling events.
                     self.goto_master(collapsed=False)
 
+                    # Determine which skills can be levelled, this is only checked again
+                    # once a skill is levelled, since levelling a skill spends our gold.
+                    levelable = can_level()
+
                     # Looping through all available uncapped skills.
                     for skill, values in uncapped.items():
                         if active(key=skill):
@@ -1102,7 +1209,7 @@ class Bot(object):
                             continue
                         # Can the skill even be levelled at this point?
                         # If we do not have enough gold, we should just skip this process.
-                        if not can_level(key=skill):
+                        if not levelable[skill]:
                             self.logger.info("{skill} can not be levelled currently and will not be levelled yet.".format(skill=skill))
                             continue
 
@@ -1130,9 +1237,10 @@ class Bot(object):
                             self.logger.info("skill: {skill} is currently maxed, setting to {max_level}".format(skill=skill, max_level=SKILL_MAX_LEVEL))
                             self.current_prestige_skill_levels[skill] = SKILL_MAX_LEVEL
                         else:
-                            self.current_prestige_skill_levels[skill] = self.stats.skill_ocr(
-                                region=SKILL_LEVEL_COORDS[skill]
-                            )
+                            self.current_prestige_skill_levels[skill] = self.stats.skill_levels(skills=(skill,))[skill]
+
+                        # Our gold has been spent, the remaining skills may no longer be levelled.
+                        levelable = can_level()
 
                 # Recalculate the next skill level process.
                 self.calculate_next_skills_level()
@@ -1200,11 +1308,9 @@ class Bot(object):
 
         perk_image = getattr(self.images, "perks_{perk}".format(perk=perk))
         # Dragging until perk is on the screen.
-        while not self.grabber.search(image=perk_image, bool_only=True):
-            self.drag(
-                start=self.locs.scroll_start,
-                end=self.locs.scroll_top_end,
-            )
+        if not self.scroll_to(panel=PERKS_PANEL, item=perk, end=self.locs.scroll_top_end, find=lambda: self.grabber.search(image=perk_image, bool_only=True)):
+            self.logger.warning("unable to find {perk} perk, skipping...".format(perk=perk))
+            return
 
         # Dynamically derive the point that will be used to click on the
         # current perk.
@@ -1350,11 +1456,7 @@ class Bot(object):
 
                 # Scrolling to the bottom of the stats panel.
                 sleep(1)
-                for i in range(5):
-                    self.drag(
-                        start=self.locs.scroll_start,
-                        end=self.locs.scroll_bottom_end
-                    )
+                self.scroll_to(panel=STATS_PANEL, item=PANEL_END, end=self.locs.scroll_bottom_end)
 
                 self.stats.update_stats_ocr()
                 self.stats.statistics.bot_statistics.updates += 1
@@ -1593,26 +1695,28 @@ class Bot(object):
             """
             Given an image, point and color, use as a helper function to either discover or enchant an artifact.
             """
-            # Is the image on the screen?
-            if self.grabber.search(image=image, bool_only=True):
-                # Is the specified color present in the point chosen.
-                if self.grabber.point_is_color(point=point, color=color):
-                    # Click to enchant/discover artifact.
-                    self.logger.info("performing...")
-                    self.click(
-                        point=point,
-                        pause=1
-                    )
-                    self.click(
-                        point=self.locs.purchase,
-                        pause=2
-                    )
-                    self.click(
-                        point=self.locs.close_top,
-                        clicks=5,
-                        interval=0.5,
-                        pause=2
-                    )
+            # Is the image on the screen, and is the specified color present in the point chosen?
+            # Both checks are evaluated against a single capture of the screen.
+            with self.grabber.frame() as frame:
+                available = frame.search(image=image, bool_only=True) and frame.probe(points=[point], colors=color)[0]
+
+            if available:
+                # Click to enchant/discover artifact.
+                self.logger.info("performing...")
+                self.click(
+                    point=point,
+                    pause=1
+                )
+                self.click(
+                    point=self.locs.purchase,
+                    pause=2
+                )
+                self.click(
+                    point=self.locs.close_top,
+                    clicks=5,
+                    interval=0.5,
+                    pause=2
+                )
 
         # Check for discovery/enchantment first.
         if self.configuration.enable_artifact_discover_enchant:
@@ -1674,28 +1778,14 @@ class Bot(object):
                     pause=0.5
                 )
 
-            # Looking for the artifact to upgrade here, dragging until it is finally found.
-            # Looping until our limit is reached, using a "global" found boolean to ensure we
-            # log when an artifact could not be found.
-            loops = 0
-            found = False
-            while loops != FUNCTION_LOOP_TIMEOUT:
-                found = self.find_and_click(
-                    image=ARTIFACT_MAP.get(artifact),
-                    precision=0.7,
-                    padding=(ARTIFACTS_LOCS["artifact_push"]["x"], ARTIFACTS_LOCS["artifact_push"]["y"]),
-                    log="artifact: {artifact} has been found, purchasing now...".format(artifact=artifact)
-                )
-                # Break early if we've already found and purchased the artifact.
-                if found:
-                    break
-                # Drag and try again.
-                loops += 1
-                self.drag(
-                    start=self.locs.scroll_start,
-                    end=self.locs.scroll_bottom_end,
-                    pause=1.5
-                )
+            # Looking for the artifact to upgrade here, dragging directly to the artifact if its
+            # location within the panel has been learned, scanning for it otherwise.
+            found = self.scroll_to(panel=ARTIFACTS_PANEL, item=artifact, end=self.locs.scroll_bottom_end, find=lambda: self.find_and_click(
+                image=ARTIFACT_MAP.get(artifact),
+                precision=0.7,
+                padding=(ARTIFACTS_LOCS["artifact_push"]["x"], ARTIFACTS_LOCS["artifact_push"]["y"]),
+                log="artifact: {artifact} has been found, purchasing now...".format(artifact=artifact)
+            ))
 
             # No artifact could be found and our loops have been reached, we can skip
             # and log a warning for users.
@@ -1838,29 +1928,27 @@ class Bot(object):
             # later in the dashboard to see a real view of the tournament results.
             _current.save(_path)
 
+            # Every participant is checked for our user against the capture taken above at once.
+            _users = self.grabber.probe(points=coords["user_check_points"][:count], colors=self.colors.TOURNAMENT_USER, im=_current)
+
             tournament = Tournament.objects.create(
                 instance=self.instance,
                 identifier=_identifier,
             )
 
+            # Non top-ten tournament means we can manually grab up to 5th place.
+            # After that, we'll need to parse using OCR. Values are read from the capture probed above.
+            _parsed = self.stats.tournament_ocr(coords=coords, count=count, ranks=() if in_top_ten else range(5, count), image=_current)
+
             # Loop through each expected available participant in the tournament.
             # Each one has an index associated for each expected location to search through.
             for i in range(count):
                 # Generate a new participant for each iteration we take.
                 # We can use our index to determine which participant we're on.
-                if in_top_ten:
+                _rank, _user, _stage = _parsed[i]
+                if _rank is None:
                     _rank = i + 1
-                # Non top-ten tournament means we can manually grab up to 5th place.
-                # After that, we'll need to parse using OCR.
-                else:
-                    if i <= 4:
-                        _rank = i + 1
-                    else:
-                        _rank = self.stats.tournament_rank_ocr(region=coords["ranks"][i], threshold=150)
-
-                _user = self.stats.tournament_user_ocr(region=coords["usernames"][i])
-                _stage = self.stats.tournament_stage_ocr(region=coords["stages"][i])
-                _is_user = self.grabber.point_is_color(point=coords["user_check_points"][i], color=self.colors.TOURNAMENT_USER)
+                _is_user = bool(_users[i])
 
                 # Strip out the "W" from the winning users username.
                 # This is what the "crown" should be parsed into.
@@ -2144,7 +2232,7 @@ class Bot(object):
                 # Loop forever until no more milestones can be collected.
                 while True:
                     # Is the collect button available and the correct color for collection?
-                    if self.grabber.point_is_color(point=MASTER_LOCS["milestones"]["milestones_collect_point"], color=self.colors.COLLECT_GREEN):
+                    if self.grabber.probe(points=[MASTER_LOCS["milestones"]["milestones_collect_point"]], colors=self.colors.COLLECT_GREEN)[0]:
                         self.logger.info("a completed milestone is complete, collecting now...")
                         self.click(
                             point=MASTER_LOCS["milestones"]["milestones_collect_point"],
@@ -2255,9 +2343,12 @@ class Bot(object):
         This is the main ad function. Used in two places:
            - One instance is used by the transition functionality and decorator.
            - The other one allows the function to be called directly without decorators added.
+
+        Returns whether or not an ad was present (collected or declined).
         """
-        collected = False
+        collected = present = False
         while self.grabber.search(image=[self.images.collect_ad, self.images.collect_ad_pass, self.images.watch_ad], bool_only=True):
+            present = True
             # VIP/Season Pass Unlocked...
             found = self.find_and_click(
                 image=[self.images.collect_ad, self.images.collect_ad_pass],
@@ -2303,13 +2394,15 @@ class Bot(object):
             self.stats.increment_ads()
             sleep(1)
 
+        return present
+
     @not_in_transition
     @bot_property(queueable=True, tooltip="Collect an ad in game if one is available.")
     def collect_ad(self):
         self.ad()
 
     def collect_ad_no_transition(self):
-        self.ad()
+        return self.ad()
 
     @not_in_transition
     @bot_property(queueable=True, shortcut="shift+f", tooltip="Attempt to begin the boss fight in game.")
@@ -2379,7 +2472,16 @@ class Bot(object):
             # for ads throughout the process.
             self.logger.info("executing tapping process {repeats} time(s)".format(repeats=self.configuration.tapping_repeat))
             for i in range(self.configuration.tapping_repeat):
-                for index, point in enumerate(self.locs.fairies_map, start=1):
+                # Only tapping the targets detected in the sky band when possible, the
+                # entire fairy map is used whenever detection is inconclusive.
+                points = self.locs.fairies_map
+                if self.configuration.enable_tapping_detection:
+                    targets = self.tap_detector.detect(frame=self.grabber.snapshot())
+                    if targets is not None:
+                        self.logger.debug("{count} tapping target(s) detected.".format(count=len(targets)))
+                        points = tuple(targets) + self.locs.tap_drops
+
+                for index, point in enumerate(points, start=1):
                     # No need to sleep, some fails are acceptable since
                     # we loop through a good amount fo coords here.
                     self.click(
@@ -2427,17 +2529,19 @@ class Bot(object):
         """
         self.logger.info("attempting to collapse any panels in game now.")
 
-        if self.grabber.search(image=[self.images.settings, self.images.fight_boss, self.images.leave_boss,
-                                      self.images.icon_boss, self.images.clan_raid_ready, self.images.clan_no_raid], bool_only=True):
-            # Return early if any images are present that could only be seen when the
-            # game is in a collapsed state, regardless of panel.
-            return True
+        # Both checks below are evaluated against a single capture of the game screen.
+        with self.grabber.frame() as frame:
+            if frame.search(image=[self.images.settings, self.images.fight_boss, self.images.leave_boss,
+                                   self.images.icon_boss, self.images.clan_raid_ready, self.images.clan_no_raid], bool_only=True):
+                # Return early if any images are present that could only be seen when the
+                # game is in a collapsed state, regardless of panel.
+                return True
 
-        # If we reach this point, it means that none of our expected images are present,
-        # (probably un-collapsed panel currently on screen).
-        return self.find_and_click(
-            image=[self.images.collapse_panel, self.images.exit_panel, self.images.large_exit_panel],
-        )
+            # If we reach this point, it means that none of our expected images are present,
+            # (probably un-collapsed panel currently on screen).
+            return self.find_and_click(
+                image=[self.images.collapse_panel, self.images.exit_panel, self.images.large_exit_panel],
+            )
 
     @not_in_transition
     def goto_panel(self, panel, icon, top_find, bottom_find, collapsed=True, top=True, equipment_tab=None):
@@ -2505,7 +2609,7 @@ class Bot(object):
                 return True
 
             # Let's ensure that the specified tab is opened (ie: sword, headgear, cloak, aura, slash).
-            while not self.grabber.point_is_color(point=EQUIPMENT_LOCS["color_checks"][equipment_tab], color=self.colors.EQUIPMENT_CHOSEN):
+            while not self.grabber.probe(points=[EQUIPMENT_LOCS["color_checks"][equipment_tab]], colors=self.colors.EQUIPMENT_CHOSEN)[0]:
                 self.click(
                     point=EQUIPMENT_LOCS["tabs"][equipment_tab],
                     pause=1
@@ -2537,8 +2641,8 @@ class Bot(object):
             end_drag = self.locs.scroll_top_end if top else self.locs.scroll_bottom_end
 
             if not find:
-                _last = self.grabber.snapshot(region=PANEL_COORDS["panel_check"])
-                _current = _last
+                scroll = ScrollTracker(capture=lambda: self.grabber.snapshot(region=PANEL_COORDS["panel_scroll"], fresh=True))
+                scroll.start()
 
                 while True:
                     if loops == FUNCTION_LOOP_TIMEOUT:
@@ -2548,15 +2652,13 @@ class Bot(object):
                     loops += 1
                     self.drag(
                         start=self.locs.scroll_start,
-                        end=end_drag,
-                        pause=1
+                        end=end_drag
                     )
-                    _last = _current
-                    _current = self.grabber.snapshot(region=PANEL_COORDS["panel_check"])
 
-                    # If the images are currently duplicates, it means we can no longer
-                    # travel up or down anymore, essentially the top or bottom is hit.
-                    if self.stats.images_duplicate(image_one=_last, image_two=_current):
+                    # If the panel did not move at all once it stops moving, it means we can no
+                    # longer travel up or down anymore, essentially the top or bottom is hit.
+                    if scroll.scrolled().end:
+                        self.logger.debug("{panel} panel scrolled {offset} pixel(s) in {drags} drag(s).".format(panel=panel, offset=scroll.offset, drags=scroll.drags))
                         break
 
             else:
@@ -2855,6 +2957,10 @@ class Bot(object):
                 if self.enable_shortcuts:
                     self.setup_shortcuts()
 
+                # Begin capturing the window in the background, if enabled.
+                if self.grabber.capture:
+                    self.grabber.capture.start()
+
                 self.goto_master()
                 self.initialize()
                 self.get_upgrade_artifacts()
@@ -2866,7 +2972,11 @@ class Bot(object):
                 loop_functions = self.setup_loop_functions()
                 pause_log_dt = timezone.now() + datetime.timedelta(seconds=10)
 
+                # Search telemetry is recorded per session (by this instances grabber), the search volume is counted per loop.
+                self.grabber.telemetry.reset()
+
                 while True:
+                    self.grabber.telemetry.loop()
                     for func in loop_functions:
                         # Any explicit functions can be executed after the main game loop has finished.
                         # The Queue handles the validation to ensure only available functions can be created...
@@ -2930,6 +3040,24 @@ class Bot(object):
                 self.stats.session.end = timezone.now()
                 self.stats.session.save()
                 self.instance.stop()
+
+                if self.grabber.capture:
+                    self.grabber.capture.stop()
+
+                # Persist any search regions and search ordering learned during this session.
+                self.grabber.regions.save()
+                self.grabber.ordering.save()
+                self.panel_index.save()
+                self.logger.info("learned regions: {rates}".format(rates=self.grabber.regions.rates))
+                self.logger.info("search cache: {rates}".format(rates=self.grabber.cache.rates))
+                self.logger.info("panel index: {rates}".format(rates=self.panel_index.rates))
+                self.logger.info("ocr engines: {counts}".format(counts=engines.counts))
+                self.logger.info("ocr cache: {rates}".format(rates=engines.cache.rates))
+
+                # Persist the search telemetry recorded during this session, viewable on the session page.
+                self.grabber.telemetry.save(path=os.path.join(LOCAL_DATA_TELEMETRY_DIR, "{uuid}.json".format(uuid=self.stats.session.uuid)))
+                self.logger.info("search telemetry: {searches} searches over {loops} loops.".format(searches=self.grabber.telemetry.report()["searches"], loops=self.grabber.telemetry.loop_count))
+
                 Queue.flush()
 
                 # Unhook our now terminated instance from our local shortcut module.
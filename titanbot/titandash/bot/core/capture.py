@@ -0,0 +1,91 @@
+from .constants import CAPTURE_BUFFER_SIZE, CAPTURE_INTERVAL, CAPTURE_TIMEOUT
+
+from collections import deque, namedtuple
+from threading import Thread, Condition, Event
+
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Every capture published is sequenced, the timestamp represents the time the capture began.
+Capture = namedtuple("Capture", ["sequence", "timestamp", "frame"])
+
+
+class CaptureTimeout(Exception):
+    pass
+
+
+class CaptureThread(Thread):
+    """
+    CaptureThread captures a single window continuously in the background, publishing every capture into a small
+    ring buffer along with a monotonically increasing sequence number and the time the capture was taken.
+
+    Consumers read the latest capture, or wait for a capture newer than a sequence number or a point in time, so
+    that capturing the window overlaps with matching, ocr and clicking instead of blocking them.
+    """
+    def __init__(self, window, size=CAPTURE_BUFFER_SIZE, interval=CAPTURE_INTERVAL):
+        super(CaptureThread, self).__init__(name="capture-{window}".format(window=getattr(window, "hwnd", id(window))), daemon=True)
+
+        self.window = window
+        self.interval = interval
+
+        self._buffer = deque(maxlen=size)
+        self._sequence = 0
+        self._condition = Condition()
+        self._stopped = Event()
+
+    def run(self):
+        while not self._stopped.is_set():
+            timestamp = time.time()
+            try:
+                frame = self.window.screenshot()
+            except Exception as exc:
+                logger.warning("window could not be captured: {exc}".format(exc=exc))
+            else:
+                self.publish(frame=frame, timestamp=timestamp)
+
+            self._stopped.wait(self.interval)
+
+    def stop(self, timeout=None):
+        """
+        Stop capturing the window, waiting for any capture currently being taken to finish.
+        """
+        self._stopped.set()
+        if self.is_alive():
+            self.join(timeout=timeout)
+
+    def publish(self, frame, timestamp=None):
+        """
+        Publish the specified frame into our buffer, waking up any consumers waiting for a new capture.
+        """
+        with self._condition:
+            self._sequence += 1
+            self._buffer.append(Capture(sequence=self._sequence, timestamp=timestamp or time.time(), frame=frame))
+            self._condition.notify_all()
+
+    def latest(self):
+        """
+        Retrieve the latest capture available, None is returned if nothing has been captured yet.
+        """
+        with self._condition:
+            return self._buffer[-1] if self._buffer else None
+
+    def after(self, sequence, timeout=CAPTURE_TIMEOUT):
+        """
+        Retrieve the latest capture, waiting for a capture with a sequence newer than the one specified if needed.
+        """
+        return self._wait(predicate=lambda capture: capture.sequence > sequence, timeout=timeout)
+
+    def since(self, timestamp, timeout=CAPTURE_TIMEOUT):
+        """
+        Retrieve the latest capture, waiting for a capture taken after the specified time if needed.
+        """
+        return self._wait(predicate=lambda capture: capture.timestamp > timestamp, timeout=timeout)
+
+    def _wait(self, predicate, timeout):
+        with self._condition:
+            if not self._condition.wait_for(lambda: bool(self._buffer) and predicate(self._buffer[-1]), timeout=timeout):
+                raise CaptureTimeout("no new capture was published within {timeout} second(s).".format(timeout=timeout))
+
+            return self._buffer[-1]
@@ -0,0 +1,136 @@
+from .constants import CHANGE_TILE_SIZE, CHANGE_TILE_THRESHOLD, SEARCH_CACHE_SIZE
+
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+import cv2
+
+
+class ChangeDetector(object):
+    """
+    ChangeDetector determines which parts of the screen have changed between consecutive captures.
+
+    Every capture observed is split into tiles, the signature of each tile is compared against the
+    previous capture. Each tile keeps a version that is incremented whenever the tile changes, so that
+    anything computed from a region of a capture remains valid for as long as the versions of the tiles
+    overlapping the region remain the same.
+    """
+    def __init__(self, tile=CHANGE_TILE_SIZE, threshold=CHANGE_TILE_THRESHOLD):
+        self.tile = tile
+        self.threshold = threshold
+
+        self._frame = None
+        self._signature = None
+        self._versions = None
+        self._scale = None
+
+    def signature(self, frame):
+        """
+        Generate the signature of every tile in the specified frame, the mean intensity and standard deviation of each
+        tile. The standard deviation ensures that changes to the contents of a tile with a similar mean are detected.
+        """
+        gray = frame.gray.astype(np.float32)
+        size = max(1, frame.width // self.tile), max(1, frame.height // self.tile)
+
+        mean = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+        square = cv2.resize(gray * gray, size, interpolation=cv2.INTER_AREA)
+
+        return np.stack((mean, np.sqrt(np.maximum(square - mean * mean, 0))))
+
+    def observe(self, frame):
+        """
+        Observe the specified frame, updating the version of every tile that has changed since the last frame.
+        """
+        if frame is self._frame:
+            return
+
+        signature = self.signature(frame=frame)
+        if self._signature is None or signature.shape != self._signature.shape:
+            self._versions = np.zeros(signature.shape[1:], dtype=np.int64)
+            # The first frame (or a frame of a new size), invalidates every tile.
+            if self._signature is not None:
+                self._versions += 1
+            self._signature = signature
+            self._scale = frame.width / signature.shape[2], frame.height / signature.shape[1]
+        else:
+            # Tiles are compared against their signature when they last changed (rather than the previous frame),
+            # so that gradual changes still accumulate until they eventually invalidate the tile.
+            changed = (np.abs(signature - self._signature) > self.threshold).any(axis=0)
+            self._versions += changed
+            self._signature[:, changed] = signature[:, changed]
+
+        self._frame = frame
+
+    def version(self, region=None):
+        """
+        Retrieve the version of the specified region (x1, y1, x2, y2), or the entire frame if no region is
+        specified. The version changes whenever any tile overlapping the region changes.
+        """
+        if region is None:
+            return int(self._versions.sum()), self._versions.shape
+
+        return int(self._versions[
+            int(region[1] // self._scale[1]):int(np.ceil(region[3] / self._scale[1])),
+            int(region[0] // self._scale[0]):int(np.ceil(region[2] / self._scale[0]))
+        ].sum()), self._versions.shape
+
+
+class SearchCache(object):
+    """
+    SearchCache stores the results (positive and negative) of searches performed against captures of the screen,
+    results are returned from the cache until any part of the screen overlapping the search has changed.
+    """
+    def __init__(self, size=SEARCH_CACHE_SIZE, detector=None):
+        self.size = size
+        self.detector = detector or ChangeDetector()
+
+        self._results = OrderedDict()
+        self._lock = Lock()
+
+        # Counters used to determine how effective our cache is.
+        self.counts = {"lookups": 0, "hits": 0}
+
+    def get(self, frame, key, region=None):
+        """
+        Retrieve the cached result of the specified search (key) against the specified frame,
+        None is returned if no valid result is cached.
+        """
+        with self._lock:
+            self.detector.observe(frame=frame)
+            self.counts["lookups"] += 1
+
+            cached = self._results.get(key)
+            if cached is None or cached[0] != self.detector.version(region=region):
+                return None
+
+            self._results.move_to_end(key)
+            self.counts["hits"] += 1
+
+            return cached[1]
+
+    def set(self, frame, key, result, region=None):
+        """
+        Cache the result of the specified search (key) against the specified frame.
+        """
+        with self._lock:
+            self.detector.observe(frame=frame)
+
+            self._results[key] = self.detector.version(region=region), result
+            self._results.move_to_end(key)
+            if len(self._results) > self.size:
+                self._results.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+    @property
+    def rates(self):
+        """
+        Retrieve the amount of lookups performed and the hit rate of our cache.
+        """
+        return {
+            "lookups": self.counts["lookups"],
+            "hit_rate": self.counts["hits"] / (self.counts["lookups"] or 1)
+        }
@@ -1,6 +1,7 @@
 from settings import LOG_DIR
 
 import datetime
+import os
 
 # Raid notifications string used to template out the message sent to a user.
 RAID_NOTIFICATION_MESSAGE = "Raid attacks are available! You may now attack the active titan!"
@@ -45,6 +46,80 @@ FUNCTION_LOOP_TIMEOUT = 40
 # In which case, we can continue and attempt to up this damage and try again later.
 BOSS_LOOP_TIMEOUT = int(FUNCTION_LOOP_TIMEOUT / 4)
 
+# Maximum age (in seconds) of a capture held by a grabber frame context. Captures are also expired
+# whenever an action is performed, this is a final fallback for loops waiting on the screen to change.
+FRAME_MAX_AGE = 1
+
+# Maximum amount of worker threads used when searching for many images at once. OpenCV releases the
+# GIL while matching, so batched searches are performed in parallel across these threads.
+SEARCH_POOL_WORKERS = min(4, os.cpu_count() or 1)
+
+# Worker threads used to scan each capture of the artifacts panel while parsing owned artifacts, every
+# capture is scanned while the panel is dragged to the next capture.
+ARTIFACT_SCAN_WORKERS = 2
+
+# Worker processes used by the vision pool, shared by every bot instance running in the same process.
+VISION_POOL_WORKERS = os.cpu_count() or 1
+# Minimum amount of pixels a batch of ocr preprocessing must contain to be offloaded to the vision pool, smaller
+# batches cost more to hand to a worker (and to return scaled up) than to preprocess in process.
+VISION_PREPROCESS_MIN_PIXELS = 100000
+
+# Ocr engines kept alive for each ocr configuration, shared by every bot instance running in the same process.
+OCR_POOL_SIZE = 2
+
+# Gap (in pixels) placed around every processed image stitched together for a single ocr pass.
+OCR_STITCH_GAP = 20
+
+# Results cached for processed images recognized, and the amount of time (in seconds) that a result remains valid.
+OCR_CACHE_SIZE = 256
+OCR_CACHE_TTL = 600
+
+# Workers used to process and recognize the fields of ocr plans, shared by every bot instance running in the same process.
+# Sized to keep every engine of the pool busy, for each ocr configuration used by a plan (text, lines, digits).
+OCR_PLAN_WORKERS = OCR_POOL_SIZE * 3
+
+# Digits written in the games font are recognized without tesseract, glyphs are thresholded the same way as
+# thresholded ocr images, and normalized to the template size before being matched against each digit template.
+# Results with a lower confidence (correlation of the worst matching glyph) are recognized through tesseract.
+DIGIT_TEMPLATE_SIZE = 16
+DIGIT_THRESHOLD = 230
+DIGIT_MIN_AREA = 6
+DIGIT_MIN_HEIGHT = 0.6
+DIGIT_CONFIDENCE = 0.75
+
+# Pyramid searches match a downscaled template against a downscaled frame first, only the best coarse
+# candidates are then refined at full resolution, within a small window (padding) around each candidate.
+PYRAMID_FACTOR = 2
+PYRAMID_CANDIDATES = 5
+PYRAMID_PADDING = 4
+# Templates smaller than this (either dimension, once downscaled) are always searched exhaustively.
+PYRAMID_MIN_TEMPLATE = 12
+
+# Margin (in pixels) added around a templates learned search region, allowing for slight movement
+# of an element before a full search is required. Learned regions are saved every interval (seconds).
+LEARNED_REGION_MARGIN = 10
+LEARNED_REGION_SAVE_INTERVAL = 300
+
+# Anchored images are checked within a small tolerance (in pixels) of their anchor. Fingerprint differences
+# below the match threshold are conclusively found, differences above the miss threshold are conclusively
+# not found, anything in between falls back to a full search.
+ANCHOR_TOLERANCE = 3
+ANCHOR_MATCH_THRESHOLD = 0.25
+ANCHOR_MISS_THRESHOLD = 0.6
+
+# Lists of images being searched for are ordered by how often each image is found, hits are decayed
+# so that the order adapts when the game state changes. Every interval searches, a list is searched
+# in its original order instead (exploration), so images that are found less often can still move up.
+ORDERING_DECAY = 0.95
+ORDERING_EXPLORE_INTERVAL = 20
+
+# Captures are split into tiles (in pixels) to determine which parts of the screen have changed between
+# captures. A tile is changed once its mean intensity differs by more than the threshold. Search results
+# remain cached (up to the maximum amount of entries) until a tile overlapping the search has changed.
+CHANGE_TILE_SIZE = 20
+CHANGE_TILE_THRESHOLD = 1.0
+SEARCH_CACHE_SIZE = 512
+
 NOX_WINDOW_FILTER = [
     "nox",
     "bignox",
@@ -55,3 +130,39 @@ MEMU_WINDOW_FILTER = [
 ]
 
 WINDOW_FILTER = NOX_WINDOW_FILTER + MEMU_WINDOW_FILTER
+
+# Background capture threads keep a small ring buffer of the most recent captures, capturing the window
+# every interval (in seconds). Snapshots use a buffered capture taken after the last action performed that
+# is no older than the maximum age, waiting up to the timeout before capturing the window directly instead.
+CAPTURE_BUFFER_SIZE = 4
+CAPTURE_INTERVAL = 0.05
+CAPTURE_MAX_AGE = 0.25
+CAPTURE_TIMEOUT = 1
+
+# Every search records its best score into a histogram (of the specified amount of bins) per template. Searches
+# that score within the near miss margin below their precision are counted as near misses. Search volume is kept
+# for the most recent loops, and reports include the specified amount of templates for each category.
+TELEMETRY_BINS = 20
+TELEMETRY_NEAR_MISS = 0.1
+TELEMETRY_LOOPS = 100
+TELEMETRY_REPORT_SIZE = 10
+
+# Scroll trackers estimate the shift between captures of a scrolling panel by locating a band of rows (of the band
+# height) from one capture within the next, estimates with a response below the minimum are unknown. After a drag,
+# the panel is captured every interval until the panel has stopped moving (or the timeout is reached), a panel is
+# only considered stopped once it has been seen moving, or once the delay has passed without it ever moving.
+SCROLL_BAND_HEIGHT = 48
+SCROLL_MIN_RESPONSE = 0.9
+SCROLL_SETTLE_INTERVAL = 0.1
+SCROLL_SETTLE_DELAY = 0.5
+SCROLL_SETTLE_TIMEOUT = 2
+
+# Tap detectors model the background of the sky band as the median of the specified amount of recent captures.
+# Pixels that differ from the background by more than the threshold are foreground, blobs of foreground within
+# the area limits are targets. Too many targets (or too much foreground) is inconclusive, the static map is used.
+TAP_BACKGROUND_SIZE = 5
+TAP_DIFFERENCE_THRESHOLD = 40
+TAP_MIN_AREA = 30
+TAP_MAX_AREA = 2500
+TAP_MAX_TARGETS = 8
+TAP_MAX_FOREGROUND = 0.2
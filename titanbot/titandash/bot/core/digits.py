@@ -0,0 +1,128 @@
+from .constants import DIGIT_TEMPLATE_SIZE, DIGIT_THRESHOLD, DIGIT_MIN_AREA, DIGIT_MIN_HEIGHT, DIGIT_CONFIDENCE
+from .maps import DIGIT_MAP
+
+import numpy as np
+import cv2
+
+
+class DigitRecognizer(object):
+    """
+    DigitRecognizer reads numbers written in the games bitmap font (stages, ranks) without tesseract.
+
+    The unscaled grayscale crop is thresholded and split into connected components, each component tall enough to be
+    a glyph (and not touching the edge of the crop) is normalized and classified against a template of every digit at
+    once. Crops with a glyph cut off by their edge are never recognized. The confidence of a result is the lowest
+    correlation of any glyph with its closest template, callers should fall back to tesseract when the confidence is
+    below our minimum confidence.
+    """
+    def __init__(self, templates=DIGIT_MAP, size=DIGIT_TEMPLATE_SIZE, threshold=DIGIT_THRESHOLD, min_area=DIGIT_MIN_AREA,
+                 min_height=DIGIT_MIN_HEIGHT, confidence=DIGIT_CONFIDENCE):
+        self.size = size
+        self.threshold = threshold
+        self.min_area = min_area
+        self.min_height = min_height
+        self.confidence = confidence
+
+        # Templates are either the path to each template image, or the template images themselves.
+        self.digits = sorted(templates)
+        self._templates = self._unit(np.array([
+            self.normalize(mask=cv2.imread(templates[digit], cv2.IMREAD_GRAYSCALE) if isinstance(templates[digit], str) else templates[digit])
+            for digit in self.digits
+        ])) if templates else None
+
+    @staticmethod
+    def _unit(vectors):
+        vectors = vectors - vectors.mean(axis=-1, keepdims=True)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=-1, keepdims=True), 1e-6)
+
+    def segment(self, gray):
+        """
+        Segment the specified grayscale image into the mask of each glyph present, ordered from left to right.
+
+        None is returned if a glyph is cut off by the edge of the crop, as the digits present can not be trusted.
+        """
+        binary = (gray >= self.threshold).astype(np.uint8)
+        count, labels, stats, centroids = cv2.connectedComponentsWithStats(binary, connectivity=4)
+
+        components, edges = [], []
+        for label in range(1, count):
+            x, y, w, h, area = stats[label]
+            # Components touching the edge of the crop are either background, or a glyph that has been cut off.
+            if x == 0 or y == 0 or x + w == gray.shape[1] or y + h == gray.shape[0]:
+                edges.append((y, h))
+            elif area >= self.min_area:
+                components.append((x, y, w, h, label))
+
+        if not components:
+            return []
+
+        # Glyphs share the same height, anything shorter (punctuation, noise) is dropped.
+        tallest = max(h for x, y, w, h, label in components)
+        components = [c for c in sorted(components) if c[3] >= tallest * self.min_height]
+
+        # Any edge component spanning as much of the row of glyphs as a glyph would is a glyph cut off by the edge,
+        # background touching the edge only ever overlaps the row of glyphs slightly.
+        top, bottom = min(c[1] for c in components), max(c[1] + c[3] for c in components)
+        for y, h in edges:
+            if min(bottom, y + h) - max(top, y) >= tallest * self.min_height:
+                return None
+
+        return [labels[y:y + h, x:x + w] == label for x, y, w, h, label in components]
+
+    def normalize(self, mask):
+        """
+        Normalize the specified glyph mask into a vector, the glyph is resized to our template height (preserving its
+        aspect ratio) and centered horizontally.
+        """
+        mask = mask.astype(np.float32)
+        if mask.max() > 1:
+            mask = mask / 255
+
+        width = min(self.size, max(1, int(round(mask.shape[1] * self.size / mask.shape[0]))))
+        resized = cv2.resize(mask, (width, self.size), interpolation=cv2.INTER_AREA)
+
+        normalized = np.zeros((self.size, self.size), dtype=np.float32)
+        offset = (self.size - width) // 2
+        normalized[:, offset:offset + width] = resized
+
+        return normalized.ravel()
+
+    def recognize(self, gray):
+        """
+        Recognize the digits present in the specified grayscale image, returning the digits along with our confidence.
+        An empty string and zero confidence are returned if no glyphs are present, or if a glyph is cut off.
+        """
+        glyphs = self.segment(gray=gray)
+        if not glyphs:
+            return "", 0.0
+
+        scores = self._unit(np.array([self.normalize(mask=glyph) for glyph in glyphs])).dot(self._templates.T)
+        best = scores.argmax(axis=1)
+
+        return "".join(self.digits[index] for index in best), float(scores[np.arange(len(best)), best].min())
+
+    @classmethod
+    def extract(cls, samples, size=DIGIT_TEMPLATE_SIZE):
+        """
+        Extract the template of every digit from the specified samples (a list of grayscale image, expected digits),
+        each template is the average of every normalized glyph of the digit. Samples that do not segment into the
+        expected amount of glyphs are skipped. A dictionary of digit -> template image is returned.
+        """
+        recognizer = cls(templates={}, size=size)
+
+        glyphs = {}
+        for gray, text in samples:
+            segmented = recognizer.segment(gray=gray)
+            if segmented is None or len(segmented) != len(text):
+                continue
+            for digit, glyph in zip(text, segmented):
+                glyphs.setdefault(digit, []).append(recognizer.normalize(mask=glyph))
+
+        return {
+            digit: (np.mean(normalized, axis=0).reshape(size, size) * 255).round().astype(np.uint8)
+            for digit, normalized in glyphs.items()
+        }
+
+
+# Module level recognizer, templates are shared by every bot instance running in this process.
+digits = DigitRecognizer()
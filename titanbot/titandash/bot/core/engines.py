@@ -0,0 +1,405 @@
+from settings import TESSERACT_COMMAND
+
+from .constants import OCR_POOL_SIZE, OCR_CACHE_SIZE, OCR_CACHE_TTL
+
+from collections import namedtuple, OrderedDict
+from threading import Condition, Lock
+
+import os
+import glob
+import ctypes
+import ctypes.util
+import hashlib
+import time
+import pytesseract
+import atexit
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Page segmentation mode treating an image as a single uniform block of text lines.
+LINES_PSM = 6
+
+# Page iterator level representing a single line of text.
+RIL_TEXTLINE = 2
+
+
+class OcrEngineError(Exception):
+    pass
+
+
+class OcrConfig(namedtuple("OcrConfig", ["psm", "oem", "configs", "variables"])):
+    """
+    OcrConfig represents a tesseract command line configuration (ie: "--psm 7 --oem 0 nobatch digits"), the page
+    segmentation mode, engine mode, config files and variables (-c name=value) specified.
+    """
+    @classmethod
+    def parse(cls, config):
+        psm, oem, configs, variables = None, None, [], []
+
+        tokens = iter(config.split())
+        for token in tokens:
+            if token == "--psm":
+                psm = int(next(tokens))
+            elif token == "--oem":
+                oem = int(next(tokens))
+            elif token == "-c":
+                variables.append(tuple(next(tokens).split("=", 1)))
+            else:
+                configs.append(token)
+
+        return cls(psm=psm, oem=oem, configs=tuple(configs), variables=tuple(variables))
+
+    def __str__(self):
+        tokens = []
+        if self.psm is not None:
+            tokens.extend(("--psm", str(self.psm)))
+        if self.oem is not None:
+            tokens.extend(("--oem", str(self.oem)))
+        for name, value in self.variables:
+            tokens.extend(("-c", "{name}={value}".format(name=name, value=value)))
+
+        return " ".join(tokens + list(self.configs))
+
+    @classmethod
+    def lines(cls, config):
+        """
+        Retrieve the specified configuration with its page segmentation mode replaced to treat an image as a block
+        of lines, used when recognizing multiple stitched images at once.
+        """
+        return str(cls.parse(config=config)._replace(psm=LINES_PSM))
+
+
+class PytesseractEngine(object):
+    """
+    PytesseractEngine runs the tesseract binary for every image recognized, used when libtesseract is unavailable.
+    """
+    def __init__(self, config):
+        self.config = config
+
+    def recognize(self, image):
+        return pytesseract.image_to_string(image=image, config=self.config)
+
+    def recognize_lines(self, image):
+        data = pytesseract.image_to_data(image=image, config=self.config, output_type=pytesseract.Output.DICT)
+
+        # Words are grouped into their lines, the bounds of a line are the bounds of its words.
+        lines = {}
+        for index, text in enumerate(data["text"]):
+            if not text.strip():
+                continue
+            line = lines.setdefault((data["block_num"][index], data["par_num"][index], data["line_num"][index]), [[], None, None])
+            line[0].append(text.strip())
+            line[1] = min(data["top"][index], line[1] if line[1] is not None else data["top"][index])
+            line[2] = max(data["top"][index] + data["height"][index], line[2] or 0)
+
+        return [(" ".join(words), top, bottom) for words, top, bottom in lines.values()]
+
+    def close(self):
+        pass
+
+
+class TesseractApiEngine(object):
+    """
+    TesseractApiEngine is a single libtesseract instance (through ctypes), initialized once with its configuration,
+    so that the language model remains loaded between images recognized.
+
+    An engine should only ever be used by a single thread at a time.
+    """
+    # Tesseract assumes 70 dpi for images without a resolution, as our images are written without one by pytesseract.
+    RESOLUTION = 70
+
+    def __init__(self, library, config, datapath=None, language="eng"):
+        self.library = library
+        self.config = config
+
+        parsed = OcrConfig.parse(config=config)
+        configs = (ctypes.c_char_p * len(parsed.configs))(*[c.encode() for c in parsed.configs])
+
+        self.handle = library.TessBaseAPICreate()
+        if library.TessBaseAPIInit1(self.handle, datapath.encode() if datapath else None, language.encode(), 3 if parsed.oem is None else parsed.oem, configs, len(parsed.configs)) != 0:
+            library.TessBaseAPIDelete(self.handle)
+            raise OcrEngineError("libtesseract could not be initialized with config: {config}".format(config=config))
+
+        # Tesseract defaults to fully automatic page segmentation, the same as the command line.
+        library.TessBaseAPISetPageSegMode(self.handle, 3 if parsed.psm is None else parsed.psm)
+        for name, value in parsed.variables:
+            library.TessBaseAPISetVariable(self.handle, name.encode(), value.encode())
+
+    def _set_image(self, image):
+        image = image.convert("L")
+        self.library.TessBaseAPISetImage(self.handle, image.tobytes(), image.width, image.height, 1, image.width)
+        self.library.TessBaseAPISetSourceResolution(self.handle, self.RESOLUTION)
+
+    def recognize(self, image):
+        self._set_image(image=image)
+
+        text = self.library.TessBaseAPIGetUTF8Text(self.handle)
+        try:
+            # Output is stripped, the same as the output returned by pytesseract.
+            return ctypes.string_at(text).decode("utf-8").strip() if text else ""
+        finally:
+            if text:
+                self.library.TessDeleteText(text)
+            self.library.TessBaseAPIClear(self.handle)
+
+    def recognize_lines(self, image):
+        self._set_image(image=image)
+
+        lines = []
+        try:
+            if self.library.TessBaseAPIRecognize(self.handle, None) != 0:
+                return lines
+
+            iterator = self.library.TessBaseAPIGetIterator(self.handle)
+            if not iterator:
+                return lines
+            try:
+                page = self.library.TessResultIteratorGetPageIterator(iterator)
+                left, top, right, bottom = ctypes.c_int(), ctypes.c_int(), ctypes.c_int(), ctypes.c_int()
+                while True:
+                    text = self.library.TessResultIteratorGetUTF8Text(iterator, RIL_TEXTLINE)
+                    if text:
+                        self.library.TessPageIteratorBoundingBox(page, RIL_TEXTLINE, ctypes.byref(left), ctypes.byref(top), ctypes.byref(right), ctypes.byref(bottom))
+                        lines.append((ctypes.string_at(text).decode("utf-8").strip(), top.value, bottom.value))
+                        self.library.TessDeleteText(text)
+                    if not self.library.TessResultIteratorNext(iterator, RIL_TEXTLINE):
+                        break
+            finally:
+                self.library.TessResultIteratorDelete(iterator)
+        finally:
+            self.library.TessBaseAPIClear(self.handle)
+
+        return lines
+
+    def close(self):
+        self.library.TessBaseAPIEnd(self.handle)
+        self.library.TessBaseAPIDelete(self.handle)
+
+
+def load_library(command=TESSERACT_COMMAND):
+    """
+    Load libtesseract from the directory containing our tesseract command (or the system library path), returning
+    the library along with the tessdata directory to use. None is returned if the library could not be loaded.
+    """
+    directory = os.path.dirname(command)
+    candidates = sorted(glob.glob(os.path.join(directory, "libtesseract*.dll")) + glob.glob(os.path.join(directory, "libtesseract*.so*")))
+    candidates.append(ctypes.util.find_library("tesseract"))
+
+    for candidate in [c for c in candidates if c]:
+        try:
+            library = ctypes.CDLL(candidate)
+        except OSError:
+            continue
+
+        c_void_p, c_char_p, c_int = ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int
+        for function, argtypes, restype in (
+            ("TessBaseAPICreate", [], c_void_p),
+            ("TessBaseAPIInit1", [c_void_p, c_char_p, c_char_p, c_int, ctypes.POINTER(c_char_p), c_int], c_int),
+            ("TessBaseAPISetPageSegMode", [c_void_p, c_int], None),
+            ("TessBaseAPISetVariable", [c_void_p, c_char_p, c_char_p], c_int),
+            ("TessBaseAPISetImage", [c_void_p, c_char_p, c_int, c_int, c_int, c_int], None),
+            ("TessBaseAPISetSourceResolution", [c_void_p, c_int], None),
+            ("TessBaseAPIGetUTF8Text", [c_void_p], c_void_p),
+            ("TessDeleteText", [c_void_p], None),
+            ("TessBaseAPIRecognize", [c_void_p, c_void_p], c_int),
+            ("TessBaseAPIGetIterator", [c_void_p], c_void_p),
+            ("TessResultIteratorGetPageIterator", [c_void_p], c_void_p),
+            ("TessResultIteratorGetUTF8Text", [c_void_p, c_int], c_void_p),
+            ("TessResultIteratorNext", [c_void_p, c_int], c_int),
+            ("TessResultIteratorDelete", [c_void_p], None),
+            ("TessPageIteratorBoundingBox", [c_void_p, c_int, ctypes.POINTER(c_int), ctypes.POINTER(c_int), ctypes.POINTER(c_int), ctypes.POINTER(c_int)], c_int),
+            ("TessBaseAPIClear", [c_void_p], None),
+            ("TessBaseAPIEnd", [c_void_p], None),
+            ("TessBaseAPIDelete", [c_void_p], None),
+        ):
+            getattr(library, function).argtypes = argtypes
+            getattr(library, function).restype = restype
+
+        tessdata = os.path.join(directory, "tessdata")
+        return library, tessdata if os.path.isdir(tessdata) else None
+
+    return None
+
+
+class OcrCache(object):
+    """
+    OcrCache stores the text recognized for each processed image, keyed by a hash of the image contents along with
+    the ocr configuration used, so that an unchanged image is never recognized twice. Results expire once older than
+    the specified ttl (in seconds), the least recently used results are dropped once the cache is full.
+    """
+    def __init__(self, size=OCR_CACHE_SIZE, ttl=OCR_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+
+        self._results = OrderedDict()
+        self._lock = Lock()
+
+        # Counters used to determine how effective our cache is.
+        self.counts = {"lookups": 0, "hits": 0}
+
+    @staticmethod
+    def key(image, config):
+        """
+        Generate the key of the specified image (contents, dimensions and mode) and ocr configuration.
+        """
+        digest = hashlib.blake2b(image.tobytes(), digest_size=16)
+        digest.update("{mode}:{size}:{config}".format(mode=image.mode, size=image.size, config=config).encode())
+
+        return digest.digest()
+
+    def get(self, key):
+        """
+        Retrieve the cached result of the specified key, None is returned if no valid result is cached.
+        """
+        with self._lock:
+            self.counts["lookups"] += 1
+
+            cached = self._results.get(key)
+            if cached is None:
+                return None
+            if time.time() - cached[0] > self.ttl:
+                del self._results[key]
+                return None
+
+            self._results.move_to_end(key)
+            self.counts["hits"] += 1
+
+            return cached[1]
+
+    def set(self, key, result):
+        """
+        Cache the result of the specified key.
+        """
+        with self._lock:
+            self._results[key] = time.time(), result
+            self._results.move_to_end(key)
+            if len(self._results) > self.size:
+                self._results.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+    @property
+    def rates(self):
+        """
+        Retrieve the amount of lookups performed and the hit rate of our cache.
+        """
+        return {
+            "lookups": self.counts["lookups"],
+            "hit_rate": self.counts["hits"] / (self.counts["lookups"] or 1)
+        }
+
+
+class OcrEnginePool(object):
+    """
+    OcrEnginePool keeps long lived ocr engines, keyed by their configuration, shared by every bot instance running in
+    this process. Each configuration has at most the specified amount of engines, engines are created on demand and
+    are re-used once released.
+
+    Engines use libtesseract when available, otherwise the tesseract command is executed for every image recognized.
+    Results are returned from our cache (if present) when the same image is recognized with the same configuration.
+    """
+    def __init__(self, size=OCR_POOL_SIZE, factory=None, cache=None):
+        self.size = size
+        self.factory = factory or self._create
+        self.cache = cache
+
+        self._library = None
+        self._idle = {}
+        self._created = {}
+        self._condition = Condition()
+
+        # Counters used to determine the amount of engines created and images recognized.
+        self.counts = {"engines": 0, "recognized": 0}
+
+    def _create(self, config):
+        if self._library is None:
+            self._library = load_library() or False
+            if not self._library:
+                logger.info("libtesseract is unavailable, ocr will be performed through the tesseract command.")
+
+        if self._library:
+            try:
+                return TesseractApiEngine(library=self._library[0], config=config, datapath=self._library[1])
+            except OcrEngineError as exc:
+                logger.warning("{exc}, falling back to the tesseract command.".format(exc=exc))
+
+        return PytesseractEngine(config=config)
+
+    def acquire(self, config):
+        """
+        Acquire an engine for the specified configuration, waiting for one to be released if our limit is reached.
+        """
+        with self._condition:
+            idle = self._idle.setdefault(config, [])
+            while not idle and self._created.get(config, 0) >= self.size:
+                self._condition.wait()
+            if idle:
+                return idle.pop()
+
+            self._created[config] = self._created.get(config, 0) + 1
+            self.counts["engines"] += 1
+
+        try:
+            return self.factory(config)
+        except Exception:
+            with self._condition:
+                self._created[config] -= 1
+                self.counts["engines"] -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, engine):
+        with self._condition:
+            self._idle.setdefault(engine.config, []).append(engine)
+            self.counts["recognized"] += 1
+            self._condition.notify()
+
+    def _recognize(self, image, config, lines=False):
+        key = self.cache.key(image=image, config="{lines}:{config}".format(lines=lines, config=config)) if self.cache else None
+        if key is not None:
+            cached = self.cache.get(key=key)
+            if cached is not None:
+                return cached
+
+        engine = self.acquire(config=config)
+        try:
+            result = engine.recognize_lines(image) if lines else engine.recognize(image)
+        finally:
+            self.release(engine=engine)
+
+        if key is not None:
+            self.cache.set(key=key, result=result)
+        return result
+
+    def image_to_string(self, image, config=""):
+        """
+        Recognize the text present in the specified image, using an engine for the specified configuration.
+        """
+        return self._recognize(image=image, config=config)
+
+    def image_to_lines(self, image, config=""):
+        """
+        Recognize every line of text present in the specified image, using an engine for the specified configuration.
+        A list of (text, top, bottom) is returned for each line recognized.
+        """
+        return self._recognize(image=image, config=config, lines=True)
+
+    def close(self):
+        """
+        Close every idle engine present in the pool.
+        """
+        with self._condition:
+            for config, idle in self._idle.items():
+                for engine in idle:
+                    engine.close()
+                self._created[config] = self._created.get(config, 0) - len(idle)
+                idle.clear()
+
+
+# Module level pool, shared by every bot instance running in this process.
+engines = OcrEnginePool(cache=OcrCache())
+atexit.register(engines.close)
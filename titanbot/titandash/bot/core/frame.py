@@ -0,0 +1,157 @@
+from PIL import Image
+
+import cv2
+import numpy as np
+
+
+class Frame(object):
+    """
+    Frame wraps a single contiguous uint8 array (BGR) captured from the game window.
+
+    Grayscale and cropped views of the frame are computed lazily, and only once. Cropped frames share
+    their memory with the parent frame, and derive their grayscale view from the parents when available,
+    so that a single color conversion serves every region searched within a capture.
+
+    Conversion to a PIL Image should only take place at the edges that truly need one (saving
+    screenshots, perceptual hashing, tesseract).
+    """
+    def __init__(self, array, parent=None, box=None):
+        self.array = array if parent is not None else np.ascontiguousarray(array, dtype=np.uint8)
+        self.parent = parent
+        self.box = box
+
+        self._gray = None
+        self._crops = {}
+        self._scaled = {}
+
+    def __repr__(self):
+        return "<Frame: {width}x{height}>".format(width=self.width, height=self.height)
+
+    @classmethod
+    def from_image(cls, image):
+        """
+        Create a new frame from the specified PIL Image.
+        """
+        return cls(array=np.array(image.convert("RGB"))[:, :, ::-1])
+
+    @property
+    def width(self):
+        return self.array.shape[1]
+
+    @property
+    def height(self):
+        return self.array.shape[0]
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    @property
+    def gray(self):
+        """
+        Retrieve the grayscale view of this frame, computed once when first accessed.
+        """
+        if self._gray is None:
+            if self.parent is not None and self.parent._gray is not None:
+                self._gray = self.parent._gray[self.box[1]:self.box[3], self.box[0]:self.box[2]]
+            else:
+                self._gray = cv2.cvtColor(self.array, cv2.COLOR_BGR2GRAY)
+
+        return self._gray
+
+    def gray_scaled(self, factor):
+        """
+        Retrieve the grayscale view of this frame, downscaled by the specified factor. Computed once per factor.
+        """
+        if factor not in self._scaled:
+            self._scaled[factor] = cv2.resize(
+                self.gray, (self.width // factor, self.height // factor),
+                interpolation=cv2.INTER_AREA
+            )
+
+        return self._scaled[factor]
+
+    @property
+    def bgr(self):
+        return self.array
+
+    @property
+    def rgb(self):
+        return self.array[:, :, ::-1]
+
+    @property
+    def image(self):
+        """
+        Convert this frame into a PIL Image. A new image is generated on every access.
+        """
+        return Image.fromarray(np.ascontiguousarray(self.rgb))
+
+    def crop(self, box):
+        """
+        Crop the specified box (x1, y1, x2, y2) from this frame, crops are cached so that repeated
+        crops of the same region return the same frame.
+        """
+        box = tuple(int(b) for b in box)
+
+        if box not in self._crops:
+            self._crops[box] = Frame(
+                array=self.array[box[1]:box[3], box[0]:box[2]],
+                parent=self,
+                box=box
+            )
+
+        return self._crops[box]
+
+    def getpixel(self, point):
+        """
+        Retrieve the RGB color of the specified point (x, y) in this frame.
+        """
+        b, g, r = self.array[point[1], point[0]]
+        return int(r), int(g), int(b)
+
+    def getpixels(self, points):
+        """
+        Retrieve the RGB colors of many points (x, y) in this frame at once, as an (N, 3) array.
+        """
+        points = np.asarray(points, dtype=np.intp).reshape(-1, 2)
+        return self.rgb[points[:, 1], points[:, 0]]
+
+    def resize(self, downsize):
+        """
+        Generate a new frame downsized by the specified factor.
+        """
+        return Frame(array=cv2.resize(
+            self.array, (int(self.width / downsize), int(self.height / downsize)),
+            interpolation=cv2.INTER_AREA
+        ))
+
+    def copy(self):
+        return Frame(array=self.array.copy())
+
+    def save(self, fp, **kwargs):
+        """
+        Save this frame to the specified file, through our PIL Image conversion.
+        """
+        self.image.save(fp, **kwargs)
+
+
+def as_frame(image):
+    """
+    Coerce the specified image (Frame, PIL Image, numpy array) into a frame.
+    """
+    if image is None or isinstance(image, Frame):
+        return image
+    if isinstance(image, np.ndarray):
+        return Frame(array=image)
+
+    return Frame.from_image(image=image)
+
+
+def as_image(image):
+    """
+    Coerce the specified image (Frame, PIL Image) into a PIL Image.
+    """
+    if isinstance(image, Frame):
+        return image.image
+
+    return image
@@ -1,54 +1,250 @@
 from titandash.bot.external.imagesearch import *
 
+from .constants import FRAME_MAX_AGE, CAPTURE_MAX_AGE
+from .anchors import anchors
+from .capture import CaptureTimeout
+from .frame import as_frame
+from .templates import registry
+
+from contextlib import contextmanager
+
+import threading
+import time
+import numpy as np
+
+
+class FrameContext:
+    """
+    FrameContext encapsulates a single capture of the game window. Every search, color check and region crop
+    performed while the context is active is evaluated against that one capture.
+
+    The capture is expired whenever the bot performs an action that changes the screen (clicks, drags), or once
+    it becomes older than the maximum frame age, the next access will then take a new capture.
+    """
+    def __init__(self, grabber):
+        self.grabber = grabber
+        self.image = None
+        self.timestamp = None
+
+    @property
+    def stale(self):
+        return self.image is None or time.time() - self.timestamp > FRAME_MAX_AGE
+
+    def refresh(self):
+        """
+        Explicitly take a new capture of the window for use by this context.
+        """
+        self.image = self.grabber.capture_window()
+        self.timestamp = time.time()
+
+        return self.image
+
+    def expire(self):
+        """
+        Expire the current capture, forcing the next access to take a new one.
+        """
+        self.image = None
+
+    def get(self):
+        """
+        Retrieve the current capture, taking a new one if the current one is stale.
+        """
+        if self.stale:
+            self.refresh()
+
+        return self.image
+
+    def crop(self, region):
+        """
+        Crop the specified region from the current capture.
+        """
+        return self.get().crop(box=region)
+
+    def search(self, image, region=None, precision=0.8, bool_only=False, return_image=False, pyramid=False, reorder=None):
+        """
+        Search the current capture for the specified image (or list of images).
+        """
+        return self.grabber.search(image=image, region=region, precision=precision, bool_only=bool_only, return_image=return_image, pyramid=pyramid, reorder=reorder)
+
+    def search_many(self, images, regions=None, precision=0.8, first=True):
+        """
+        Search the current capture for many images at once.
+        """
+        return self.grabber.search_many(images=images, regions=regions, precision=precision, first=first)
+
+    def pixel(self, point, color=None, color_range=None):
+        """
+        Determine if the specified point in the current capture is a specific color.
+        """
+        return self.grabber.point_is_color(point=point, color=color, color_range=color_range)
+
+    def probe(self, points, colors=None, color_ranges=None):
+        """
+        Determine if each of the specified points in the current capture is a specific color.
+        """
+        return self.grabber.probe(points=points, colors=colors, color_ranges=color_ranges)
+
 
 class Grabber:
     """
     Grabber class provides functionality to capture a portion of the screen, based on the height
     and width that the emulator should be set to.
+
+    Captures are represented as Frame objects, see frame.py.
     """
-    def __init__(self, window, logger):
+    def __init__(self, window, logger, regions=None, ordering=None, cache=None, capture=None, pool=None, telemetry=None):
         # Base height and width, resolution of game.
         self.window = window
         self.logger = logger
 
-        # Screen is updated and set to the result of an image
-        # grab as needed through the snapshot method.
-        self.current = None
+        # Frame contexts and captures are local to the thread that opened/took them, our scheduled
+        # functions run in a separate thread and should never re-use the main loops capture.
+        self._local = threading.local()
+
+        # Learned regions (see regions.py) are checked before searching the full window, if present.
+        self.regions = regions
+        # Candidate ordering (see ordering.py) orders lists of images being searched for, if present.
+        self.ordering = ordering
+        # Search cache (see changes.py) re-uses search results while the screen remains unchanged, if present.
+        self.cache = cache
+        # Capture thread (see capture.py) captures the window in the background, if present.
+        self.capture = capture
+        # Vision pool (see workers.py) that batched searches and ocr preprocessing are offloaded to, if present.
+        self.pool = pool
+        # Search telemetry (see telemetry.py) that every search performed through this grabber is recorded into, if present.
+        self.telemetry = telemetry
+
+        # Time of the last action that modified the screen, captures taken
+        # by our capture thread before this time are never used.
+        self._expired = 0.0
+
+    @property
+    def current(self):
+        """
+        Retrieve the capture most recently taken (or searched) in this thread. Screen is updated and set to
+        the result of an image grab as needed through the snapshot method.
+        """
+        return getattr(self._local, "current", None)
+
+    @current.setter
+    def current(self, value):
+        self._local.current = value
+
+    @property
+    def active(self):
+        """
+        Retrieve the frame context currently active in this thread, if one is present.
+        """
+        return getattr(self._local, "frame", None)
+
+    @contextmanager
+    def frame(self):
+        """
+        Open a frame context, capturing the window once and evaluating every search, color check and region
+        crop against that capture until the context is closed.
+
+        Nested contexts share the capture of the outermost context.
+
+        Usage:
+
+        with grabber.frame() as f:
+            f.search(...)
+            f.pixel(...)
+        """
+        if self.active:
+            yield self.active
+            return
+
+        self._local.frame = FrameContext(grabber=self)
+        try:
+            yield self._local.frame
+        finally:
+            self._local.frame = None
 
-    def snapshot(self, region=None, downsize=None):
+    def expire(self, after=False):
+        """
+        Expire the active frame context capture (if one is active). Should be called before an action is performed
+        that would modify the current screen, and again with after as True once the action has been performed.
+
+        Captures published by our capture thread are only used if they began after the last action was performed,
+        a capture beginning while the action is being sent would still show the screen before the action.
+        """
+        if after:
+            self._expired = time.time()
+        if self.active:
+            self.active.expire()
+
+    def capture_window(self, region=None):
+        """
+        Capture the window, using the latest capture published by our capture thread when one is running. Captures
+        must be taken after the last action performed, and must not be older than the maximum capture age.
+        """
+        if self.capture and self.capture.is_alive():
+            try:
+                frame = self.capture.since(timestamp=max(self._expired, time.time() - CAPTURE_MAX_AGE)).frame
+                return frame.crop(box=region) if region else frame
+            except CaptureTimeout:
+                self.logger.debug("no capture was published in time, capturing the window directly...")
+
+        return self.window.screenshot(region=region)
+
+    def snapshot(self, region=None, downsize=None, fresh=False):
         """
         Take a snapshot of the current game session, based on the width and height of the grabber unless
         an explicit region is specified to use to take a screen-shot with.
+
+        If a frame context is currently active, the snapshot is taken from the context's capture instead.
+
+        Specifying fresh as True ensures the snapshot is taken after this call, no existing capture is re-used.
         """
-        if not region:
-            self.current = self.window.screenshot()
+        if fresh:
+            self.expire(after=True)
+        if self.active:
+            self.current = self.active.get() if not region else self.active.crop(region=region)
         else:
-            self.current = self.window.screenshot(region=region)
+            self.current = self.capture_window(region=region)
 
         # Optionally, we can downsize the image grabbed, may improve performance
         # if we are grabbing or parsing many images and want them to be smaller sizes.
         if downsize:
-            self.current.thumbnail((
-                self.current.width / downsize,
-                self.current.height / downsize
-            ))
+            self.current = self.current.resize(downsize=downsize)
 
         return self.current
 
-    def search(self, image, region=None, precision=0.8, bool_only=False, testing=False, im=None, return_image=False):
+    def search(self, image, region=None, precision=0.8, bool_only=False, testing=False, im=None, return_image=False, pyramid=False, reorder=None):
         """
         Search the specified image for another image with a specified amount of precision.
 
         Specifying bool_only as True will only return whether or not the image is found.
 
+        Specifying reorder as True will search a list of images in the order they are most often found in, instead
+        of the order specified. Lists are reordered by default when bool_only is True, since the image found does
+        not matter. The image returned is always the image that was actually found.
+
+        Specifying pyramid as True will search coarse to fine (see imagesearcharea).
+
         The testing boolean is used to aid the unit tests to use mock images as a snapshot instead
         of the actual screen.
         """
-        if not testing:
-            self.snapshot()
-
         found = False
         position = -1, -1
+        cache_key = cached = None
+
+        if im is None:
+            if not testing:
+                self.snapshot()
+
+            # A single capture is used for our search, regions are cropped
+            # from the capture instead of taking another screenshot.
+            im = self.current = as_frame(self.current)
+
+            # Searches against our own captures are cached until the screen changes.
+            if self.cache:
+                cache_key = tuple(image) if isinstance(image, list) else image, region, precision, pyramid, bool_only or reorder
+                cached = self.cache.get(frame=im, key=cache_key, region=region)
+
+            if region:
+                im = im.crop(box=region)
 
         search_kwargs = {
             "x1": region[0] if region else self.window.x,
@@ -56,20 +252,35 @@ class Grabber:
             "x2": region[2] if region else self.window.width,
             "y2": region[3] if region else self.window.height,
             "precision": precision,
-            "im": im if region else self.current if not im else im,
-            "logger": self.logger
+            "im": im,
+            "logger": self.logger,
+            "pyramid": pyramid,
+            "telemetry": self.telemetry
         }
 
-        # If a list of images to be searched for is being used, loop through and search.
-        # The first image specified that is found breaks the loop.
-        if isinstance(image, list):
-            for _image in image:
-                position = imagesearcharea(window=self.window, image=_image, **search_kwargs)
-                if position[0] != -1:
-                    image = _image  # Set inline var to main for logging purposes.
-                    break
+        # Cached results are used as is, no searching is required.
+        if cached:
+            image, position = cached
+        # If a list of images to be searched for is being used, every image is searched
+        # for at once, the first image specified that is found is used.
+        elif isinstance(image, list):
+            images = image
+            ordered = self.ordering.order(images=images) if self.ordering and (bool_only if reorder is None else reorder) else images
+
+            hits = self._search_list(images=ordered, im=im, region=region, precision=precision)
+            if hits:
+                image, position = hits[0][0], hits[0][1]  # Set inline var to main for logging purposes.
+            if ordered is not images:
+                self.ordering.record(images=images, ordered=ordered, image=hits[0][0] if hits else None)
         else:
-            position = imagesearcharea(window=self.window, image=image, **search_kwargs)
+            # Anchored images are checked at their anchor first, a full search
+            # is only performed when the anchor check is inconclusive.
+            anchored, position = anchors.check(frame=im, image=image) if not region else (None, position)
+            if anchored is None:
+                position = self._search_learned(image=image, im=im, region=region, search_kwargs=search_kwargs)
+
+        if cache_key and not cached:
+            self.cache.set(frame=self.current, key=cache_key, result=(image, position), region=region)
 
         if position[0] != -1:
             self.logger.debug("{image_name} was successfully found on the screen...".format(image_name=image.split("/")[-1]))
@@ -88,26 +299,104 @@ class Grabber:
 
         return found, position
 
-    def point_is_color(self, point, color=None, color_range=None):
+    def _search_list(self, images, im, region, precision):
         """
-        Given a specified point, determine if that point is currently a specific color.
+        Search for the first image found (in the order specified) in the specified list of images. Anchored
+        images are resolved through their anchor, only the remaining images are actually searched for.
         """
-        if color and color_range:
-            raise ValueError("Only one of color or color_range may be present, but not both.")
+        pending = []
+        for image in images:
+            anchored, position = anchors.check(frame=im, image=image) if not region else (None, (-1, -1))
+            if anchored:
+                # Images after a conclusively found anchor never take priority over it.
+                hits = imagesearchbatch(images=pending, im=im, precision=precision, first=True, pool=self.pool, telemetry=self.telemetry) if pending else []
+                return hits or [(image, position, None)]
+            if anchored is None:
+                pending.append(image)
+
+        return imagesearchbatch(images=pending, im=im, precision=precision, first=True, pool=self.pool, telemetry=self.telemetry) if pending else []
+
+    def _search_learned(self, image, im, region, search_kwargs):
+        """
+        Search for a single image, checking the region the image has been found in previously first (when
+        searching the full window), falling back to the full window on a miss.
+        """
+        learned = self.regions.region(image=image) if self.regions and not region else None
+        position = -1, -1
+
+        if learned:
+            position = imagesearcharea(window=self.window, image=image, **dict(search_kwargs, im=as_frame(im).crop(box=learned)))
+            self.regions.count(region=learned, hit=position[0] != -1)
+            if position[0] != -1:
+                position = position[0] + learned[0], position[1] + learned[1]
+        if position[0] == -1:
+            position = imagesearcharea(window=self.window, image=image, **search_kwargs)
+        if self.regions and not region and position[0] != -1:
+            template = registry.get(image)
+            self.regions.record(image=image, position=position, width=template.width, height=template.height)
+
+        return position
+
+    def search_many(self, images, regions=None, precision=0.8, first=True, testing=False, im=None):
+        """
+        Search for many images at once, each image is optionally searched for within its own region.
+
+        Every image is matched in parallel against a single capture. Specifying first as True returns the first
+        image found (in the order specified), otherwise every image found is returned along with its score.
+
+        Returns a list of (image, position, score) tuples for each image found.
+        """
+        if im is None:
+            if not testing:
+                self.snapshot()
+            im = self.current = as_frame(self.current)
+
+        found = imagesearchbatch(images=images, im=im, regions=regions, precision=precision, first=first, pool=self.pool, telemetry=self.telemetry)
+        for image, position, score in found:
+            self.logger.debug("{image_name} was successfully found on the screen ({score:.2f})...".format(image_name=image.split("/")[-1], score=score))
+
+        return found
 
-        self.snapshot()
+    def probe(self, points, colors=None, color_ranges=None, testing=False, im=None):
+        """
+        Given many points, determine if each point is currently a specific color, or within a specific color range.
+
+        Every point is evaluated against a single capture at once. A single color (or color range) may be specified
+        to check every point against, or one color (or color range) per point.
+
+        Returns a boolean array, one value per point specified.
+        """
+        if (colors is None) == (color_ranges is None):
+            raise ValueError("Exactly one of colors or color_ranges must be present.")
 
-        pt = self.current.getpixel(point)
+        if im is None:
+            if not testing:
+                self.snapshot()
+            im = self.current = as_frame(self.current)
 
-        # No padding or modification is required for our color check.
+        # No padding or modification is required for our color checks.
         # Since we are using the snapshot functionality, which takes into
-        # account our emulator position and title bar height. The point being used
-        # is in relation to the "current" image which already is padded properly.
-        if color:
-            return pt == color
+        # account our emulator position and title bar height. The points being used
+        # are in relation to the "current" image which already is padded properly.
+        pixels = as_frame(im).getpixels(points=points).astype(np.int16)
+
+        if colors is not None:
+            return (pixels == np.asarray(colors, dtype=np.int16).reshape(-1, 3)).all(axis=1)
 
         # Checking for a color range allows for a bit of irregularity in the colors present
         # at a certain location, this is mostly done to check for very different colors,
         # for example, when perks are active, they are greyed out, and blue when available.
-        if color_range:
-            return color_range[0][0] <= pt[0] <= color_range[0][1] and color_range[1][0] <= pt[1] <= color_range[1][1] and color_range[2][0] <= pt[2] <= color_range[2][1]
+        # Color ranges are specified as ((r_min, r_max), (g_min, g_max), (b_min, b_max)).
+        ranges = np.asarray(color_ranges, dtype=np.int16).reshape(-1, 3, 2)
+        return ((ranges[:, :, 0] <= pixels) & (pixels <= ranges[:, :, 1])).all(axis=1)
+
+    def point_is_color(self, point, color=None, color_range=None):
+        """
+        Given a specified point, determine if that point is currently a specific color.
+        """
+        if color and color_range:
+            raise ValueError("Only one of color or color_range may be present, but not both.")
+        if not color and not color_range:
+            return None
+
+        return bool(self.probe(points=[point], colors=color or None, color_ranges=color_range or None)[0])
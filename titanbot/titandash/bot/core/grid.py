@@ -0,0 +1,86 @@
+from .frame import as_frame
+from .templates import registry
+
+import time
+import cv2
+import numpy as np
+
+
+class GridScanner(object):
+    """
+    GridScanner checks every slot of a panel (heroes, equipment) for a set of templates against a single capture.
+
+    Slots are a list of dictionaries (field -> region), checks are a dictionary (name -> (field, image)). The region
+    of a field in every slot is cropped and stacked into a single image, so that each template is matched once for
+    all slots, rather than once per slot. Only the locations lying entirely within a single slot are considered, the
+    score of each slot is identical to matching the template against that slots region alone.
+
+    Every slot searched is recorded into the search telemetry specified (see telemetry.py), if present.
+    """
+    def __init__(self, slots, checks, precision=0.8, telemetry=None):
+        self.slots = slots
+        self.checks = checks
+        self.precision = precision
+        self.telemetry = telemetry
+
+    def _stack(self, gray, field):
+        """
+        Stack the region of the specified field from every slot vertically, returning the stacked image and the
+        (y, width, height) of each slot within it. Narrower regions are padded on their right.
+        """
+        regions = [slot[field] for slot in self.slots]
+        sizes = [(region[2] - region[0], region[3] - region[1]) for region in regions]
+
+        stacked = np.zeros((sum(h for w, h in sizes), max(w for w, h in sizes)), dtype=np.uint8)
+        positions = []
+        y = 0
+        for region, (w, h) in zip(regions, sizes):
+            stacked[y:y + h, :w] = gray[region[1]:region[3], region[0]:region[2]]
+            positions.append((y, w, h))
+            y += h
+
+        return stacked, positions
+
+    def scores(self, frame):
+        """
+        Retrieve the best score of every check for every slot in the specified frame, as a dictionary of
+        name -> list of scores (one per slot). Templates that do not fit within a slot score -1.
+        """
+        gray = as_frame(frame).gray
+        stacks = {}
+        scores = {}
+
+        for name, (field, image) in self.checks.items():
+            if field not in stacks:
+                stacks[field] = self._stack(gray=gray, field=field)
+            stacked, positions = stacks[field]
+
+            start = time.perf_counter()
+            template = registry.get(image).gray
+            th, tw = template.shape
+
+            try:
+                result = cv2.matchTemplate(stacked, template, cv2.TM_CCOEFF_NORMED)
+            except cv2.error:
+                result = None
+
+            # Locations are limited to those where the template lies within the slot.
+            scores[name] = [
+                float(result[y:y + h - th + 1, :w - tw + 1].max()) if result is not None and h >= th and w >= tw else -1.0
+                for y, w, h in positions
+            ]
+
+            latency = (time.perf_counter() - start) / len(positions)
+            if self.telemetry:
+                for (y, w, h), score in zip(positions, scores[name]):
+                    self.telemetry.record(image=image, size=(w, h), score=score, precision=self.precision, latency=latency)
+
+        return scores
+
+    def scan(self, frame):
+        """
+        Scan the specified frame, returning a table (list) with a row for every slot, each row is a dictionary of
+        name -> boolean, representing whether or not each check was found within the slot.
+        """
+        scores = self.scores(frame=frame)
+        return [{name: scores[name][index] >= self.precision for name in self.checks} for index in range(len(self.slots))]
@@ -62,6 +62,13 @@ GAME_LOCS = {
             # Click on spot where equipment appears.
             (355, 411),
         ),
+        # Points that are always tapped when tapping is guided by detected targets,
+        # these are the static points of the fairies map below the sky band.
+        "tap_drops": (
+            (285, 366),
+            (110, 411),
+            (355, 411),
+        ),
         "collect_clan_crate": (70, 131),
     },
     "MINIGAMES": {
@@ -409,6 +416,33 @@ IMAGES = {
     }
 }
 
+# Anchored images only ever appear at a known position in game, the top left corner of each
+# position is stored here. Anchored images are verified through a fingerprint check of
+# these positions before a full search is ever performed (see anchors.py).
+ANCHORS = {
+    IMAGES["GENERIC"]["collapse_panel"]: ((361, 3),),
+    IMAGES["GENERIC"]["expand_panel"]: ((359, 439),),
+    IMAGES["GENERIC"]["master_active"]: ((19, 764),),
+    IMAGES["GENERIC"]["heroes_active"]: ((108, 764),),
+    IMAGES["GENERIC"]["equipment_active"]: ((182, 764),),
+    IMAGES["GENERIC"]["pets_active"]: ((266, 761),),
+    IMAGES["GENERIC"]["artifacts_active"]: ((345, 763),),
+    IMAGES["GENERIC"]["shop_active"]: ((421, 761),),
+    IMAGES["NO_PANELS"]["icon_boss"]: ((424, 16),),
+    IMAGES["NO_PANELS"]["settings"]: ((12, 5),),
+    IMAGES["NO_PANELS"]["tournament"]: ((11, 54),),
+}
+
+# Additional anchored images used only when classifying the current game screen (see screens.py). These
+# images may appear elsewhere in game, so they are not used to anchor regular searches.
+SCREEN_ANCHORS = {
+    IMAGES["ADS"]["no_thanks"]: ((45, 579),),
+    IMAGES["MASTER"]["confirm_prestige"]: ((178, 610),),
+}
+
+# Templates of each digit written in the games font.
+DIGIT_MAP = {str(digit): IMAGE_DIR + "/digits/{digit}.png".format(digit=digit) for digit in range(10)}
+
 # All coordinates mapped to their respective resolutions for grabbing
 # each stat image that will be parsed by pytesseract.
 STATS_COORDS = {
@@ -537,7 +571,15 @@ TOURNAMENT_COORDS = {
 }
 
 PANEL_COORDS = {
-    "panel_check": (0, 550, 232, 762)
+    "panel_check": (0, 550, 232, 762),
+    # Scrolling contents of an expanded panel (below any panel header), taller than a full drag of the panel
+    # so that the shift of the panel can be determined after each drag.
+    "panel_scroll": (0, 180, 232, 762),
+}
+
+# The sky band covered by the fairies map, targets are only detected (and tapped) within this region.
+TAP_COORDS = {
+    "sky_band": (60, 76, 456, 212)
 }
 
 # The regions for each skill present on the master screen if the panel
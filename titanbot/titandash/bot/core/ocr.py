@@ -0,0 +1,69 @@
+from .constants import OCR_STITCH_GAP
+
+import numpy as np
+import cv2
+
+
+def preprocess(gray, scale=1, threshold=None, invert=False):
+    """
+    Prepare a grayscale image for OCR extraction, the image is scaled and optionally thresholded (blobs smaller
+    than the threshold are removed) and inverted. The processed grayscale image is returned.
+    """
+    image = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+
+    # Performing thresholds on the image if it's enabled.
+    # Threshold will ensure that certain colored pieces are removed.
+    if threshold:
+        retr, image = cv2.threshold(image, 230, 255, cv2.THRESH_BINARY)
+        contours, hier = cv2.findContours(image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        # Drawing black over any contours smaller than our specified threshold.
+        # Removing the un-wanted blobs from the image grabbed.
+        for contour in contours:
+            if cv2.contourArea(contour) < threshold:
+                cv2.drawContours(image, [contour], 0, (0,), -1)
+
+    if invert:
+        image = cv2.bitwise_not(image)
+
+    return image
+
+
+def stitch(images, gap=OCR_STITCH_GAP):
+    """
+    Stack the specified processed images (a dictionary of key -> image) vertically into a single image, separated by
+    the specified gap, so that every image can be recognized in a single ocr pass. Each image is padded with its own
+    background (the median of its border) up to the widest image.
+
+    The stitched grayscale image is returned along with the vertical band (top, bottom) occupied by each key.
+    """
+    arrays = {key: np.asarray(image.convert("L") if hasattr(image, "convert") else image) for key, image in images.items()}
+    width = max(array.shape[1] for array in arrays.values()) + gap * 2
+
+    rows, bands, top = [], {}, 0
+    for key, array in arrays.items():
+        border = np.concatenate((array[0], array[-1], array[:, 0], array[:, -1]))
+        band = np.full((array.shape[0] + gap * 2, width), np.median(border), dtype=np.uint8)
+        band[gap:gap + array.shape[0], gap:gap + array.shape[1]] = array
+
+        rows.append(band)
+        bands[key] = (top + gap, top + gap + array.shape[0])
+        top += band.shape[0]
+
+    return np.vstack(rows), bands
+
+
+def assign(lines, bands):
+    """
+    Assign each recognized line (text, top, bottom) to the band containing the vertical center of the line, returning
+    a dictionary of key -> text. Keys without any lines within their band receive an empty string.
+    """
+    texts = {key: [] for key in bands}
+    for text, top, bottom in sorted(lines, key=lambda line: line[1]):
+        center = (top + bottom) / 2
+        for key, (band_top, band_bottom) in bands.items():
+            if band_top <= center <= band_bottom:
+                texts[key].append(text.strip())
+                break
+
+    return {key: " ".join(t for t in text if t) for key, text in texts.items()}
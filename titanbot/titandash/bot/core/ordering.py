@@ -0,0 +1,155 @@
+from settings import IMAGE_DIR, LOCAL_DATA_ORDERING_FILE
+
+from .constants import ORDERING_DECAY, ORDERING_EXPLORE_INTERVAL, LEARNED_REGION_SAVE_INTERVAL
+
+from threading import Lock
+
+import os
+import json
+import time
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+
+class CandidateOrdering(object):
+    """
+    CandidateOrdering keeps hit counters for every list of images searched for, ordering each list so that
+    the images found most often are searched for first.
+
+    The list an image belongs to is identified by the images it contains (in their original order), so each
+    call site searching for a different list of images is ordered independently. Hit statistics are persisted
+    to the users titandash directory and are included in the debug report.
+    """
+    def __init__(self, path=LOCAL_DATA_ORDERING_FILE, decay=ORDERING_DECAY, explore=ORDERING_EXPLORE_INTERVAL):
+        self.path = path
+        self.decay = decay
+        self.explore = explore
+
+        self._lists = {}
+        self._lock = Lock()
+        self._saved = time.time()
+
+        self.load()
+
+    @staticmethod
+    def key(images):
+        """
+        Generate the key used to identify the specified list of images.
+        """
+        return "|".join(os.path.relpath(image, IMAGE_DIR).replace("\\", "/") for image in images)
+
+    def _get(self, key):
+        if key not in self._lists:
+            self._lists[key] = {
+                "searches": 0,
+                "misses": 0,
+                "position": 0,
+                "position_original": 0,
+                "hits": {k: 0 for k in key.split("|")},
+                "scores": {k: 0.0 for k in key.split("|")},
+            }
+
+        return self._lists[key]
+
+    def order(self, images):
+        """
+        Order the specified list of images by how often each image is found (most often first). Ties retain
+        their original order. Every exploration interval, the original order is returned instead.
+        """
+        key = self.key(images)
+        stats = self._get(key=key)
+
+        if stats["searches"] % self.explore == self.explore - 1:
+            return list(images)
+
+        scores = [stats["scores"].get(k, 0.0) for k in key.split("|")]
+        return [image for i, image in sorted(enumerate(images), key=lambda i: (-scores[i[0]], i[0]))]
+
+    def record(self, images, ordered, image):
+        """
+        Record the result of searching for the specified list of images (searched in the specified order),
+        image should be the image found, or None if none of the images were found.
+        """
+        key = self.key(images)
+
+        with self._lock:
+            stats = self._get(key=key)
+            stats["searches"] += 1
+
+            for k in stats["scores"]:
+                stats["scores"][k] *= self.decay
+
+            # Positions represent the amount of images searched for before a hit.
+            if image is None:
+                stats["misses"] += 1
+                stats["position"] += len(images)
+                stats["position_original"] += len(images)
+            else:
+                found = self.key([image])
+                stats["hits"][found] = stats["hits"].get(found, 0) + 1
+                stats["scores"][found] = stats["scores"].get(found, 0.0) + 1
+                stats["position"] += ordered.index(image) + 1
+                stats["position_original"] += images.index(image) + 1
+
+        if time.time() - self._saved > LEARNED_REGION_SAVE_INTERVAL:
+            self.save()
+
+    def _read(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _merge(self, lists):
+        for key, stats in lists.items():
+            self._lists.setdefault(key, stats)
+
+    def load(self):
+        """
+        Load any hit statistics from our ordering file, if it exists.
+        """
+        lists = self._read()
+        with self._lock:
+            self._merge(lists=lists)
+
+    def save(self):
+        """
+        Save our hit statistics, merged with the statistics of any lists saved by other bot instances, to our ordering file.
+
+        Statistics are merged and written while our lock is held, through a unique temporary file that is then
+        swapped into place, so saves from other threads (or bot instances) never write to the same file.
+        """
+        temporary = None
+        try:
+            with self._lock:
+                self._merge(lists=self._read())
+
+                descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", prefix=os.path.basename(self.path) + ".", suffix=".tmp")
+                with os.fdopen(descriptor, "w") as f:
+                    json.dump(self._lists, f)
+                os.replace(temporary, self.path)
+
+                self._saved = time.time()
+        except OSError as exc:
+            logger.warning("search ordering could not be saved: {exc}".format(exc=exc))
+            if temporary and os.path.exists(temporary):
+                os.remove(temporary)
+
+    @property
+    def stats(self):
+        """
+        Retrieve the hit statistics of every list of images, including the average amount of images searched
+        for per search, and the average amount that would of been searched for using the original order.
+        """
+        return {
+            key: {
+                "searches": stats["searches"],
+                "misses": stats["misses"],
+                "hits": stats["hits"],
+                "average_position": stats["position"] / (stats["searches"] or 1),
+                "average_position_original": stats["position_original"] / (stats["searches"] or 1),
+            } for key, stats in self._lists.items()
+        }
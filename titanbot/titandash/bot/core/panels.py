@@ -0,0 +1,125 @@
+from .constants import LEARNED_REGION_SAVE_INTERVAL
+
+from threading import Lock
+
+import os
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Panels indexed, the artifacts panel starts at its top, the perks (master) panel at its bottom.
+ARTIFACTS_PANEL = "artifacts"
+PERKS_PANEL = "perks"
+STATS_PANEL = "stats"
+
+# Item representing the end of a panel, reached once the panel no longer moves when dragged.
+PANEL_END = "__end__"
+
+
+class PanelIndex(object):
+    """
+    PanelIndex records the contents of each scrollable panel (artifacts, perks, stats), the distance scrolled from the
+    start of a panel (in pixels) before each item became visible.
+
+    Navigation drags directly to the learned distance of an item and verifies that it is present, instead of searching
+    for the item after every drag. The contents of a panel differ between accounts, an index is kept per bot instance.
+    """
+    def __init__(self, path, save_interval=LEARNED_REGION_SAVE_INTERVAL):
+        self.path = path
+        self.save_interval = save_interval
+
+        self._panels = {}
+        self._lock = Lock()
+        self._dirty = False
+        self._saved = time.time()
+
+        # Counters used to determine how effective our index is.
+        self.counts = {"jumps": 0, "hits": 0, "misses": 0, "scans": 0}
+
+        self.load()
+
+    def load(self):
+        """
+        Load our index from our index file, if it exists.
+        """
+        try:
+            with open(self.path, "r") as f:
+                panels = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        with self._lock:
+            for panel, items in panels.items():
+                self._panels.setdefault(panel, {}).update(items)
+
+    def save(self):
+        """
+        Save our index to our index file.
+        """
+        try:
+            with self._lock:
+                with open(self.path + ".tmp", "w") as f:
+                    json.dump(self._panels, f)
+                os.replace(self.path + ".tmp", self.path)
+
+                self._dirty = False
+                self._saved = time.time()
+        except OSError as exc:
+            logger.warning("panel index could not be saved: {exc}".format(exc=exc))
+
+    def distance(self, panel, item):
+        """
+        Retrieve the learned distance of the specified item within the specified panel, None if it has not been learned.
+        """
+        return self._panels.get(panel, {}).get(item)
+
+    def record(self, panel, item, distance):
+        """
+        Record that the specified item became visible after scrolling the specified distance from the start of the panel.
+        """
+        with self._lock:
+            if self._panels.setdefault(panel, {}).get(item) != distance:
+                self._panels[panel][item] = distance
+                self._dirty = True
+
+        if self._dirty and time.time() - self._saved > self.save_interval:
+            self.save()
+
+    def forget(self, panel, item):
+        """
+        Forget the learned distance of the specified item, the item was not present at its learned distance.
+        """
+        with self._lock:
+            if self._panels.get(panel, {}).pop(item, None) is not None:
+                self._dirty = True
+
+    def count(self, jump, hit=False):
+        """
+        Count a single navigation, either a jump to a learned distance (and whether or not the item was present), or a scan.
+        """
+        if not jump:
+            self.counts["scans"] += 1
+            return
+
+        self.counts["jumps"] += 1
+        self.counts["hits" if hit else "misses"] += 1
+
+    @staticmethod
+    def drags(distance, length):
+        """
+        Split the specified distance into the drags needed to travel it, no drag is longer than the specified length.
+        """
+        return [length] * (distance // length) + ([distance % length] if distance % length else [])
+
+    @property
+    def rates(self):
+        """
+        Retrieve the amount of jumps performed and the rate at which items were present at their learned distance.
+        """
+        return {
+            "jumps": self.counts["jumps"],
+            "scans": self.counts["scans"],
+            "hit_rate": self.counts["hits"] / (self.counts["jumps"] or 1)
+        }
@@ -0,0 +1,212 @@
+from .constants import OCR_PLAN_WORKERS
+from .digits import digits
+from .engines import OcrConfig, engines
+from .frame import as_frame
+from .maps import STATS_COORDS, STAGE_COORDS, PRESTIGE_COORDS, SKILL_LEVEL_COORDS, SKILLS
+from .ocr import preprocess, stitch, assign
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Module level executor, shared by every ocr plan (and every bot instance) running in this process.
+executor = ThreadPoolExecutor(max_workers=OCR_PLAN_WORKERS, thread_name_prefix="ocr")
+
+# Preprocessing applied to each region before recognition takes place.
+PROFILES = {
+    "raw": {},
+    "text": {"scale": 5},
+    "username": {"scale": 3},
+    "skill": {"scale": 5, "invert": True},
+    "rank": {"scale": 4, "threshold": 150},
+    "integer": {"scale": 5, "threshold": 150, "invert": True},
+}
+
+# Ocr configurations used, regions recognized with the digits configuration
+# are recognized through our digit templates before tesseract is used.
+TEXT_CONFIG = "--psm 7"
+LINE_CONFIG = "--psm 7 --oem 0"
+DIGITS_CONFIG = "--psm 7 --oem 0 nobatch digits"
+
+
+def has_digits(text):
+    return any(c.isdigit() for c in text)
+
+
+def digits_only(text):
+    """
+    Parse out any characters that are not digits from the specified text.
+    """
+    return "".join(c for c in text if c.isdigit())
+
+
+def integer(text):
+    """
+    Parse out any characters that are not digits from the specified text, using a basic default to ensure integer
+    based values will at least use a value of one if parsing fails (valid default if used in division).
+    """
+    return digits_only(text) or "1"
+
+
+def skill_level(text):
+    """
+    Parse out a skills current level from the specified text (ie: "Lv. 24"), None is returned if the level could not
+    be parsed.
+    """
+    if "," in text:
+        text = text.split(",")[1]
+    elif "." in text:
+        text = text.split(".")[1]
+
+    try:
+        return int(text.strip())
+    except ValueError:
+        return None
+
+
+def time_since(text):
+    """
+    Parse out the time since the last prestige from the specified text (ie: "01:24:32"), None is returned if the
+    time could not be parsed.
+    """
+    try:
+        hours, minutes, seconds = [int(t) for t in text.split(":")]
+    except ValueError:
+        return None
+
+    if hours or minutes or seconds:
+        return datetime.timedelta(hours=hours, minutes=minutes, seconds=seconds)
+
+
+# A single field recognized by a plan, the region is cropped from the captured frame, processed with the profile
+# and recognized with the ocr configuration, the text recognized is then parsed by the parser (if present).
+OcrField = namedtuple("OcrField", ["field", "region", "profile", "config", "parser", "validate"], defaults=(None, None))
+
+
+class OcrPlan(object):
+    """
+    OcrPlan represents a named list of fields recognized together, every field is read from a single capture of the
+    game window.
+
+    Fields sharing a profile and configuration are stitched together and recognized in a single ocr pass, each group
+    is processed and recognized on a worker of our shared executor. Text that fails validation (empty, or rejected by the validate
+    function of the field) is recognized again on its own.
+    """
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = [OcrField(*field) for field in fields]
+
+    def subset(self, *fields):
+        """
+        Retrieve a plan containing only the specified fields of this plan.
+        """
+        return OcrPlan(name=self.name, fields=[f for f in self.fields if f.field in fields])
+
+    @staticmethod
+    def _recognize(images, config, validate):
+        if len(images) == 1:
+            # A single image gains nothing from being stitched.
+            return {key: engines.image_to_string(image=image, config=config).strip() for key, image in images.items()}
+
+        stitched, bands = stitch(images=images)
+        texts = assign(lines=engines.image_to_lines(image=Image.fromarray(stitched), config=OcrConfig.lines(config=config)), bands=bands)
+
+        for key, image in images.items():
+            if not texts[key] or (validate[key] and not validate[key](texts[key])):
+                logger.debug("batch ocr result: {key} -> {text} failed validation, parsing individually.".format(key=key, text=texts[key]))
+                texts[key] = engines.image_to_string(image=image, config=config).strip()
+
+        return texts
+
+    def run(self, grabber=None, image=None, crop=True):
+        """
+        Run this plan against the specified image (or a single capture taken by the grabber), returning a dictionary
+        of field -> parsed value. Specifying crop as False reads every field from the entire image specified.
+        """
+        frame = as_frame(image if image is not None else grabber.snapshot())
+        pool = getattr(grabber, "pool", None)
+
+        grays = {f.field: (frame.crop(box=f.region) if crop and f.region else frame).gray for f in self.fields}
+        texts = {}
+
+        # Digits are recognized through our digit templates first, only falling back
+        # to tesseract if we are not confident in the digits recognized.
+        for f in self.fields:
+            if f.config == DIGITS_CONFIG:
+                text, confidence = digits.recognize(gray=grays[f.field])
+                if confidence >= digits.confidence:
+                    texts[f.field] = text
+
+        remaining = [f for f in self.fields if f.field not in texts]
+        if remaining:
+            groups = {}
+            for f in remaining:
+                groups.setdefault((f.profile, f.config), []).append(f)
+
+            # Large batches are preprocessed on our vision pool (if present), the pool declines
+            # smaller batches, which are preprocessed in process by our workers instead.
+            batch = pool.preprocess(images=[(grays[f.field], PROFILES[f.profile]) for f in remaining]) if pool else None
+
+            if batch is None:
+                batch = executor.map(lambda f: preprocess(gray=grays[f.field], **PROFILES[f.profile]), remaining)
+            processed = {f.field: Image.fromarray(image) for f, image in zip(remaining, batch)}
+            for result in executor.map(
+                lambda group: self._recognize(
+                    images={f.field: processed[f.field] for f in group[1]},
+                    config=group[0][1],
+                    validate={f.field: f.validate for f in group[1]}
+                ), groups.items()
+            ):
+                texts.update(result)
+
+        logger.debug("ocr plan: {name} recognized: {texts}".format(name=self.name, texts=texts))
+        return {f.field: f.parser(texts[f.field]) if f.parser else texts[f.field] for f in self.fields}
+
+
+# Integer values present on the stats panel, every other value is recognized as text.
+STATS_INTEGERS = ("highest_stage_reached", "total_pet_level", "prestiges", "days_since_install")
+
+STATS_PLAN = OcrPlan(name="stats", fields=[
+    (key, region, "integer", LINE_CONFIG, integer, has_digits) if key in STATS_INTEGERS else (key, region, "text", LINE_CONFIG)
+    for key, region in STATS_COORDS.items()
+])
+
+STAGE_PLAN = OcrPlan(name="stage", fields=[
+    ("stage", STAGE_COORDS["region"], "integer", DIGITS_CONFIG, digits_only, has_digits),
+])
+
+SKILLS_PLAN = OcrPlan(name="skills", fields=[
+    (skill, SKILL_LEVEL_COORDS[skill], "skill", TEXT_CONFIG, skill_level) for skill in SKILLS
+])
+
+
+def prestige_plan(event=False):
+    """
+    Generate the plan used to read the prestige panel, the panel is positioned differently while an event is running.
+    """
+    coords = PRESTIGE_COORDS["event" if event else "base"]
+
+    return OcrPlan(name="prestige", fields=[
+        ("time_since", coords["time_since"], "raw", TEXT_CONFIG, time_since),
+        ("advance_start", coords["advance_start"], "integer", DIGITS_CONFIG, digits_only, has_digits),
+    ])
+
+
+def tournament_plan(coords, count, ranks=()):
+    """
+    Generate the plan used to read the username and stage of each tournament participant, along with the rank of each
+    participant index specified. Fields are keyed by their type and participant index (ie: "stage_3").
+    """
+    return OcrPlan(name="tournament", fields=[
+        ("rank_{index}".format(index=i), coords["ranks"][i], "rank", DIGITS_CONFIG, digits_only, has_digits) for i in ranks
+    ] + [
+        ("user_{index}".format(index=i), coords["usernames"][i], "username", LINE_CONFIG) for i in range(count)
+    ] + [
+        ("stage_{index}".format(index=i), coords["stages"][i], "integer", DIGITS_CONFIG, digits_only, has_digits) for i in range(count)
+    ])
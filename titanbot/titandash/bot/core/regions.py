@@ -0,0 +1,161 @@
+from settings import IMAGE_DIR, LOCAL_DATA_REGIONS_FILE
+
+from .constants import LEARNED_REGION_MARGIN, LEARNED_REGION_SAVE_INTERVAL
+
+from threading import Lock
+
+import os
+import json
+import time
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+
+class LearnedRegions(object):
+    """
+    LearnedRegions records the locations that each template has been found in, building a bounding box
+    of every location a template has ever been found in.
+
+    Searches for a template check its learned region first (with some margin), only falling back to
+    a full search when the template is not found there. Learned regions are persisted to the users
+    titandash directory so they are re-used across sessions and bot instances.
+    """
+    def __init__(self, width, height, path=LOCAL_DATA_REGIONS_FILE, margin=LEARNED_REGION_MARGIN):
+        self.width = width
+        self.height = height
+        self.path = path
+        self.margin = margin
+
+        self._boxes = {}
+        self._lock = Lock()
+        self._dirty = False
+        self._saved = time.time()
+
+        # Counters used to determine how effective our learned regions are.
+        # area values represent the amount of pixels that are searched.
+        self.counts = {"searches": 0, "hits": 0, "fallbacks": 0, "area": 0, "area_full": 0}
+
+        self.load()
+
+    @staticmethod
+    def key(image):
+        """
+        Generate the key used to store the learned region of the specified image, keys are relative
+        to the bot image directory so they remain valid when the bot is moved or updated.
+        """
+        return os.path.relpath(image, IMAGE_DIR).replace("\\", "/")
+
+    def _read(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _merge(self, boxes):
+        for key, box in boxes.items():
+            self._boxes[key] = self._union(self._boxes.get(key), box)
+
+    def load(self):
+        """
+        Load any learned regions from our regions file, if it exists.
+        """
+        boxes = self._read()
+        with self._lock:
+            self._merge(boxes=boxes)
+
+    def save(self):
+        """
+        Save our learned regions, merged with any regions saved by other bot instances, to our regions file.
+
+        Regions are merged and written while our lock is held, through a unique temporary file that is then
+        swapped into place, so saves from other threads (or bot instances) never write to the same file.
+        """
+        temporary = None
+        try:
+            with self._lock:
+                self._merge(boxes=self._read())
+
+                descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", prefix=os.path.basename(self.path) + ".", suffix=".tmp")
+                with os.fdopen(descriptor, "w") as f:
+                    json.dump(self._boxes, f)
+                os.replace(temporary, self.path)
+
+                self._dirty = False
+                self._saved = time.time()
+        except OSError as exc:
+            logger.warning("learned regions could not be saved: {exc}".format(exc=exc))
+            if temporary and os.path.exists(temporary):
+                os.remove(temporary)
+
+    @staticmethod
+    def _union(box, other):
+        if box is None:
+            return list(other)
+
+        return [min(box[0], other[0]), min(box[1], other[1]), max(box[2], other[2]), max(box[3], other[3])]
+
+    def region(self, image):
+        """
+        Retrieve the learned region (x1, y1, x2, y2) of the specified image, including our margin.
+
+        None is returned if no region has been learned for the image yet.
+        """
+        box = self._boxes.get(self.key(image))
+        if box is None:
+            return None
+
+        return (
+            max(0, box[0] - self.margin),
+            max(0, box[1] - self.margin),
+            min(self.width, box[2] + self.margin),
+            min(self.height, box[3] + self.margin)
+        )
+
+    def record(self, image, position, width, height):
+        """
+        Record that the specified image (of the specified width and height) was found at the specified position.
+        """
+        box = [position[0], position[1], position[0] + width, position[1] + height]
+        key = self.key(image)
+
+        with self._lock:
+            current = self._boxes.get(key)
+            if current is None or self._union(current, box) != current:
+                self._boxes[key] = self._union(current, box)
+                self._dirty = True
+
+        if self._dirty and time.time() - self._saved > LEARNED_REGION_SAVE_INTERVAL:
+            self.save()
+
+    def count(self, region, hit):
+        """
+        Count a search that was performed within the specified learned region, and whether or not the image was found.
+        """
+        area = (region[2] - region[0]) * (region[3] - region[1])
+        full = self.width * self.height
+
+        self.counts["searches"] += 1
+        self.counts["area_full"] += full
+        if hit:
+            self.counts["hits"] += 1
+            self.counts["area"] += area
+        else:
+            self.counts["fallbacks"] += 1
+            self.counts["area"] += area + full
+
+    @property
+    def rates(self):
+        """
+        Retrieve the hit and fallback rates of searches performed within learned regions, and the
+        percentage of area saved when compared to searching the full window every time.
+        """
+        searches = self.counts["searches"] or 1
+        return {
+            "searches": self.counts["searches"],
+            "hit_rate": self.counts["hits"] / searches,
+            "fallback_rate": self.counts["fallbacks"] / searches,
+            "area_saved": 1 - self.counts["area"] / self.counts["area_full"] if self.counts["area_full"] else 0
+        }
@@ -0,0 +1,64 @@
+from titandash.bot.external.imagesearch import imagesearchbatch
+
+from .constants import ARTIFACT_SCAN_WORKERS
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+
+class ArtifactScanner(object):
+    """
+    ArtifactScanner matches every candidate artifact against each capture of the artifacts panel, as soon as each
+    capture is submitted (while the panel is dragged to the next capture), on a fixed size pool of workers.
+
+    Artifacts are dropped from the candidates once they are found, so later captures only ever search for the
+    artifacts that have not been found yet. Candidates are a dictionary of artifact name -> image.
+    """
+    def __init__(self, candidates, precision=0.8, workers=ARTIFACT_SCAN_WORKERS, pool=None, telemetry=None):
+        self.precision = precision
+        self.pool = pool
+        self.telemetry = telemetry
+
+        self._candidates = dict(candidates)
+        self._names = {image: name for name, image in candidates.items()}
+        self._found = {}
+        self._futures = []
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="artifacts")
+
+    def submit(self, frame, index):
+        """
+        Submit the specified capture (the index representing the order of the capture within the panel) for scanning.
+        """
+        self._futures.append(self._executor.submit(self._scan, frame, index))
+
+    def _scan(self, frame, index):
+        with self._lock:
+            images = list(self._candidates.values())
+        if not images:
+            return
+
+        found = imagesearchbatch(images=images, im=frame, precision=self.precision, first=False, pool=self.pool, telemetry=self.telemetry)
+        with self._lock:
+            for image, position, score in found:
+                name = self._names[image]
+                self._candidates.pop(name, None)
+                # Captures may be scanned out of order, the first capture an artifact is present in is kept.
+                self._found[name] = min(index, self._found.get(name, index))
+
+    @property
+    def remaining(self):
+        return len(self._candidates)
+
+    def finish(self):
+        """
+        Wait for every capture submitted to be scanned, returning a dictionary of artifact name -> index of the first
+        capture the artifact was found in.
+        """
+        try:
+            for future in self._futures:
+                future.result()
+        finally:
+            self._executor.shutdown(wait=True)
+
+        return dict(self._found)
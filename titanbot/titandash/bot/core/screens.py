@@ -0,0 +1,106 @@
+from titandash.bot.external.imagesearch import imagesearcharea
+
+from .anchors import Anchors
+from .frame import as_frame
+from .maps import IMAGES, ANCHORS, SCREEN_ANCHORS
+
+# Labels that may be assigned to a capture of the game screen.
+SCREEN_COLLAPSED = "collapsed"
+SCREEN_PANEL = "panel_{panel}"
+SCREEN_AD = "ad"
+SCREEN_WELCOME = "welcome"
+SCREEN_RATE = "rate"
+SCREEN_PRESTIGE = "prestige"
+SCREEN_UNKNOWN = "unknown"
+
+# Panels (and the bottom bar image that is active while the panel is open).
+SCREEN_PANELS = (
+    ("master", IMAGES["GENERIC"]["master_active"]),
+    ("heroes", IMAGES["GENERIC"]["heroes_active"]),
+    ("equipment", IMAGES["GENERIC"]["equipment_active"]),
+    ("pets", IMAGES["GENERIC"]["pets_active"]),
+    ("artifacts", IMAGES["GENERIC"]["artifacts_active"]),
+    ("shop", IMAGES["GENERIC"]["shop_active"]),
+)
+
+
+def is_game_screen(label):
+    """
+    Determine whether or not the specified label represents the game screen itself (collapsed, or with a panel open).
+    """
+    return label == SCREEN_COLLAPSED or label.startswith(SCREEN_PANEL.format(panel=""))
+
+
+class ScreenClassifier(object):
+    """
+    ScreenClassifier labels a capture of the game screen in a single pass, using the anchored images present
+    at known positions on each screen. Prompts (ads, welcome, rate, prestige) are checked first, since they
+    are displayed on top of any other screen.
+
+    The welcome and rate prompts do not have a known position, they are searched for (coarse to fine)
+    while their checks are enabled.
+
+    Labels are cached per capture, classifying the same capture again is free.
+    """
+    def __init__(self, anchors=None, telemetry=None):
+        self.anchors = anchors or Anchors(anchors=dict(ANCHORS, **SCREEN_ANCHORS))
+        # Search telemetry (see telemetry.py) that searches for prompts are recorded into, if present.
+        self.telemetry = telemetry
+
+        self._frame = None
+        self._label = None
+
+        # Counters used to determine the amount of captures classified.
+        self.counts = {"classified": 0, "cached": 0}
+
+    def _anchored(self, frame, image):
+        return self.anchors.check(frame=frame, image=image)[0] is True
+
+    def _found(self, frame, image):
+        return imagesearcharea(window=None, image=image, x1=0, y1=0, x2=frame.width, y2=frame.height, im=frame, pyramid=True, telemetry=self.telemetry)[0] != -1
+
+    def classify(self, frame):
+        """
+        Classify the specified capture, returning the label of the screen present.
+        """
+        frame = as_frame(frame)
+        if frame is self._frame:
+            self.counts["cached"] += 1
+            return self._label
+
+        self._frame = frame
+        self._label = self._classify(frame=frame)
+        self.counts["classified"] += 1
+
+        return self._label
+
+    def _classify(self, frame):
+        # Anchored images are only meaningful on a capture of the game screen.
+        if frame.size != self.anchors.size:
+            return SCREEN_UNKNOWN
+
+        if self._anchored(frame=frame, image=IMAGES["ADS"]["no_thanks"]):
+            return SCREEN_AD
+        if self._anchored(frame=frame, image=IMAGES["MASTER"]["confirm_prestige"]):
+            return SCREEN_PRESTIGE
+
+        # Prompts are only searched for while their checks are enabled, imported here as
+        # our utilities import the labels of this module.
+        from .utilities import globals
+
+        if globals.welcome_screen_checks() and self._found(frame=frame, image=IMAGES["WELCOME"]["welcome_header"]):
+            return SCREEN_WELCOME
+        if globals.rate_screen_checks() and self._found(frame=frame, image=IMAGES["RATE"]["rate_icon"]):
+            return SCREEN_RATE
+
+        # Panels are open when they can be collapsed or expanded, the shop panel
+        # can not be collapsed or expanded, the active bottom bar image is used.
+        expandable = self._anchored(frame=frame, image=IMAGES["GENERIC"]["collapse_panel"]) or self._anchored(frame=frame, image=IMAGES["GENERIC"]["expand_panel"])
+        for panel, image in SCREEN_PANELS:
+            if (expandable or panel == "shop") and self._anchored(frame=frame, image=image):
+                return SCREEN_PANEL.format(panel=panel)
+
+        if not expandable and any(self._anchored(frame=frame, image=IMAGES["NO_PANELS"][image]) for image in ("settings", "icon_boss", "tournament")):
+            return SCREEN_COLLAPSED
+
+        return SCREEN_UNKNOWN
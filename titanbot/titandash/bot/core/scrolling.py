@@ -0,0 +1,125 @@
+from .constants import SCROLL_BAND_HEIGHT, SCROLL_MIN_RESPONSE, SCROLL_SETTLE_INTERVAL, SCROLL_SETTLE_DELAY, SCROLL_SETTLE_TIMEOUT
+from .frame import as_frame
+
+from collections import namedtuple
+
+import time
+import cv2
+import numpy as np
+
+# The shift is positive when a panel is scrolled towards its bottom (contents moving up), and None
+# when the shift could not be determined. The end is reached when a panel did not move at all.
+Scroll = namedtuple("Scroll", ["shift", "response", "end"])
+
+
+def estimate_shift(previous, current, band=SCROLL_BAND_HEIGHT, min_response=SCROLL_MIN_RESPONSE):
+    """
+    Estimate the vertical shift (in pixels) between two captures of the same region.
+
+    A band of rows from the top and from the bottom of the previous capture are each located within the current
+    capture, the band located with the best response determines the shift. Shifts up to the height of the region
+    (less the band) can be resolved, larger shifts leave no overlap between the captures and are returned as unknown.
+    """
+    previous, current = as_frame(previous).gray, as_frame(current).gray
+
+    # Identical captures are common (the end of a panel), these are compared directly.
+    if np.array_equal(previous, current):
+        return 0, 1.0
+
+    band = min(band, previous.shape[0] // 2)
+    shift, response = None, 0.0
+
+    for top in (0, previous.shape[0] - band):
+        rows = previous[top:top + band]
+        # Uniform bands have nothing to locate them by, they would be located anywhere.
+        if rows.std() < 1:
+            continue
+
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(cv2.matchTemplate(current, rows, cv2.TM_CCOEFF_NORMED))
+        if max_val > response:
+            shift, response = top - max_loc[1], max_val
+
+    if response < min_response:
+        return None, response
+
+    return shift, response
+
+
+class ScrollTracker(object):
+    """
+    ScrollTracker follows a panel while it is dragged, estimating how far the panel moved with each drag
+    and whether or not the end of the panel has been reached (the panel no longer moves).
+
+    Captures are retrieved through the specified capture function, the panel is tracked within the specified region
+    of each capture (if present). Instead of pausing for a fixed amount of time after each drag, the panel is captured
+    until it has stopped moving.
+    """
+    def __init__(self, capture, region=None, interval=SCROLL_SETTLE_INTERVAL, delay=SCROLL_SETTLE_DELAY, timeout=SCROLL_SETTLE_TIMEOUT):
+        self.capture = capture
+        self.region = region
+        self.interval = interval
+        self.delay = delay
+        self.timeout = timeout
+
+        self.frame = None
+        self.offset = 0
+        self.drags = 0
+
+    def start(self):
+        """
+        Capture the panel before any drags take place.
+        """
+        self.frame = as_frame(self.capture())
+        self.offset = 0
+        self.drags = 0
+
+        return self.frame
+
+    def compare(self, previous, current):
+        """
+        Compare two captures of the panel, determining how far the panel moved between them.
+        """
+        if self.region:
+            previous, current = as_frame(previous).crop(box=self.region), as_frame(current).crop(box=self.region)
+
+        shift, response = estimate_shift(previous=previous, current=current)
+        return Scroll(shift=shift, response=response, end=shift == 0)
+
+    def settle(self):
+        """
+        Capture the panel until it has stopped moving (two consecutive captures without any movement), or
+        until our timeout is reached. The last capture taken is returned.
+
+        Drags are not always picked up by the game straight away, a panel that has not been seen moving yet (since
+        the last capture of the tracker) is only considered stopped once our delay has passed.
+        """
+        started = time.time()
+        current = as_frame(self.capture())
+        moved = self.frame is None or not self.compare(previous=self.frame, current=current).end
+
+        while time.time() < started + self.timeout:
+            time.sleep(self.interval)
+            following = as_frame(self.capture())
+            if not self.compare(previous=current, current=following).end:
+                moved = True
+            elif moved or time.time() >= started + self.delay:
+                return following
+
+            current = following
+
+        return current
+
+    def scrolled(self):
+        """
+        Determine how far the panel moved since the last capture, once it has stopped moving. Should be
+        called after every drag performed.
+        """
+        current = self.settle()
+        scroll = self.compare(previous=self.frame, current=current)
+
+        self.frame = current
+        self.drags += 1
+        if scroll.shift:
+            self.offset += scroll.shift
+
+        return scroll
@@ -8,27 +8,30 @@ from titandash.models.artifact import Artifact
 from titandash.models.prestige import Prestige
 
 from .maps import (
-    STATS_COORDS, STAGE_COORDS, GAME_LOCS, PRESTIGE_COORDS,
-    ARTIFACT_MAP, CLAN_RAID_COORDS, HERO_COORDS, EQUIPMENT_COORDS,
+    GAME_LOCS, SKILLS,
+    ARTIFACT_MAP, CLAN_RAID_COORDS, HERO_COORDS, EQUIPMENT_COORDS, PANEL_COORDS,
 )
 from .utilities import convert, delta_from_values, globals
 from .constants import MELEE, SPELL, RANGED
+from .frame import as_frame
+from .ocr import preprocess
+from .engines import engines
+from .plans import STATS_PLAN, STAGE_PLAN, SKILLS_PLAN, prestige_plan, tournament_plan
+from .grid import GridScanner
+from .panels import ARTIFACTS_PANEL
+from .scanner import ArtifactScanner
+from .scrolling import ScrollTracker
 
 from PIL import Image
 
-import threading
-import datetime
 import pytesseract
-import cv2
-import numpy as np
-import imagehash
 import uuid
 import logging
 
 
 class Stats:
     """Stats class contains all possible stat values and can be updated dynamically."""
-    def __init__(self, instance, images, window, grabber, configuration, logger):
+    def __init__(self, instance, images, window, grabber, configuration, logger, panels=None):
         self.instance = instance
         self.images = images
         self.window = window
@@ -66,6 +69,8 @@ class Stats:
 
         # Grabber is used to perform OCR updates when grabbing game statistics.
         self.grabber = grabber
+        # Panel index (see panels.py) that the location of each artifact parsed is recorded into, if present.
+        self.panels = panels
 
         # Updating the pytesseract command that is used based on the one
         # present in the django settings... Which should be handled by our bootstrapper.
@@ -96,44 +101,17 @@ class Stats:
         Process the grabbers current image before OCR extraction attempt.
         """
         _image = image or self.grabber.snapshot(region=region) if use_current else self.grabber.current
-        _image = np.array(_image)
 
-        # Scale and desaturate the image.
-        _image = cv2.resize(_image, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
-        _image = cv2.cvtColor(_image, cv2.COLOR_BGR2GRAY)
+        # Desaturate the image, using the frames cached grayscale view so
+        # the color conversion is never repeated for the same capture.
+        _image = as_frame(_image).gray
 
-        # Performing thresholds on the image if it's enabled.
-        # Threshold will ensure that certain colored pieces are removed.
-        if threshold:
-            retr, _image = cv2.threshold(_image, 230, 255, cv2.THRESH_BINARY)
-            contours, hier = cv2.findContours(_image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-
-            # Drawing black over any contours smaller than our specified threshold.
-            # Removing the un-wanted blobs from the image grabbed.
-            for contour in contours:
-                if cv2.contourArea(contour) < threshold:
-                    cv2.drawContours(_image, [contour], 0, (0,), -1)
-
-        if invert:
-            _image = cv2.bitwise_not(_image)
+        # A single region is always preprocessed in process, handing it to our vision pool costs more than the work.
+        _processed = preprocess(gray=_image, scale=scale, threshold=threshold, invert=invert)
 
         # Re-create the image from our numpy array through the Pillow Image module.
         # Threshold or not, an Image object is always returned.
-        return Image.fromarray(_image)
-
-    @staticmethod
-    def images_duplicate(image_one, image_two, cutoff=2):
-        """
-        Determine if the specified images are the same or not through the use of the imagehash
-        library.
-
-        We can get an average hash of each image and compare them, using a cutoff to determine if
-        they are similar enough to end the loop.
-        """
-        if imagehash.average_hash(image=image_one) - imagehash.average_hash(image=image_two) < cutoff:
-            return True
-        else:
-            return False
+        return Image.fromarray(_processed)
 
     def parse_artifacts(self):
         """
@@ -147,106 +125,69 @@ class Stats:
         """
         from titandash.bot.core.maps import ARTIFACT_COORDS
 
-        from titandash.bot.core.utilities import sleep
         from titandash.bot.core.utilities import drag_mouse
 
-        _threads = []
-        _found = []
-
-        def parse_image(_artifacts, _image):
-            """
-            Threaded Function.
-
-            Initialize a thread with this function and specific image to search for the specified list of artifacts.
-            """
-            _local_found = []
-            for artifact in _artifacts:
-                if artifact.artifact.name in _found:
-                    continue
-
-                artifact_image = ARTIFACT_MAP.get(artifact.artifact.name)
-                if self.grabber.search(image=artifact_image, bool_only=True, im=_image):
-                    _local_found.append(artifact.artifact.name)
-
-            if _local_found:
-                self.logger.info("{length} artifacts found".format(length=len(_local_found)))
-                _found.extend(_local_found)
-
         # Region used when taking screenshots of the window of artifacts.
         capture_region = ARTIFACT_COORDS["parse_region"]
         locs = GAME_LOCS["GAME_SCREEN"]
 
-        # Take an initial screenshot of the artifacts panel.
-        self.grabber.snapshot(region=capture_region)
-        # Creating a list that will be used to place image objects
-        # into from the grabber.
-        images_container = [self.grabber.current]
+        # Only artifacts not yet owned are searched for, each capture is scanned as soon as it is
+        # taken, artifacts found are no longer searched for in any following captures.
+        unowned = self.artifact_statistics.artifacts.filter(owned=False).values_list("artifact__name", flat=True)
+        scanner = ArtifactScanner(candidates={name: ARTIFACT_MAP[name] for name in unowned if name in ARTIFACT_MAP}, pool=self.grabber.pool, telemetry=self.grabber.telemetry)
+
+        # Take an initial screenshot of the artifacts panel, the panel is tracked below its header, while
+        # only the parse region of each screenshot is scanned. The offset of each screenshot is kept.
+        scroll = ScrollTracker(capture=lambda: self.grabber.snapshot(fresh=True), region=PANEL_COORDS["panel_scroll"])
+        scanner.submit(frame=scroll.start().crop(box=capture_region), index=0)
+        offsets = [0]
 
         # Looping forever until we break from our loop
-        # due to us finding a duplicate image.
+        # due to the panel no longer moving.
         loops = 0
-        while True:
+        while scanner.remaining:
             loops += 1
 
             drag_mouse(start=locs["scroll_start"], end=locs["scroll_bottom_end"], window=self.window)
-            sleep(1)
 
-            # Take another screenshot of the screen now.
+            # Take another screenshot of the screen once the panel stops moving.
             self.logger.info("taking screenshot {loop} of current artifacts on screen.".format(loop=loops))
-            self.grabber.snapshot(region=capture_region)
 
-            if self.images_duplicate(image_one=self.grabber.current, image_two=images_container[-1]):
-                # We should now have a list of all images available with the users entire
-                # set of owned artifacts. We can use this during parsing.
-                self.logger.info("duplicate images found, ending screenshot loop.")
+            if scroll.scrolled().end:
+                self.logger.info("bottom of artifacts panel reached, ending screenshot loop.")
                 break
             else:
-                images_container.append(self.grabber.current)
+                scanner.submit(frame=scroll.frame.crop(box=capture_region), index=loops)
+                offsets.append(scroll.offset)
 
             if loops == 30:
                 self.logger.warning("30 screenshots have been reached... breaking loop manually now.")
                 break
 
-        # Looping through each image, creating a new thread to parse the information
-        # about the artifacts present.
-        unowned = self.artifact_statistics.artifacts.filter(owned=False)
-        for index, image in enumerate(images_container):
-            # Firing and forgetting our threads... Functionality can continue while this runs.
-            # Since a prestige never takes place right after a artifacts parse (or it shouldn't).
-            _threads.append(threading.Thread(name="ParserThread{index}".format(index=index), target=parse_image, kwargs={
-                "_artifacts": unowned,
-                "_image": image
-            }))
-            self.logger.info("created new thread ({thread}) for artifact parsing.".format(thread=_threads[-1]))
-
-        for thread in _threads:
-            self.logger.info("starting thread {thread}".format(thread=thread))
-            thread.start()
-
-        self.logger.info("waiting for threads to finish...")
-        for thread in _threads:
-            thread.join()
-
-        self.artifact_statistics.artifacts.filter(artifact__name__in=_found).update(owned=True)
-
-    def skill_ocr(self, region):
+        self.logger.info("waiting for artifact scanning to finish...")
+        found = scanner.finish()
+        self.logger.info("{length} artifacts found".format(length=len(found)))
+
+        self.artifact_statistics.artifacts.filter(artifact__name__in=list(found)).update(owned=True)
+
+        # The offset of the first screenshot an artifact was found in represents the distance needed to drag to the artifact.
+        if self.panels:
+            for artifact, index in found.items():
+                self.panels.record(panel=ARTIFACTS_PANEL, item=artifact, distance=offsets[index])
+
+    def skill_levels(self, skills=SKILLS):
         """
-        Parse out a skills current level when given the region of the levels text on screen.
+        Parse out the current level of each skill specified, the master panel should be open and not collapsed.
+        A dictionary of skill -> level is returned.
         """
-        image = self._process(scale=5, region=region, use_current=True, invert=True)
-        text = pytesseract.image_to_string(image=image, config="--psm 7")
+        levels = SKILLS_PLAN.subset(*skills).run(grabber=self.grabber)
 
-        if "," in text:
-            text = text.split(",")[1]
-        elif "." in text:
-            text = text.split(".")[1]
+        for skill, level in levels.items():
+            if level is None:
+                self.logger.warning("skill: {skill} was parsed incorrectly, returning level 0.".format(skill=skill))
+                levels[skill] = 0
 
-        text = text.lstrip().rstrip()
-        try:
-            return int(text)
-        except ValueError:
-            self.logger.warning("skill was parsed incorrectly, returning level 0.")
-            return 0
+        return levels
 
     def update_stats_ocr(self):
         """
@@ -255,34 +196,9 @@ class Stats:
 
         Note that the current screen should be the stats page before calling this method.
         """
-        # Create map to determine if keys should be treated as integers
-        # only or not, this will decide whether or not to apply thresholds.
-        integer_map = {
-            "highest_stage_reached",
-            "total_pet_level",
-            "prestiges",
-            "days_since_install",
-        }
-
-        for key, region in STATS_COORDS.items():
-            is_integer = key in integer_map
-            # Begin by looping through each key and region
-            # used by our game statistics parsing.
-            text = pytesseract.image_to_string(
-                image=self._process(scale=5, threshold=150 if is_integer else None, region=region, invert=is_integer),
-                config='--psm 7 --oem 0'
-            )
-
-            # Ensure our values that are expected to be in an integer
-            # format (digits only) have characters parsed out (if present).
-            if is_integer:
-                text = ''.join(filter(lambda x: x.isdigit(), text))
-
-                # Using a basic default to ensure integer based values
-                # will at least use a value of zero if parsing fails.
-                if text == "":
-                    text = "1"  # Valid default if used in division...
-
+        # Every value is read from a single capture of the stats panel, integer
+        # values are parsed to digits only (see plans.py).
+        for key, text in STATS_PLAN.run(grabber=self.grabber).items():
             self.logger.info("parsing result: {key} -> {text}".format(key=key, text=text))
             setattr(self.statistics.game_statistics, key, text)
 
@@ -292,18 +208,7 @@ class Stats:
         """
         Attempt to parse out the current stage in game through an OCR check.
         """
-        region = STAGE_COORDS["region"]
-
-        if test_image:
-            image = self._process(image=test_image, scale=5, threshold=150, invert=True)
-        else:
-            image = self._process(scale=5, threshold=150, region=region, use_current=True, invert=True)
-
-        text = pytesseract.image_to_string(image, config='--psm 7 --oem 0 nobatch digits')
-
-        # Do some light parse work here to make sure only digit like characters are present
-        # in the returned 'text' variable retrieved through tesseract.
-        return ''.join(filter(lambda x: x.isdigit(), text))
+        return STAGE_PLAN.run(grabber=self.grabber, image=test_image, crop=not test_image)["stage"]
 
     def get_advance_start(self, test_image=None):
         """
@@ -313,18 +218,10 @@ class Stats:
         within the Bot if we know what the users minimum stage value currently is.
         """
         self.logger.info("attempting to parse out the advance start value for current prestige")
-        region = PRESTIGE_COORDS["event" if globals.events() else "base"]["advance_start"]
-
-        if test_image:
-            image = self._process(image=test_image, scale=5, threshold=150, invert=True)
-        else:
-            image = self._process(scale=5, threshold=150, region=region, use_current=True, invert=True)
-
-        text = pytesseract.image_to_string(image, config="--psm 7 --oem 0 nobatch digits")
+        text = prestige_plan(event=globals.events()).subset("advance_start").run(grabber=self.grabber, image=test_image, crop=not test_image)["advance_start"]
         self.logger.info("parsed value: {text}".format(text=text))
 
-        # Doing some light parse work, similar to the stage ocr function to remove letters if present.
-        return ''.join(filter(lambda x: x.isdigit(), text))
+        return text
 
     def update_prestige(self, artifact, current_stage=None, test_image=None):
         """
@@ -338,29 +235,20 @@ class Stats:
         This method expects the current in game panel to be the one right before a prestige takes place.
         """
         self.logger.info("Attempting to parse out the time since last prestige")
-        region = PRESTIGE_COORDS["event" if globals.events() else "base"]["time_since"]
+        plan = prestige_plan(event=globals.events())
 
+        # Both the time since the last prestige and the advance start value are read from a single capture
+        # of the prestige panel, a test image only ever contains the time since the last prestige.
         if test_image:
-            image = self._process(image=test_image, use_current=True)
+            values = plan.subset("time_since").run(image=test_image, crop=False)
+            values["advance_start"] = self.get_advance_start()
         else:
-            image = self._process(region=region, use_current=True)
+            values = plan.run(grabber=self.grabber)
 
-        text = pytesseract.image_to_string(image, config='--psm 7')
-        self.logger.info("parsed value: {text}".format(text=text))
+        delta = values["time_since"]
+        self.logger.info("parsed value: {delta}".format(delta=delta))
 
-        # We now have the amount of time that this prestige took place, appending it to the list of prestiges
-        # present in the statistics instance.
-        self.logger.info("attempting to parse hours, minutes and seconds from parsed text.")
         try:
-            try:
-                hours, minutes, seconds = [int(t) for t in text.split(":")]
-            except ValueError:
-                hours, minutes, seconds = None, None, None
-
-            delta = None
-            if hours or minutes or seconds:
-                delta = datetime.timedelta(hours=hours, minutes=minutes, seconds=seconds)
-
             if artifact:
                 try:
                     artifact = Artifact.objects.get(name=artifact)
@@ -384,8 +272,9 @@ class Stats:
             self.prestige_statistics.prestiges.add(prestige)
             self.prestige_statistics.save()
 
-            # Additionally, we want to attempt to grab the users advanced start value.
-            return prestige, self.get_advance_start()
+            # Additionally, we want to return the users advanced start value.
+            self.logger.info("parsed advance start: {text}".format(text=values["advance_start"]))
+            return prestige, values["advance_start"]
 
         except Exception as exc:
             self.logger.error("error occurred while creating a prestige instance.")
@@ -405,7 +294,7 @@ class Stats:
         else:
             image = self._process(scale=3, region=region, use_current=True, invert=True)
 
-        text = pytesseract.image_to_string(image=image, config="--psm 7")
+        text = engines.image_to_string(image=image, config="--psm 7")
         self.logger.info("text parsed: {text}".format(text=text))
 
         delta = delta_from_values(values=text.split(" ")[3:])
@@ -416,62 +305,61 @@ class Stats:
         else:
             return None
 
+    def hero_table(self):
+        """
+        Scan every hero slot present in the un-collapsed top of our heroes panel against a single capture, returning
+        a row for each slot with the damage type of the hero (or None) and whether or not the hero has any dps.
+        """
+        scanner = GridScanner(slots=HERO_COORDS["heroes"], checks={
+            MELEE: ("type", self.images.melee_type),
+            SPELL: ("type", self.images.spell_type),
+            RANGED: ("type", self.images.ranged_type),
+            "zero_dps": ("dps", self.images.zero_dps),
+        }, telemetry=self.grabber.telemetry)
+
+        return [{
+            # Melee takes priority over spell, which takes priority over ranged.
+            "type": next((typ for typ in (MELEE, SPELL, RANGED) if slot[typ]), None),
+            "dps": not slot["zero_dps"],
+        } for slot in scanner.scan(frame=self.grabber.snapshot())]
+
     def get_first_hero_information(self):
         """
         Given a tuple of coordinates that represents an individual "hero" present in the un-collapsed top
         of our heroes panel, we can loop until we find a hero that has been levelled at least one.
         """
-        for hero_locations in HERO_COORDS["heroes"]:
-            hero = None
-            dps = False
-            # Checking the first three heroes on our panel for the one with damage information.
-            # This represents our first "valid" hero, gathering the damage type only.
-            for loc, region in hero_locations.items():
-                if loc == "type":
-                    if self.grabber.search(image=self.images.melee_type, region=region, bool_only=True):
-                        hero = MELEE
-                    elif self.grabber.search(image=self.images.spell_type, region=region, bool_only=True):
-                        hero = SPELL
-                    elif self.grabber.search(image=self.images.ranged_type, region=region, bool_only=True):
-                        hero = RANGED
-
-                # Check for zero dps.
-                # If the zero dps image is not present, this hero has levels.
-                elif loc == "dps":
-                    dps = not self.grabber.search(image=self.images.zero_dps, region=region, bool_only=True)
-
-            # Returning the first non zero dps hero once one is found.
-            # That damage type can be used if a locked piece of equipment is available.
-            if dps and hero:
-                return hero
+        # Returning the first non zero dps hero once one is found.
+        # That damage type can be used if a locked piece of equipment is available.
+        for slot in self.hero_table():
+            if slot["dps"] and slot["type"]:
+                return slot["type"]
         return None
 
+    def gear_table(self, typ):
+        """
+        Scan every gear slot present on our equipment panel against a single capture, returning a row for each slot
+        with whether or not the gear is of the specified bonus type, is locked and is equipped, and its equip point.
+        """
+        scanner = GridScanner(slots=EQUIPMENT_COORDS["gear"], checks={
+            "equip": ("base", self.images.equip),
+            "locked": ("locked", self.images.locked),
+            typ: ("bonus", getattr(self.images, "bonus_{typ}".format(typ=typ))),
+        }, telemetry=self.grabber.telemetry)
+
+        return [{
+            typ: slot[typ],
+            "equip": gear_locations["equip"],
+            "locked": slot["locked"],
+            "equipped": not slot["equip"],
+        } for gear_locations, slot in zip(EQUIPMENT_COORDS["gear"], scanner.scan(frame=self.grabber.snapshot()))]
+
     def get_first_gear_of(self, typ):
         """
         Attempt to find the first "locked" piece of gear of the specified type on the screen.
 
         We are expecting that the equipment tab is open at this point and at the top of the screen.
         """
-        for index, gear_locations in enumerate(EQUIPMENT_COORDS["gear"], start=1):
-            gear = {
-                typ: False,
-                "equip": None,
-                "locked": False,
-                "equipped": False,
-            }
-            for loc, region in gear_locations.items():
-                if loc == "base":
-                    gear["equipped"] = not self.grabber.search(image=self.images.equip, region=region, bool_only=True)
-                elif loc == "locked":
-                    gear["locked"] = self.grabber.search(image=self.images.locked, region=region, bool_only=True)
-                elif loc == "bonus":
-                    # Looking for the bonus "type" within the region for the "bonus" image.
-                    # The specified type would be present (bonus=True) if this gear is of the right type.
-                    gear[typ] = self.grabber.search(image=getattr(self.images, 'bonus_{typ}'.format(typ=typ)), region=region, bool_only=True)
-                # Store location of equip button for each gear parsed.
-                elif loc == "equip":
-                    gear["equip"] = region  # Really a point here.
-
+        for index, gear in enumerate(self.gear_table(typ=typ), start=1):
             self.logger.debug("information gathered about gear piece {index}...".format(index=index))
             self.logger.debug("type: {typ}: {type}".format(typ=typ, type=gear[typ]))
             self.logger.debug("equip point: {equip}".format(equip=gear["equip"]))
@@ -493,29 +381,17 @@ class Stats:
         # invalid tuple of vales.
         return False, None
 
-    def tournament_rank_ocr(self, region, threshold):
-        """
-        Attempt to parse and retrieve the current rank from the specified region.
+    def tournament_ocr(self, coords, count, ranks=(), image=None):
         """
-        return pytesseract.image_to_string(
-            image=self._process(scale=4, threshold=threshold, region=region),
-            config="--psm 7 --oem 0 nobatch digits"
-        ).strip()
+        Attempt to parse and retrieve the username and stage of each tournament participant, along with the rank of
+        each participant index specified, returning a list of (rank, user, stage) for each participant.
 
-    def tournament_user_ocr(self, region):
-        """
-        Attempt to parse and retrieve the current username from the specified region.
+        Every value is read from a single capture of the tournament panel, the image specified is used if present.
         """
-        return pytesseract.image_to_string(
-            image=self._process(scale=3, region=region),
-            config="--psm 7 --oem 0"
-        ).strip()
+        values = tournament_plan(coords=coords, count=count, ranks=ranks).run(grabber=self.grabber, image=image)
 
-    def tournament_stage_ocr(self, region):
-        """
-        Attempt to parse and retrieve the current stage from the specified region.
-        """
-        return pytesseract.image_to_string(
-            image=self._process(scale=5, threshold=150, region=region, invert=True),
-            config="--psm 7 --oem 0 nobatch digits"
-        ).strip()
+        return [(
+            values.get("rank_{index}".format(index=i)),
+            values["user_{index}".format(index=i)],
+            values["stage_{index}".format(index=i)]
+        ) for i in range(count)]
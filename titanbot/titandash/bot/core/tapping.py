@@ -0,0 +1,82 @@
+from .constants import (
+    TAP_BACKGROUND_SIZE, TAP_DIFFERENCE_THRESHOLD, TAP_MIN_AREA, TAP_MAX_AREA, TAP_MAX_TARGETS, TAP_MAX_FOREGROUND
+)
+from .frame import as_frame
+from .maps import TAP_COORDS
+
+from collections import deque
+
+import cv2
+import numpy as np
+
+# Detection is only meaningful on a capture of the game screen.
+TAP_FRAME_SIZE = (480, 800)
+
+
+class TapDetector(object):
+    """
+    TapDetector locates targets (fairies and any other rewards moving across the screen) within the sky band.
+
+    The background of the sky band is modelled as the median of our most recent captures, anything present in
+    a capture that differs from the background (and is of a reasonable size) is a target. Detection is inconclusive
+    (None) until enough captures have been observed, or when the sky band changes too much to trust the background.
+    """
+    def __init__(self, region=TAP_COORDS["sky_band"], size=TAP_BACKGROUND_SIZE, threshold=TAP_DIFFERENCE_THRESHOLD,
+                 min_area=TAP_MIN_AREA, max_area=TAP_MAX_AREA, max_targets=TAP_MAX_TARGETS, max_foreground=TAP_MAX_FOREGROUND):
+        self.region = region
+        self.threshold = threshold
+        self.min_area = min_area
+        self.max_area = max_area
+        self.max_targets = max_targets
+        self.max_foreground = max_foreground
+
+        self._history = deque(maxlen=size)
+        self._kernel = np.ones((3, 3), dtype=np.uint8)
+
+        # Counters used to determine how often detection is conclusive.
+        self.counts = {"detections": 0, "conclusive": 0, "targets": 0}
+
+    def reset(self):
+        self._history.clear()
+
+    def detect(self, frame):
+        """
+        Detect the targets present in the specified capture of the game screen, returning the point (x, y) of each
+        target, or None if detection was inconclusive.
+        """
+        frame = as_frame(frame)
+        self.counts["detections"] += 1
+
+        if frame.size != TAP_FRAME_SIZE:
+            return None
+
+        band = frame.crop(box=self.region).array.astype(np.int16)
+        self._history.append(band)
+        if len(self._history) < self._history.maxlen:
+            return None
+
+        # Targets only ever appear in a single capture at the same position,
+        # so they are never part of the median of our recent captures.
+        background = np.median(np.stack(self._history), axis=0)
+        mask = (np.abs(band - background).max(axis=2) > self.threshold).astype(np.uint8)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._kernel)
+
+        # The sky band has changed entirely (a new stage background, a prompt), our
+        # background is no longer valid and is rebuilt from the current capture.
+        if mask.mean() > self.max_foreground:
+            self.reset()
+            self._history.append(band)
+            return None
+
+        count, labels, stats, centroids = cv2.connectedComponentsWithStats(mask)
+        targets = [
+            (self.region[0] + int(round(centroids[i][0])), self.region[1] + int(round(centroids[i][1])))
+            for i in range(1, count) if self.min_area <= stats[i, cv2.CC_STAT_AREA] <= self.max_area
+        ]
+        if len(targets) > self.max_targets:
+            return None
+
+        self.counts["conclusive"] += 1
+        self.counts["targets"] += len(targets)
+
+        return targets
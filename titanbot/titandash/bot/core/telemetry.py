@@ -0,0 +1,166 @@
+from settings import IMAGE_DIR
+
+from .constants import TELEMETRY_BINS, TELEMETRY_NEAR_MISS, TELEMETRY_LOOPS, TELEMETRY_REPORT_SIZE
+
+from collections import deque
+from threading import Lock
+
+import os
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SearchTelemetry(object):
+    """
+    SearchTelemetry records the result of every template search performed, the best score found (into a histogram
+    of scores per template), the precision used, whether or not the template was found and the time taken.
+
+    Reports include the slowest templates, the templates that most often score just below their precision (near
+    misses) and the templates searched for most often, along with the amount of searches performed per loop.
+    """
+    def __init__(self, bins=TELEMETRY_BINS, near_miss=TELEMETRY_NEAR_MISS, loops=TELEMETRY_LOOPS):
+        self.bins = bins
+        self.near_miss = near_miss
+
+        self._templates = {}
+        self._keys = {}
+        self._lock = Lock()
+
+        # Search volume of our most recent loops, the current loop is counted separately.
+        self._loops = deque(maxlen=loops)
+        self._loop = 0
+        self.loop_count = 0
+
+    def key(self, image):
+        """
+        Generate the key used to identify the specified image, paths are made relative to the bot image directory.
+        """
+        if not isinstance(image, str):
+            return "<array>"
+        if image not in self._keys:
+            self._keys[image] = os.path.relpath(image, IMAGE_DIR).replace("\\", "/") if os.path.isabs(image) else image
+
+        return self._keys[image]
+
+    def record(self, image, size, score, precision, latency):
+        """
+        Record a single search for the specified image, within an area of the specified size (width, height).
+
+        The score should be the best score found, and the latency should be the time taken in seconds.
+        """
+        key = self.key(image)
+        hit = score >= precision
+
+        with self._lock:
+            if key not in self._templates:
+                self._templates[key] = {
+                    "searches": 0,
+                    "hits": 0,
+                    "near_misses": 0,
+                    "latency": 0.0,
+                    "latency_max": 0.0,
+                    "area": 0,
+                    "precision": precision,
+                    "histogram": [0] * self.bins,
+                }
+
+            stats = self._templates[key]
+            stats["searches"] += 1
+            stats["hits"] += hit
+            stats["near_misses"] += not hit and score >= precision - self.near_miss
+            stats["latency"] += latency
+            stats["latency_max"] = max(stats["latency_max"], latency)
+            stats["area"] += size[0] * size[1]
+            stats["precision"] = precision
+            stats["histogram"][min(max(int(score * self.bins), 0), self.bins - 1)] += 1
+
+            self._loop += 1
+
+    def loop(self):
+        """
+        Mark the end of a single bot loop, the searches performed since the last loop are added to our loop volume.
+        """
+        with self._lock:
+            if self.loop_count:
+                self._loops.append(self._loop)
+            self._loop = 0
+            self.loop_count += 1
+
+    def reset(self):
+        with self._lock:
+            self._templates.clear()
+            self._loops.clear()
+            self._loop = 0
+            self.loop_count = 0
+
+    def summary(self, key):
+        """
+        Generate a summary of the searches performed for the specified template.
+        """
+        stats = self._templates[key]
+        return {
+            "template": key,
+            "searches": stats["searches"],
+            "hit_rate": stats["hits"] / stats["searches"],
+            "near_misses": stats["near_misses"],
+            "precision": stats["precision"],
+            "average_latency": stats["latency"] / stats["searches"] * 1000,
+            "max_latency": stats["latency_max"] * 1000,
+            "total_latency": stats["latency"] * 1000,
+            "average_area": stats["area"] // stats["searches"],
+            "histogram": stats["histogram"],
+        }
+
+    def report(self, size=TELEMETRY_REPORT_SIZE):
+        """
+        Generate a report of our telemetry, including the slowest templates (by total time spent searching), the
+        templates with the most near misses, the templates searched for most often, and the search volume per loop.
+        """
+        with self._lock:
+            summaries = [self.summary(key=key) for key in self._templates]
+            loops = list(self._loops)
+
+        return {
+            "searches": sum(s["searches"] for s in summaries),
+            "latency": sum(s["total_latency"] for s in summaries),
+            "loops": {
+                "count": self.loop_count,
+                "average_searches": sum(loops) / len(loops) if loops else 0,
+                "max_searches": max(loops) if loops else 0,
+            },
+            "slowest": sorted(summaries, key=lambda s: -s["total_latency"])[:size],
+            "near_misses": sorted([s for s in summaries if s["near_misses"]], key=lambda s: -s["near_misses"])[:size],
+            "busiest": sorted(summaries, key=lambda s: -s["searches"])[:size],
+        }
+
+    def save(self, path):
+        """
+        Save our telemetry to the specified file.
+        """
+        try:
+            with self._lock:
+                with open(path + ".tmp", "w") as f:
+                    json.dump({"templates": self._templates, "loops": list(self._loops), "loop_count": self.loop_count}, f)
+                os.replace(path + ".tmp", path)
+        except OSError as exc:
+            logger.warning("search telemetry could not be saved: {exc}".format(exc=exc))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load the telemetry saved to the specified file, None is returned if the file does not exist or is invalid.
+        """
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        telemetry = cls()
+        telemetry._templates = data["templates"]
+        telemetry._loops.extend(data["loops"])
+        telemetry.loop_count = data["loop_count"]
+
+        return telemetry
@@ -0,0 +1,124 @@
+from .atlas import TemplateAtlas, AtlasError, template_sources
+
+from threading import Lock
+
+import cv2
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateNotFoundError(Exception):
+    pass
+
+
+class Template(object):
+    """
+    Template represents a single decoded (grayscale) template image and its dimensions.
+    """
+    __slots__ = ("name", "path", "gray", "width", "height", "_scaled")
+
+    def __init__(self, name, path, gray):
+        self.name = name
+        self.path = path
+        self.gray = gray
+        self.height, self.width = gray.shape[:2]
+        self._scaled = {}
+
+    def scaled(self, factor):
+        """
+        Retrieve the grayscale template, downscaled by the specified factor. Computed once per factor.
+        """
+        if factor not in self._scaled:
+            self._scaled[factor] = cv2.resize(
+                self.gray, (self.width // factor, self.height // factor),
+                interpolation=cv2.INTER_AREA
+            )
+
+        return self._scaled[factor]
+
+    def __repr__(self):
+        return "<Template: {name} ({width}x{height})>".format(name=self.name, width=self.width, height=self.height)
+
+
+class TemplateRegistry(object):
+    """
+    In memory registry of every template image used by the bot, keyed by both the path and name of each template.
+
+    Templates are decoded once when the registry is loaded (at bot start), searches and clicks then read the
+    decoded arrays from memory instead of reading and decoding the image from disk every time.
+
+    When available, templates are read from the memory mapped template atlas (see atlas.py), which is shared
+    by every bot instance running on the machine.
+    """
+    def __init__(self):
+        self._paths = {}
+        self._names = {}
+        self._lock = Lock()
+        self._atlas = None
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __contains__(self, key):
+        return key in self._paths or key in self._names
+
+    def register(self, name, path):
+        """
+        Register the template image present at the specified path with the specified name.
+        """
+        if path in self._paths:
+            template = self._paths[path]
+        else:
+            gray = self._atlas.get(path) if self._atlas and path in self._atlas else cv2.imread(path, 0)
+            if gray is None:
+                raise TemplateNotFoundError("template image: {path} could not be read.".format(path=path))
+            template = Template(name=name, path=path, gray=gray)
+
+        with self._lock:
+            self._paths[path] = template
+            self._names.setdefault(name, template)
+
+        return template
+
+    def load(self, images, artifacts=None, atlas=True):
+        """
+        Load all templates present in the specified images dictionary (group -> name -> path), as well
+        as the artifacts dictionary (name -> path) if specified. Templates already loaded are skipped.
+
+        If atlas is True, templates are read from the template atlas, which is (re)built first if it
+        is missing or out of date. Templates are read from disk if the atlas is unavailable.
+        """
+        sources = template_sources(images=images, artifacts=artifacts)
+
+        if atlas and not self._atlas:
+            try:
+                self._atlas = TemplateAtlas.ensure(sources=sources)
+            except (AtlasError, OSError) as exc:
+                logger.warning("template atlas could not be used, templates will be read from disk: {exc}".format(exc=exc))
+
+        for path, name in sources.items():
+            if path not in self._paths:
+                self.register(name=name, path=path)
+
+        logger.debug("{count} template(s) loaded into the template registry.".format(count=len(self)))
+
+    def get(self, key):
+        """
+        Retrieve a template by its path or name, templates not yet present that are referenced by path
+        are registered on demand.
+        """
+        try:
+            return self._paths[key]
+        except KeyError:
+            pass
+        try:
+            return self._names[key]
+        except KeyError:
+            pass
+
+        return self.register(name=key.split("/")[-1].split(".")[0], path=key)
+
+
+# Module level registry, shared by every bot instance running in this process.
+registry = TemplateRegistry()
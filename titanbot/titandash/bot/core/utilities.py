@@ -6,6 +6,7 @@ from titandash.bot.external.imagesearch import *
 from titandash.models.globals import GlobalSettings
 
 from .maps import MASTER_LOCS
+from .screens import is_game_screen, SCREEN_WELCOME, SCREEN_RATE, SCREEN_AD
 from .constants import (
     STATS_LOOKUP_MULTIPLIER, STATS_TIMEDELTA_STR,
     LOGGER_NAME, LOGGER_FORMAT, LOGGER_FILE_NAME, LOGGER_FILE_NAME_STRFMT,
@@ -87,6 +88,18 @@ class GlobalsChecker:
         """
         return self._get_cache().rate_screen_checks_enabled
 
+    def _capture_thread_enabled(self):
+        """
+        Determine if our cached globals currently have the capture thread enabled.
+        """
+        return self._get_cache().capture_thread_enabled
+
+    def _vision_pool_enabled(self):
+        """
+        Determine if our cached globals currently have the vision pool enabled.
+        """
+        return self._get_cache().vision_pool_enabled
+
     def _logging_level(self):
         return self._get_cache().logging_level
 
@@ -121,6 +134,18 @@ class GlobalsChecker:
         """
         return self._rate_screen_checks_enabled()
 
+    def capture_thread(self):
+        """
+        Return a boolean to represent if the capture thread is enabled.
+        """
+        return self._capture_thread_enabled()
+
+    def vision_pool(self):
+        """
+        Return a boolean to represent if the vision pool is enabled.
+        """
+        return self._vision_pool_enabled()
+
     def logging_level(self):
         return self._logging_level()
 
@@ -320,31 +345,55 @@ def in_transition_func(*args, max_loops, **kwargs):
     loops = 0
 
     while True:
-        # Check for the early game/non vip game prompts that may pop up
-        # while playing the game.
-        _self.welcome_screen_check()
-        _self.rate_screen_check()
-
-        # Is a panel open that should be closed? This large exit panel will close any in game
-        # panels that may of been opened on accident.
-        _self.find_and_click(
-            image=_self.images.large_exit_panel,
-        )
-
-        # Is an ad panel open that should be accepted/declined?
-        _self.collect_ad_no_transition()
-
-        # Check the screen for any images that would represent a non active transition state.
-        # If any of these are found, it's safe to say that we are NOT in a transition.
-        if _self.grabber.search(
-                image=[
-                    _self.images.exit_panel, _self.images.clan_raid_ready, _self.images.clan_no_raid, _self.images.daily_reward, _self.images.icon_boss,
-                    _self.images.fight_boss, _self.images.hatch_egg, _self.images.leave_boss, _self.images.settings, _self.images.tournament,
-                    _self.images.pet_damage, _self.images.master_damage
-                ],
-                bool_only=True
-        ):
-            break
+        # Every check performed below shares a single capture of the game screen, the capture
+        # is only re-taken if one of the checks performs a click in game.
+        with _self.grabber.frame() as frame:
+            # Classify the current screen in a single pass first, the game screen itself
+            # (collapsed, or with a panel open) is never in a transition.
+            label = _self.classifier.classify(frame=frame.get())
+            if is_game_screen(label=label):
+                # In game panels and ads are not labelled by our classifier and may still be open on top of the
+                # game screen, these are closed first. We are only out of a transition once neither was present.
+                closed = _self.find_and_click(
+                    image=_self.images.large_exit_panel,
+                )
+                collected = _self.collect_ad_no_transition()
+                if not closed and not collected:
+                    break
+
+            # Known prompts are dispatched to their respective check directly.
+            elif label == SCREEN_WELCOME:
+                _self.welcome_screen_check()
+            elif label == SCREEN_RATE:
+                _self.rate_screen_check()
+            elif label == SCREEN_AD:
+                _self.collect_ad_no_transition()
+            else:
+                # Check for the early game/non vip game prompts that may pop up
+                # while playing the game.
+                _self.welcome_screen_check()
+                _self.rate_screen_check()
+
+                # Is a panel open that should be closed? This large exit panel will close any in game
+                # panels that may of been opened on accident.
+                _self.find_and_click(
+                    image=_self.images.large_exit_panel,
+                )
+
+                # Is an ad panel open that should be accepted/declined?
+                _self.collect_ad_no_transition()
+
+            # Check the screen for any images that would represent a non active transition state.
+            # If any of these are found, it's safe to say that we are NOT in a transition.
+            if frame.search(
+                    image=[
+                        _self.images.exit_panel, _self.images.clan_raid_ready, _self.images.clan_no_raid, _self.images.daily_reward, _self.images.icon_boss,
+                        _self.images.fight_boss, _self.images.hatch_egg, _self.images.leave_boss, _self.images.settings, _self.images.tournament,
+                        _self.images.pet_damage, _self.images.master_damage
+                    ],
+                    bool_only=True
+            ):
+                break
 
         # Clicking the top of the screen in case of a transition taking place due to something being
         # present on the screen that requires clicking.
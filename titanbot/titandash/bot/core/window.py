@@ -1,7 +1,7 @@
 from .constants import WINDOW_FILTER
 from .utilities import globals
+from .frame import Frame
 
-from PIL import Image
 from threading import Lock
 from ctypes import windll
 
@@ -10,6 +10,7 @@ import win32ui
 import win32api
 import win32con
 
+import numpy as np
 import time
 
 # Making use of a screenshot lock, instantiated at the module level of our window.py file.
@@ -166,7 +167,7 @@ class Window(object):
 
     def screenshot(self, region=None):
         """
-        Takes a screenshot of the current window.
+        Takes a screenshot of the current window, returned as a Frame.
 
         A region can be provided to also only pick out a certain bounding box of image
         data from the final image.
@@ -191,18 +192,6 @@ class Window(object):
             bmp_info = save_bitmap.GetInfo()
             bmp_str = save_bitmap.GetBitmapBits(True)
 
-            # Create the actual image object from our bitmap buffer
-            # generated above.
-            image = Image.frombuffer(
-                "RGB",
-                (bmp_info["bmWidth"], bmp_info["bmHeight"]),
-                bmp_str,
-                "raw",
-                "BGRX",
-                0,
-                1
-            )
-
             # Cleanup windows api objects for use in repeated
             # screenshots and functionality.
             save_dc.DeleteDC()
@@ -210,27 +199,23 @@ class Window(object):
             win32gui.ReleaseDC(self.hwnd, hwnd_dc)
             win32gui.DeleteObject(save_bitmap.GetHandle())
 
-            # Before our actual region cropping takes place, we also want to
-            # make sure that the window itself is already cropped to only be displaying
-            # the proper emulator content.
-            image = image.crop(
-                box=(
-                    0,
-                    self.y_padding,
-                    self.EMULATOR_WIDTH,
-                    self.EMULATOR_HEIGHT + self.y_padding
-                )
+        # Viewing our bitmap buffer (BGRX) as an array directly, and making sure that the
+        # window itself is cropped to only be displaying the proper emulator content. The
+        # frame created holds the only copy of the pixel data made.
+        padding = self.y_padding
+        frame = Frame(array=np.frombuffer(bmp_str, dtype=np.uint8).reshape(
+            (bmp_info["bmHeight"], bmp_info["bmWidth"], 4)
+        )[padding:self.EMULATOR_HEIGHT + padding, 0:self.EMULATOR_WIDTH, :3])
+
+        # If a region is present, we can ensure our image is cropped to the
+        # bounding box specified. The region should already take into account
+        # our expected y padding (ie: (110, 440) -> (110, 410). Give or take a couple of pixels.
+        if region:
+            frame = frame.crop(
+                box=region
             )
 
-            # If a region is present, we can ensure our image is cropped to the
-            # bounding box specified. The region should already take into account
-            # our expected y padding (ie: (110, 440) -> (110, 410). Give or take a couple of pixels.
-            if region:
-                image = image.crop(
-                    box=region
-                )
-
-            return image
+        return frame
 
     def json(self):
         """Convert window instance to a json compliant dictionary."""
@@ -0,0 +1,212 @@
+from titandash.bot.external.imagesearch import _match
+
+from .constants import VISION_POOL_WORKERS, VISION_PREPROCESS_MIN_PIXELS
+from .maps import IMAGES, ARTIFACT_MAP
+from .ocr import preprocess
+from .templates import registry
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import namedtuple
+from threading import Lock
+
+import multiprocessing
+import numpy as np
+import atexit
+import time
+import logging
+
+# Shared memory is only available on python 3.8+, our pool is unavailable otherwise.
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+logger = logging.getLogger(__name__)
+
+# Result of a single template matched by a worker, the latency is the time taken to match (in seconds).
+Match = namedtuple("Match", ["score", "position", "latency"])
+
+
+def _initialize():
+    """
+    Initialize a worker process, every template is loaded from the (memory mapped) template atlas up front.
+    """
+    registry.load(images=IMAGES, artifacts=ARTIFACT_MAP)
+
+
+def _search(shared, searches):
+    """
+    Match every (image, region) in the specified searches against the shared grayscale frame.
+    """
+    memory = shared_memory.SharedMemory(name=shared[0])
+    try:
+        return _search_frame(gray=np.ndarray(shared[1], dtype=np.uint8, buffer=memory.buf), searches=searches)
+    finally:
+        memory.close()
+
+
+def _search_frame(gray, searches):
+    results = []
+    for image, region in searches:
+        start = time.perf_counter()
+        score, position = _match(img_gray=gray[region[1]:region[3], region[0]:region[2]] if region else gray, template=registry.get(image).gray)
+        results.append(Match(score=score, position=tuple(position), latency=time.perf_counter() - start))
+
+    return results
+
+
+def _preprocess(shared, images):
+    """
+    Preprocess every (offset, shape, kwargs) in the specified images for OCR extraction (see ocr.py), each image is
+    read from the shared buffer at its offset.
+    """
+    memory = shared_memory.SharedMemory(name=shared[0])
+    try:
+        buffer = np.ndarray(shared[1], dtype=np.uint8, buffer=memory.buf)
+        return [preprocess(gray=buffer[offset:offset + shape[0] * shape[1]].reshape(shape), **kwargs) for offset, shape, kwargs in images]
+    finally:
+        memory.close()
+
+
+class SharedFrame(object):
+    """
+    SharedFrame copies a grayscale frame into a block of shared memory once, workers attach to the block
+    by name and read the frame without it ever being pickled. The block is released when the context exits.
+    """
+    def __init__(self, gray):
+        self.gray = np.ascontiguousarray(gray, dtype=np.uint8)
+        self.memory = None
+
+    def __enter__(self):
+        self.memory = shared_memory.SharedMemory(create=True, size=max(self.gray.nbytes, 1))
+        np.ndarray(self.gray.shape, dtype=np.uint8, buffer=self.memory.buf)[:] = self.gray
+
+        return self.memory.name, self.gray.shape
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.memory.close()
+        self.memory.unlink()
+
+
+class VisionPool(object):
+    """
+    VisionPool is a pool of worker processes that template matching and OCR preprocessing are offloaded to, so that
+    many bot instances running in the same process no longer contend for the GIL around the surrounding glue code.
+
+    Frames are handed to workers through shared memory, workers only ever return small results, except for batches of
+    OCR preprocessing, which are only offloaded when large enough to outweigh returning them. The pool is started
+    on first use, if a worker dies, the pool is restarted on the next use and None is returned in the meantime, so
+    that callers fall back to performing the work in process.
+    """
+    def __init__(self, workers=VISION_POOL_WORKERS):
+        self.workers = workers
+
+        self._executor = None
+        self._lock = Lock()
+
+    @property
+    def available(self):
+        return shared_memory is not None
+
+    @property
+    def running(self):
+        return self._executor is not None
+
+    def start(self):
+        """
+        Start our workers if they are not already running, returning the executor that work is submitted to.
+        """
+        with self._lock:
+            if self._executor is None:
+                # Workers are always spawned, forking a process running many threads is unsafe.
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_initialize)
+                logger.info("vision pool started with {workers} worker(s).".format(workers=self.workers))
+
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def _broken(self, executor, exc):
+        logger.warning("vision pool worker failed, the pool will be restarted: {exc}".format(exc=exc))
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+    def search(self, gray, searches, precision=None):
+        """
+        Match every (image, region) in the specified searches against the specified grayscale frame, the searches
+        are split evenly across our workers. Returns a list of matches (in order), or None if the pool failed.
+
+        Specifying a precision matches the searches in priority order instead, one wave (a search per worker) at a
+        time, stopping after the first wave any image is found in. Matches are only returned for searches performed.
+        """
+        executor = self.start()
+
+        try:
+            with SharedFrame(gray=gray) as shared:
+                if precision is not None:
+                    return self._search_first(executor=executor, shared=shared, searches=searches, precision=precision)
+
+                chunks = [searches[i::self.workers] for i in range(min(self.workers, len(searches)))]
+                results = [f.result() for f in [executor.submit(_search, shared, chunk) for chunk in chunks]]
+        except BrokenProcessPool as exc:
+            self._broken(executor=executor, exc=exc)
+            return None
+
+        # Chunks are interleaved, restoring the original order of our searches.
+        matches = [None] * len(searches)
+        for i, result in enumerate(results):
+            matches[i::self.workers] = result
+
+        return matches
+
+    def _search_first(self, executor, shared, searches, precision):
+        matches = []
+        for i in range(0, len(searches), self.workers):
+            wave = [executor.submit(_search, shared, [search]) for search in searches[i:i + self.workers]]
+            matches.extend(f.result()[0] for f in wave)
+            if any(match.score >= precision for match in matches[i:]):
+                break
+
+        return matches
+
+    def preprocess(self, images, min_pixels=VISION_PREPROCESS_MIN_PIXELS):
+        """
+        Preprocess a batch of grayscale images for OCR extraction, images are a list of (gray, kwargs), the kwargs are
+        passed along to the preprocess function (see ocr.py). Every image is copied into a single shared buffer and
+        split evenly across our workers.
+
+        Returns a list of processed images (in order), or None if the batch contains fewer than the minimum pixels
+        specified or the pool failed, the batch should be preprocessed in process instead.
+        """
+        if not images or sum(gray.size for gray, kwargs in images) < min_pixels:
+            return None
+
+        executor = self.start()
+
+        offsets = np.cumsum([0] + [gray.size for gray, kwargs in images])
+        batch = [(int(offset), gray.shape, kwargs) for offset, (gray, kwargs) in zip(offsets, images)]
+        chunks = [batch[i::self.workers] for i in range(min(self.workers, len(batch)))]
+
+        try:
+            with SharedFrame(gray=np.concatenate([np.ascontiguousarray(gray, dtype=np.uint8).ravel() for gray, kwargs in images])) as shared:
+                results = [f.result() for f in [executor.submit(_preprocess, shared, chunk) for chunk in chunks]]
+        except BrokenProcessPool as exc:
+            self._broken(executor=executor, exc=exc)
+            return None
+
+        processed = [None] * len(images)
+        for i, result in enumerate(results):
+            processed[i::self.workers] = result
+
+        return processed
+
+
+# Module level pool, shared by every bot instance running in this process.
+vision_pool = VisionPool()
+atexit.register(vision_pool.shutdown)
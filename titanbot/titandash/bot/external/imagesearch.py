@@ -1,20 +1,35 @@
+from titandash.bot.core.constants import (
+    SEARCH_POOL_WORKERS, PYRAMID_FACTOR, PYRAMID_CANDIDATES, PYRAMID_PADDING, PYRAMID_MIN_TEMPLATE
+)
+from titandash.bot.core.frame import as_frame
+from titandash.bot.core.templates import registry
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from itertools import islice
+
 import cv2
-import numpy as np
 import random
+import time
 
+# Bounded thread pool shared by every batched search in this process.
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=SEARCH_POOL_WORKERS, thread_name_prefix="imagesearch")
 
-def imagesearcharea(window, image, x1, y1, x2, y2, precision=0.8, im=None, logger=None):
+
+def imagesearcharea(window, image, x1, y1, x2, y2, precision=0.8, im=None, logger=None, pyramid=False, telemetry=None):
     """
     Searches for an image within an area
 
     input :
-    image : path to the image file (see opencv imread for supported types)
+    image : path or name of the template image (see templates.py), or a BGR image array
     x1 : top left x value
     y1 : top left y value
     x2 : bottom right x value
     y2 : bottom right y value
     precision : the higher, the lesser tolerant and fewer false positives are found default is 0.8
-    im : a PIL image, useful if you intend to search the same unchanging region for several elements
+    im : a Frame (or PIL image), useful if you intend to search the same unchanging region for several elements
+    pyramid : search a downscaled frame first, refining only the best candidates at full resolution
+    telemetry : optional search telemetry (see telemetry.py) the search is recorded into
 
     returns :
     the top left corner coordinates of the element if found as an array [x,y] or [-1,-1] if not
@@ -22,17 +37,33 @@ def imagesearcharea(window, image, x1, y1, x2, y2, precision=0.8, im=None, logge
     if im is None:
         im = window.screenshot(region=(x1, y1, x2, y2))
 
-    img_rgb = np.array(im)
-    img_gray = cv2.cvtColor(img_rgb, cv2.COLOR_BGR2GRAY)
+    # Every search is timed and recorded (when telemetry is specified), along with the best score found.
+    start = time.perf_counter()
+
+    # Pyramid searches only apply to templates from our registry, which cache their downscaled views.
+    if pyramid and isinstance(image, str):
+        max_val, max_loc = _pyramid_match(frame=as_frame(im), template=registry.get(image))
+        if telemetry:
+            telemetry.record(image=image, size=as_frame(im).size, score=max_val, precision=precision, latency=time.perf_counter() - start)
+        if max_val < precision:
+            return [-1, -1]
+        return max_loc
 
+    # The frames grayscale view is computed once and re-used by every template searched.
+    img_gray = as_frame(im).gray
+
+    # Templates are decoded once and retrieved from our registry,
+    # no disk reads take place while searching.
     if isinstance(image, str):
-        template = cv2.imread(image, 0)
+        template = registry.get(image).gray
     else:
         template = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
     try:
         res = cv2.matchTemplate(img_gray, template, cv2.TM_CCOEFF_NORMED)
         min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
+        if telemetry:
+            telemetry.record(image=image, size=as_frame(im).size, score=max_val, precision=precision, latency=time.perf_counter() - start)
         if max_val < precision:
             return [-1, -1]
         return max_loc
@@ -49,6 +80,156 @@ def imagesearcharea(window, image, x1, y1, x2, y2, precision=0.8, im=None, logge
         return [-1, -1]
 
 
+def _match(img_gray, template):
+    """
+    Match the specified template against the specified grayscale image, returning the best score and location.
+    """
+    try:
+        res = cv2.matchTemplate(img_gray, template, cv2.TM_CCOEFF_NORMED)
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
+        return max_val, max_loc
+    except cv2.error:
+        return -1.0, (-1, -1)
+
+
+def _pyramid_match(frame, template, factor=PYRAMID_FACTOR, candidates=PYRAMID_CANDIDATES, padding=PYRAMID_PADDING):
+    """
+    Match the specified template against the specified frame coarse to fine. The downscaled template is matched
+    against the downscaled frame, the best candidates are then refined at full resolution within a small window
+    around each candidate. Returns the best full resolution score and location.
+    """
+    img_gray = frame.gray
+
+    # Small templates lose too much detail when downscaled, and regions too small
+    # to contain the template can not be matched at all, exhaustive search is used.
+    if min(template.width, template.height) // factor < PYRAMID_MIN_TEMPLATE or frame.width < template.width or frame.height < template.height:
+        return _match(img_gray=img_gray, template=template.gray)
+
+    try:
+        coarse = cv2.matchTemplate(frame.gray_scaled(factor), template.scaled(factor), cv2.TM_CCOEFF_NORMED)
+    except cv2.error:
+        return _match(img_gray=img_gray, template=template.gray)
+
+    # Our padding also accounts for the location lost when downscaling.
+    padding += factor
+    best = -1.0, (-1, -1)
+
+    for i in range(candidates):
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(coarse)
+
+        # Suppress the area surrounding this candidate so the next candidate
+        # is taken from a different location within the frame.
+        cx, cy = max_loc
+        coarse[max(0, cy - template.height // (factor * 2)):cy + template.height // (factor * 2) + 1, max(0, cx - template.width // (factor * 2)):cx + template.width // (factor * 2) + 1] = -1
+
+        x1, y1 = max(0, cx * factor - padding), max(0, cy * factor - padding)
+        x2, y2 = min(frame.width, cx * factor + template.width + padding), min(frame.height, cy * factor + template.height + padding)
+
+        score, location = _match(img_gray=img_gray[y1:y2, x1:x2], template=template.gray)
+        if score > best[0]:
+            best = score, (x1 + location[0], y1 + location[1])
+
+    return best
+
+
+def imagesearchbatch(images, im, regions=None, precision=0.8, first=True, pool=None, telemetry=None):
+    """
+    Searches for many images within a single image, matching every image in parallel on our search pool.
+
+    When only the first image found is returned, images are matched in priority order, no further images are
+    matched once a higher priority image is found.
+
+    input :
+    images : list of paths or names of the template images (see templates.py), in priority order
+    im : a Frame (or PIL image) that every image is searched for in
+    regions : optional list of regions (x1, y1, x2, y2), one per image, None searches the entire image
+    precision : the higher, the lesser tolerant and fewer false positives are found default is 0.8
+    first : return only the first image found (in priority order) instead of every image found
+    pool : optional vision pool (see workers.py), images are matched on the pools worker processes instead
+    telemetry : optional search telemetry (see telemetry.py) every search is recorded into
+
+    returns :
+    a list of (image, [x,y], score) tuples for each image found, positions are relative to the images region.
+    when first is True, the list contains at most one element, the highest priority image found
+    """
+    frame = as_frame(im)
+    regions = regions or [None] * len(images)
+
+    # Grayscale views and crops are prepared up front, so our workers
+    # only ever read from the frame while matching.
+    gray = frame.gray
+    searches = [(image, frame.crop(box=region).gray if region else gray) for image, region in zip(images, regions)]
+
+    def search(image, img_gray):
+        start = time.perf_counter()
+        score, position = _match(img_gray=img_gray, template=registry.get(image).gray)
+        if telemetry:
+            telemetry.record(image=image, size=img_gray.shape[::-1], score=score, precision=precision, latency=time.perf_counter() - start)
+
+        return score, position
+
+    # Our vision pool is handed the full grayscale frame, cropping each region itself.
+    results = None
+    if pool and len(searches) > 1:
+        results = _pool_search(pool=pool, images=images, regions=regions, gray=gray, precision=precision, first=first, telemetry=telemetry)
+
+    if results is None:
+        # A single search (or a single worker) gains nothing from our thread pool.
+        if len(searches) == 1 or SEARCH_POOL_WORKERS == 1:
+            results = (search(*s) for s in searches)
+        elif first:
+            results = _first_search(search=search, searches=searches, precision=precision)
+        else:
+            results = _SEARCH_POOL.map(lambda s: search(*s), searches)
+
+    found = []
+    for (image, img_gray), (score, position) in zip(searches, results):
+        if score >= precision:
+            found.append((image, position, score))
+            if first:
+                break
+
+    return found
+
+
+def _first_search(search, searches, precision, workers=SEARCH_POOL_WORKERS):
+    """
+    Match the specified searches in priority order on our search pool, yielding each (score, position) in order.
+
+    At most one search per worker is submitted at once, the next search is only submitted as each result arrives.
+    Once an image is found, nothing else is submitted and any search still queued is cancelled.
+    """
+    remaining = iter(searches)
+    futures = deque(_SEARCH_POOL.submit(search, *s) for s in islice(remaining, workers))
+
+    while futures:
+        score, position = futures.popleft().result()
+        if score >= precision:
+            for future in futures:
+                future.cancel()
+            futures.clear()
+        else:
+            futures.extend(_SEARCH_POOL.submit(search, *s) for s in islice(remaining, 1))
+
+        yield score, position
+
+
+def _pool_search(pool, images, regions, gray, precision, first=False, telemetry=None):
+    """
+    Match every image on the specified vision pool, recording each search into the telemetry specified (if any). None is
+    returned if the pool failed. When first is True, only the images up to the first image found are matched.
+    """
+    matches = pool.search(gray=gray, searches=list(zip(images, regions)), precision=precision if first else None)
+    if matches is None:
+        return None
+
+    if telemetry:
+        for image, region, match in zip(images, regions, matches):
+            telemetry.record(image=image, size=(region[2] - region[0], region[3] - region[1]) if region else gray.shape[::-1], score=match.score, precision=precision, latency=match.latency)
+
+    return [(match.score, match.position) for match in matches]
+
+
 def click_image(window, image, pos, action, timestamp, offset=5, pause=0):
     """
     Click on the center of an image with a bit of random.
@@ -58,13 +239,13 @@ def click_image(window, image, pos, action, timestamp, offset=5, pause=0):
     this function doesn't search for the image, it's only meant for easy clicking on the images.
 
     input :
-    image : path to the image file (see opencv imread for supported types)
+    image : path or name of the template image (see templates.py)
     pos : array containing the position of the top left corner of the image [x,y]
     action : button of the mouse to activate : "left" "right" "middle", see pyautogui.click documentation for more info
     time : time taken for the mouse to move from where it was to the new position
     """
-    img = cv2.imread(image)
-    height, width, channels = img.shape
+    template = registry.get(image)
+    height, width = template.height, template.width
 
     point = int(pos[0] + r(width / 2, offset)), int(pos[1] + r(height / 2, offset))
     window.click(point=point, button=action, pause=pause)
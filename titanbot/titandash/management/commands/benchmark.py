@@ -0,0 +1,343 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from titandash.bot.core.maps import IMAGES, ARTIFACT_MAP, ANCHORS
+from titandash.bot.core.anchors import anchors
+from titandash.bot.core.changes import SearchCache
+from titandash.bot.core.grabber import Grabber
+from titandash.bot.core.atlas import TemplateAtlas, template_sources
+from titandash.bot.core.frame import as_frame
+from titandash.bot.core.screens import ScreenClassifier
+from titandash.bot.core.ocr import preprocess
+from titandash.bot.core.digits import digits
+from titandash.bot.core.workers import VisionPool, shared_memory
+from titandash.bot.core.templates import TemplateRegistry, registry
+from titandash.bot.external.imagesearch import imagesearcharea, imagesearchbatch
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES, STAGES, TEMPLATE_STAGES
+
+from PIL import Image
+from threading import Thread
+
+import numpy as np
+import pytesseract
+import cv2
+import time
+import logging
+
+
+class Command(BaseCommand):
+    """
+    Custom management command used to benchmark the vision functionality used by the bot, using the
+    test images available to the bot tests as our sample game screens.
+    """
+    help = "Benchmark bot vision functionality against the available test images."
+
+    BENCHMARKS = (
+        "templates",
+        "atlas",
+        "batch",
+        "pyramid",
+        "anchors",
+        "cache",
+        "screens",
+        "workers",
+        "digits",
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("benchmarks", nargs="*", help="Benchmarks to run (default: all): {benchmarks}".format(benchmarks=", ".join(self.BENCHMARKS)))
+        parser.add_argument("--iterations", type=int, default=20, help="Amount of times each benchmarked function is executed.")
+
+    def handle(self, *args, **options):
+        for benchmark in options["benchmarks"] or self.BENCHMARKS:
+            if benchmark not in self.BENCHMARKS:
+                raise CommandError("benchmark: {benchmark} does not exist.".format(benchmark=benchmark))
+
+            self.stdout.write("==================================================")
+            self.stdout.write("{benchmark}".format(benchmark=benchmark.upper()))
+            self.stdout.write("==================================================")
+            getattr(self, "benchmark_{benchmark}".format(benchmark=benchmark))(iterations=options["iterations"])
+
+    @staticmethod
+    def _time(function, iterations):
+        """
+        Execute the specified function the specified amount of times, returning the average execution time (ms).
+        """
+        start = time.perf_counter()
+        for i in range(iterations):
+            function()
+
+        return (time.perf_counter() - start) / iterations * 1000
+
+    @staticmethod
+    def _frames(group="PANELS"):
+        """
+        Retrieve every test image from the specified group as a frame.
+        """
+        return {key: as_frame(Image.open(path)) for key, path in TEST_IMAGES[group].items()}
+
+    def _write(self, label, value, unit="ms"):
+        self.stdout.write("{label:<40} {value:>10.3f} {unit}".format(label=label, value=value, unit=unit))
+
+    def benchmark_templates(self, iterations):
+        """
+        Compare a search that reads the template image from disk (cv2.imread) against a search that
+        reads the template from a pre-loaded template registry.
+        """
+        frames = self._frames()
+        templates = [path for group in IMAGES.values() for path in group.values()]
+
+        registry = TemplateRegistry()
+        load = self._time(function=lambda: TemplateRegistry().load(images=IMAGES), iterations=1)
+        registry.load(images=IMAGES)
+
+        def read_disk():
+            for template in templates:
+                cv2.imread(template, 0)
+
+        def read_registry():
+            for template in templates:
+                registry.get(template)
+
+        def search(read):
+            def _search():
+                for template in templates:
+                    cv2.minMaxLoc(cv2.matchTemplate(frame.gray, read(template), cv2.TM_CCOEFF_NORMED))
+            return _search
+
+        frame = frames["no_panel_open"]
+        disk = self._time(function=search(read=lambda t: cv2.imread(t, 0)), iterations=iterations) / len(templates)
+        memory = self._time(function=search(read=lambda t: registry.get(t).gray), iterations=iterations) / len(templates)
+
+        self._write(label="registry load ({count} templates)".format(count=len(registry)), value=load)
+        self._write(label="template read (imread)", value=self._time(function=read_disk, iterations=iterations) / len(templates))
+        self._write(label="template read (registry)", value=self._time(function=read_registry, iterations=iterations) / len(templates))
+        self._write(label="full frame search (imread)", value=disk)
+        self._write(label="full frame search (registry)", value=memory)
+
+    def benchmark_atlas(self, iterations):
+        """
+        Compare loading the template registry by reading every template from disk, against loading
+        the registry from the memory mapped template atlas.
+        """
+        sources = template_sources(images=IMAGES, artifacts=ARTIFACT_MAP)
+        atlas = TemplateAtlas.ensure(sources=sources)
+
+        self._write(label="registry load (disk)", value=self._time(function=lambda: TemplateRegistry().load(images=IMAGES, artifacts=ARTIFACT_MAP, atlas=False), iterations=iterations))
+        self._write(label="registry load (atlas)", value=self._time(function=lambda: TemplateRegistry().load(images=IMAGES, artifacts=ARTIFACT_MAP), iterations=iterations))
+        self._write(label="atlas validation (hashes)", value=self._time(function=lambda: atlas.current(sources=sources), iterations=iterations))
+        self._write(label="atlas size ({count} templates)".format(count=len(atlas)), value=atlas.index["size"] / 1024, unit="kb")
+
+    def benchmark_batch(self, iterations):
+        """
+        Compare searching for the images used by the transition check sequentially, against a single
+        batched search of every image.
+        """
+        frame = self._frames()["no_panel_open"]
+        registry.load(images=IMAGES, atlas=False)
+        images = [registry.get(key).path for key in (
+            "exit_panel", "clan_raid_ready", "clan_no_raid", "daily_reward", "icon_boss", "fight_boss",
+            "hatch_egg", "leave_boss", "settings", "tournament", "pet_damage", "master_damage"
+        )]
+
+        # Worst case, none of the images are found and every image is searched for.
+        def sequential():
+            for image in images:
+                imagesearcharea(window=None, image=image, x1=0, y1=0, x2=480, y2=800, precision=1.01, im=frame)
+
+        def batched():
+            imagesearchbatch(images=images, im=frame, precision=1.01)
+
+        self._write(label="sequential search ({count} images)".format(count=len(images)), value=self._time(function=sequential, iterations=iterations))
+        self._write(label="batched search ({count} images)".format(count=len(images)), value=self._time(function=batched, iterations=iterations))
+
+    def benchmark_pyramid(self, iterations):
+        """
+        Compare the exhaustive search against the coarse to fine (pyramid) search, for every template
+        against every test image available, reporting the latency of each and how often the searches agree.
+        """
+        frames = [frame for group in ("PANELS", "MASTER", "HEROES", "ADS") for frame in self._frames(group=group).values()]
+        templates = [path for group in IMAGES.values() for path in group.values()]
+        registry.load(images=IMAGES, atlas=False)
+
+        results = {}
+
+        def search(pyramid):
+            def _search():
+                results[pyramid] = [
+                    tuple(imagesearcharea(window=None, image=template, x1=0, y1=0, x2=480, y2=800, im=frame, pyramid=pyramid))
+                    for frame in frames for template in templates
+                ]
+            return _search
+
+        # Every template is searched for in every frame, a single pass is more than enough here.
+        searches = len(frames) * len(templates)
+        exhaustive = self._time(function=search(pyramid=False), iterations=1) / searches
+        pyramid = self._time(function=search(pyramid=True), iterations=1) / searches
+
+        found = [i for i, position in enumerate(results[False]) if position[0] != -1]
+        agree = [i for i in range(searches) if results[False][i] == results[True][i]]
+
+        self._write(label="exhaustive search", value=exhaustive)
+        self._write(label="pyramid search", value=pyramid)
+        self._write(label="agreement ({count} searches)".format(count=searches), value=len(agree) / searches * 100, unit="%")
+        self._write(label="agreement ({count} hits)".format(count=len(found)), value=len(set(found) & set(agree)) / max(len(found), 1) * 100, unit="%")
+
+    def benchmark_anchors(self, iterations):
+        """
+        Compare searching for every anchored image against checking the anchored image at its anchor.
+        """
+        # Test images are captures of the entire emulator window, the emulator
+        # title bar is cropped so that the anchor positions line up.
+        frames = [as_frame(frame.crop(box=(0, 32, 480, 832)).array.copy()) for frame in self._frames().values()]
+        for frame in frames:
+            frame.gray
+
+        def search():
+            for frame in frames:
+                for image in ANCHORS:
+                    imagesearcharea(window=None, image=image, x1=0, y1=0, x2=480, y2=800, im=frame)
+
+        def check():
+            for frame in frames:
+                for image in ANCHORS:
+                    anchors.check(frame=frame, image=image)
+
+        checks = len(frames) * len(ANCHORS)
+        conclusive = len([1 for frame in frames for image in ANCHORS if anchors.check(frame=frame, image=image)[0] is not None])
+
+        self._write(label="full search", value=self._time(function=search, iterations=iterations) / checks)
+        self._write(label="anchor check", value=self._time(function=check, iterations=iterations) / checks)
+        self._write(label="conclusive ({count} checks)".format(count=checks), value=conclusive / checks * 100, unit="%")
+
+    def benchmark_cache(self, iterations):
+        """
+        Compare repeatedly searching an unchanged screen with and without the search cache, each search is performed
+        against a new capture of the same screen (as the bot would when looping while waiting for the screen to change).
+        """
+        array = self._frames()["no_panel_open"].array
+        images = [path for path in IMAGES["GENERIC"].values()][:10]
+
+        class Window(object):
+            x, y, width, height = 0, 0, 480, 800
+
+        def search(grabber):
+            def _search():
+                grabber.current = as_frame(array.copy())
+                for image in images:
+                    grabber.search(image=image, testing=True)
+            return _search
+
+        cached = Grabber(window=Window(), logger=logging.getLogger(__name__), cache=SearchCache())
+        self._write(label="search ({count} images)".format(count=len(images)), value=self._time(function=search(Grabber(window=Window(), logger=logging.getLogger(__name__))), iterations=iterations))
+        self._write(label="cached search ({count} images)".format(count=len(images)), value=self._time(function=search(cached), iterations=iterations))
+        self._write(label="cache hit rate", value=cached.cache.rates["hit_rate"] * 100, unit="%")
+
+    def benchmark_screens(self, iterations):
+        """
+        Compare the searches performed by the transition check (the prompts, followed by the images that would
+        represent a non active transition state) against classifying the screen in a single pass.
+        """
+        frames = [as_frame(frame.crop(box=(0, 32, 480, 832)).array.copy()) for group in ("PANELS", "MASTER") for frame in self._frames(group=group).values()]
+        registry.load(images=IMAGES, atlas=False)
+        images = [IMAGES["WELCOME"]["welcome_header"], IMAGES["WELCOME"]["welcome_collect_no_vip"], IMAGES["RATE"]["rate_icon"], IMAGES["GENERIC"]["large_exit_panel"]] + [
+            IMAGES["ADS"][key] for key in ("collect_ad", "no_thanks", "watch_ad")
+        ] + [registry.get(key).path for key in (
+            "exit_panel", "clan_raid_ready", "clan_no_raid", "daily_reward", "icon_boss", "fight_boss",
+            "hatch_egg", "leave_boss", "settings", "tournament", "pet_damage", "master_damage"
+        )]
+
+        def search():
+            for frame in frames:
+                for image in images:
+                    imagesearcharea(window=None, image=image, x1=0, y1=0, x2=480, y2=800, im=frame)
+
+        def classify():
+            # A new classifier each time, so that cached labels are never used.
+            classifier = ScreenClassifier(anchors=anchors)
+            for frame in frames:
+                classifier.classify(frame=frame)
+
+        self._write(label="transition searches ({count} images)".format(count=len(images)), value=self._time(function=search, iterations=iterations) / len(frames))
+        self._write(label="screen classification", value=self._time(function=classify, iterations=iterations) / len(frames))
+
+    def benchmark_workers(self, iterations):
+        """
+        Compare the throughput of simulated bot instances (threads within a single process, as bots are run) each
+        performing batched searches and ocr preprocessing in process, against the same work performed on the vision
+        pool, scaling from a single instance up to one instance per core.
+        """
+        if shared_memory is None:
+            raise CommandError("the vision pool requires python 3.8+.")
+
+        array = self._frames()["no_panel_open"].array
+        registry.load(images=IMAGES, artifacts=ARTIFACT_MAP)
+        images = [registry.get(key).path for key in (
+            "exit_panel", "clan_raid_ready", "clan_no_raid", "daily_reward", "icon_boss", "fight_boss",
+            "hatch_egg", "leave_boss", "settings", "tournament", "pet_damage", "master_damage"
+        )]
+
+        pool = VisionPool()
+        pool.start()
+        # Warm up our workers, so that spawning them is never measured.
+        imagesearchbatch(images=images, im=as_frame(array.copy()), precision=1.01, pool=pool)
+
+        def instance(vision):
+            def _instance():
+                for i in range(iterations):
+                    # Each iteration represents a new capture, no grayscale view is re-used.
+                    frame = as_frame(array.copy())
+                    imagesearchbatch(images=images, im=frame, precision=1.01, pool=vision)
+                    gray = frame.crop(box=(0, 0, 480, 100)).gray
+                    if vision is None or vision.preprocess(images=[(gray, {"scale": 5, "threshold": 150, "invert": True})]) is None:
+                        preprocess(gray=gray, scale=5, threshold=150, invert=True)
+            return _instance
+
+        def throughput(count, vision):
+            threads = [Thread(target=instance(vision=vision)) for i in range(count)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            return count * iterations / (time.perf_counter() - start)
+
+        count = 1
+        while True:
+            self._write(label="in process ({count} instance(s))".format(count=count), value=throughput(count=count, vision=None), unit="it/s")
+            self._write(label="vision pool ({count} instance(s))".format(count=count), value=throughput(count=count, vision=pool), unit="it/s")
+            if count >= pool.workers:
+                break
+            count = min(count * 2, pool.workers)
+
+        pool.shutdown()
+
+    def benchmark_digits(self, iterations):
+        """
+        Compare reading each stage test image through tesseract (processed at five times the scale, using the digits
+        configuration) against reading each stage through our digit templates, along with the accuracy of each. Only
+        stages held out from our digit templates are used, digits recognized without enough confidence are counted
+        as incorrect (they would be recognized through tesseract instead).
+        """
+        samples = [(np.asarray(Image.open(path).convert("L")), expected) for path, expected in STAGES.items() if path not in TEMPLATE_STAGES]
+
+        def tesseract():
+            return [
+                "".join(filter(lambda c: c.isdigit(), pytesseract.image_to_string(
+                    image=Image.fromarray(preprocess(gray=gray, scale=5, threshold=150, invert=True)),
+                    config="--psm 7 --oem 0 nobatch digits"
+                ))) for gray, expected in samples
+            ]
+
+        def templates():
+            return [text if confidence >= digits.confidence else None for text, confidence in (digits.recognize(gray=gray) for gray, expected in samples)]
+
+        for label, function in (("tesseract", tesseract), ("digit templates", templates)):
+            try:
+                correct = sum(text == expected for text, (gray, expected) in zip(function(), samples))
+            except (pytesseract.TesseractNotFoundError, OSError) as exc:
+                self.stdout.write("{label:<40} unavailable: {exc}".format(label=label, exc=exc))
+                continue
+
+            self._write(label="{label} (per stage)".format(label=label), value=self._time(function=function, iterations=iterations) / len(samples))
+            self._write(label="{label} (accuracy)".format(label=label), value=correct / len(samples) * 100, unit="%")
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from titandash.bot.core.maps import IMAGES, ARTIFACT_MAP
+from titandash.bot.core.atlas import TemplateAtlas, template_sources
+
+from settings import LOCAL_DATA_ATLAS_INDEX_FILE
+
+
+class Command(BaseCommand):
+    """
+    Custom management command used to pack every template image used by the bot into the template
+    atlas present in the users titandash directory.
+
+    Bot instances rebuild the atlas automatically when it is out of date, this command may be used
+    to build the atlas ahead of time.
+    """
+    help = "Build the packed template atlas in users .titandash directory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rebuild the atlas even if it is current.")
+
+    def handle(self, *args, **options):
+        sources = template_sources(images=IMAGES, artifacts=ARTIFACT_MAP)
+
+        if options["force"]:
+            atlas = TemplateAtlas.build(sources=sources)
+        else:
+            atlas = TemplateAtlas.ensure(sources=sources)
+
+        self.stdout.write("Template atlas: {path} ({count} templates, {size} bytes).".format(
+            path=atlas.path,
+            count=len(atlas),
+            size=atlas.index["size"]
+        ))
+        self.stdout.write("Template atlas index: {path}.".format(path=LOCAL_DATA_ATLAS_INDEX_FILE))
@@ -5,6 +5,8 @@ from django.conf import settings
 from titanauth.models.user_reference import ExternalAuthReference
 
 from titandash.bot.core.window import WindowHandler
+from titandash.bot.core.ordering import CandidateOrdering
+from titandash.bot.core.telemetry import SearchTelemetry
 from titandash.models.bot import BotInstance
 from titandash.models.globals import GlobalSettings
 from titandash.models.statistics import Session, ArtifactStatistics, Statistics
@@ -47,6 +49,7 @@ class Command(BaseCommand):
             "ARTIFACTS": {},
             "STATISTICS": {},
             "CONFIGURATIONS": {},
+            "VISION": {},
             "MISCELLANEOUS": {},
         }
 
@@ -71,6 +74,16 @@ class Command(BaseCommand):
         if session.count() > 0:
             data["LAST_SESSION"] = session.first().json()
 
+        # Include the hit statistics of every list of images searched for by the bot,
+        # useful to determine how images are ordered when searched for.
+        data["VISION"]["ordering"] = CandidateOrdering().stats
+
+        # Include the search telemetry of the last session, the slowest templates, near misses
+        # and search volume are useful to determine which templates cause the bot to struggle.
+        if session.count() > 0:
+            telemetry = SearchTelemetry.load(path=os.path.join(bot_settings.LOCAL_DATA_TELEMETRY_DIR, "{uuid}.json".format(uuid=session.first().uuid)))
+            data["VISION"]["telemetry"] = telemetry.report() if telemetry else None
+
         # Including some miscellaneous information that can be added to
         # and used to include some useful variables.
         try:
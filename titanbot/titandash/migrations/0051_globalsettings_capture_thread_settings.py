@@ -0,0 +1,18 @@
+# Generated by Django 2.2.10 on 2020-05-02 14:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titandash', '0050_gamestatistics_tournament_points'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='globalsettings',
+            name='capture_thread_settings',
+            field=models.CharField(choices=[('on', 'On'), ('off', 'Off')], default='off', help_text='Enable or disable capturing the emulator window continuously in a background thread while a bot is running (turning this on may improve performance, since capturing the window no longer blocks the bot, at the cost of some additional cpu usage).', max_length=255, verbose_name='Enable Capture Thread'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.10 on 2020-05-03 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titandash', '0051_globalsettings_capture_thread_settings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='configuration',
+            name='enable_tapping_detection',
+            field=models.BooleanField(default=False, help_text='Enable the ability to only tap fairies and rewards detected on the screen, the entire screen is tapped whenever nothing can be detected reliably.', verbose_name='Enable Tapping Detection'),
+        ),
+    ]
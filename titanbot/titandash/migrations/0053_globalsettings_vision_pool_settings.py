@@ -0,0 +1,18 @@
+# Generated by Django 2.2.10 on 2020-05-03 16:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titandash', '0052_configuration_enable_tapping_detection'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='globalsettings',
+            name='vision_pool_settings',
+            field=models.CharField(choices=[('on', 'On'), ('off', 'Off')], default='off', help_text='Enable or disable matching images and preparing images for ocr on a pool of worker processes shared by every bot running (turning this on may improve performance when many bots are running at once, at the cost of some additional memory usage). <strong>Note:</strong> This setting requires python 3.8 or newer.', max_length=255, verbose_name='Enable Vision Pool'),
+        ),
+    ]
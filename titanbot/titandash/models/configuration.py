@@ -123,6 +123,7 @@ COMPRESSION_KEYS = {
     "enable_forbidden_contract": 114,
     "enable_summon_dagger": 115,
     "enable_tournament_parsing": 116,
+    "enable_tapping_detection": 117,
 }
 
 HELP_TEXT = {
@@ -133,6 +134,7 @@ HELP_TEXT = {
     "post_action_max_wait_time": "Determine the maximum amount of seconds to wait after an in game function is finished executing.",
     "enable_tapping": "Enable the ability to tap on titans (This also enables the clicking of fairies in game).",
     "tapping_repeat": "Specify how many times the tapping loop should run when executed.",
+    "enable_tapping_detection": "Enable the ability to only tap fairies and rewards detected on the screen, the entire screen is tapped whenever nothing can be detected reliably.",
     "enable_daily_rewards": "Enable the ability to collect daily rewards in game when they become available.",
     "enable_clan_crates": "Enable the ability to collect clan crates in game when they are available.",
     "enable_egg_collection": "Enable the ability to collect and hatch eggs in game.",
@@ -250,6 +252,7 @@ class Configuration(ParanoidModel, ExportModelMixin):
     # GENERIC Settings.
     enable_tapping = models.BooleanField(verbose_name="Enable Tapping", default=True, help_text=HELP_TEXT["enable_tapping"])
     tapping_repeat = models.PositiveIntegerField(verbose_name="Repeat Tapping", default=1, help_text=HELP_TEXT["tapping_repeat"])
+    enable_tapping_detection = models.BooleanField(verbose_name="Enable Tapping Detection", default=False, help_text=HELP_TEXT["enable_tapping_detection"])
     enable_daily_rewards = models.BooleanField(verbose_name="Enable Daily Rewards", default=True, help_text=HELP_TEXT["enable_daily_rewards"])
     enable_clan_crates = models.BooleanField(verbose_name="Enable Clan Crates", default=True, help_text=HELP_TEXT["enable_clan_crates"])
     enable_egg_collection = models.BooleanField(verbose_name="Enable Egg Collection", default=True, help_text=HELP_TEXT["enable_egg_collection"])
@@ -481,6 +484,7 @@ class Configuration(ParanoidModel, ExportModelMixin):
             "Generic": {
                 "enable_tapping": self.enable_tapping,
                 "tapping_repeat": self.tapping_repeat,
+                "enable_tapping_detection": self.enable_tapping_detection,
                 "enable_daily_rewards": self.enable_daily_rewards,
                 "enable_clan_crates": self.enable_clan_crates,
                 "enable_egg_collection": self.enable_egg_collection,
@@ -9,6 +9,8 @@ HELP_TEXT = {
     "pihole_ads_settings": "Enable or disable the ability to watch and collect ads without vip while using pihole to prevent ads from running within tap titans 2. This allows users to basically get the benefits of VIP, without a VIP enabled account. <strong>Note:</strong> This setting will only work if you have properly installed and setup a <a href='https://pi-hole.net/'>pihole</a> server. Titandash does <strong>not</strong> handle this process for you.",
     "welcome_screen_checks_settings": "Enable or disable the option to check for the welcome screen while a bot is running (turning this off may improve performance if you have disabled the welcome screen in your settings).",
     "rate_screen_checks_settings": "Enable or disable the option to check for the rate screen while a bot is running (turning this off may improve performance if you no longer get prompted to rate the game anymore).",
+    "capture_thread_settings": "Enable or disable capturing the emulator window continuously in a background thread while a bot is running (turning this on may improve performance, since capturing the window no longer blocks the bot, at the cost of some additional cpu usage).",
+    "vision_pool_settings": "Enable or disable matching images and preparing images for ocr on a pool of worker processes shared by every bot running (turning this on may improve performance when many bots are running at once, at the cost of some additional memory usage). <strong>Note:</strong> This setting requires python 3.8 or newer.",
     "logging_level": "Choose a logging level that will be used by bot sessions when they are running.",
 }
 
@@ -41,6 +43,16 @@ RATE_SCREEN_CHOICES = (
     (OFF, "Off")
 )
 
+CAPTURE_THREAD_CHOICES = (
+    (ON, "On"),
+    (OFF, "Off")
+)
+
+VISION_POOL_CHOICES = (
+    (ON, "On"),
+    (OFF, "Off")
+)
+
 
 class GlobalSettingsManager(models.Manager):
     def grab(self, qs=False):
@@ -75,6 +87,8 @@ class GlobalSettings(models.Model):
     pihole_ads_settings = models.CharField(verbose_name="Enable PI-Hole Ads", max_length=255, choices=PIHOLE_ADS_CHOICES, default=OFF, help_text=HELP_TEXT["pihole_ads_settings"])
     welcome_screen_checks_settings = models.CharField(verbose_name="Enable Welcome Screen Checks", max_length=255, choices=WELCOME_SCREEN_CHOICES, default=ON, help_text=HELP_TEXT["welcome_screen_checks_settings"])
     rate_screen_checks_settings = models.CharField(verbose_name="Enable Rate Screen Checks", max_length=255, choices=RATE_SCREEN_CHOICES, default=ON, help_text=HELP_TEXT["rate_screen_checks_settings"])
+    capture_thread_settings = models.CharField(verbose_name="Enable Capture Thread", max_length=255, choices=CAPTURE_THREAD_CHOICES, default=OFF, help_text=HELP_TEXT["capture_thread_settings"])
+    vision_pool_settings = models.CharField(verbose_name="Enable Vision Pool", max_length=255, choices=VISION_POOL_CHOICES, default=OFF, help_text=HELP_TEXT["vision_pool_settings"])
     logging_level = models.CharField(verbose_name="Logging Level", max_length=255, choices=LOGGING_LEVEL_CHOICES, default=INFO, help_text=HELP_TEXT["logging_level"])
 
     def __str__(self):
@@ -91,6 +105,8 @@ class GlobalSettings(models.Model):
             "pihole_settings": self.pihole_ads_settings,
             "welcome_screen_checks_settings": self.welcome_screen_checks_settings,
             "rate_screen_checks_settings": self.rate_screen_checks_settings,
+            "capture_thread_settings": self.capture_thread_settings,
+            "vision_pool_settings": self.vision_pool_settings,
             "logging_level": self.logging_level,
         }
 
@@ -107,6 +123,8 @@ class GlobalSettings(models.Model):
                 "pihole_settings": PIHOLE_ADS_CHOICES,
                 "welcome_screen_checks_settings": WELCOME_SCREEN_CHOICES,
                 "rate_screen_checks_settings": RATE_SCREEN_CHOICES,
+                "capture_thread_settings": CAPTURE_THREAD_CHOICES,
+                "vision_pool_settings": VISION_POOL_CHOICES,
                 "logging_level": LOGGING_LEVEL_CHOICES
             }
         }
@@ -130,3 +148,11 @@ class GlobalSettings(models.Model):
     @property
     def rate_screen_checks_enabled(self):
         return self.rate_screen_checks_settings == ON
+
+    @property
+    def capture_thread_enabled(self):
+        return self.capture_thread_settings == ON
+
+    @property
+    def vision_pool_enabled(self):
+        return self.vision_pool_settings == ON
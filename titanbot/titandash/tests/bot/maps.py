@@ -69,3 +69,25 @@ IMAGES = {
         "tournament_points": TEST_IMAGE_DIR + "/stats/test_set/tournament_points.png",
     },
 }
+
+# Stage ocr test images, along with the expected stage present in each one. The digit templates
+# used by the bot (data/images/digits) are extracted from the template stages only, every other
+# stage is held out so that recognition is tested against glyphs the templates have never seen.
+STAGES = {
+    TEST_IMAGE_DIR + "/ocr/stage/test_stage_01.png": "12493",
+    TEST_IMAGE_DIR + "/ocr/stage/test_stage_02.png": "10651",
+    TEST_IMAGE_DIR + "/ocr/stage/test_stage_03.png": "11289",
+    TEST_IMAGE_DIR + "/ocr/stage/test_stage_04.png": "10411",
+    TEST_IMAGE_DIR + "/ocr/stage/test_stage_05.png": "10920",
+    TEST_IMAGE_DIR + "/ocr/stage/test_stage_06.png": "7111",
+    TEST_IMAGE_DIR + "/ocr/stage/test_stage_07.png": "9840",
+    TEST_IMAGE_DIR + "/ocr/stage/test_stage_08.png": "7284",
+    TEST_IMAGE_DIR + "/ocr/stage/test_stage_09.png": "7180",
+}
+TEMPLATE_STAGES = (
+    TEST_IMAGE_DIR + "/ocr/stage/test_stage_01.png",
+    TEST_IMAGE_DIR + "/ocr/stage/test_stage_02.png",
+    TEST_IMAGE_DIR + "/ocr/stage/test_stage_03.png",
+    TEST_IMAGE_DIR + "/ocr/stage/test_stage_05.png",
+    TEST_IMAGE_DIR + "/ocr/stage/test_stage_06.png",
+)
@@ -0,0 +1,88 @@
+"""
+test_atlas.py
+
+Test the functionality related to the packed, memory mapped template atlas.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.maps import IMAGES
+from titandash.bot.core.atlas import TemplateAtlas, template_sources
+from titandash.bot.core.templates import TemplateRegistry
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import cv2
+import os
+import json
+import tempfile
+
+
+class TestTemplateAtlas(TestCase):
+    """Test functionality related to building, opening and validating the template atlas."""
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "templates.atlas")
+        self.index_path = os.path.join(self.directory.name, "templates.json")
+        self.sources = template_sources(images={"GENERIC": IMAGES["GENERIC"]})
+        self.atlas = TemplateAtlas.build(sources=self.sources, path=self.path, index_path=self.index_path)
+
+    def tearDown(self):
+        self.atlas = None
+        self.directory.cleanup()
+
+    def test_build(self):
+        """Test that every template in the atlas matches the template read from disk."""
+        self.assertEqual(len(self.atlas), len(self.sources))
+
+        for path in self.sources:
+            self.assertTrue(np.array_equal(self.atlas.get(path), cv2.imread(path, 0)))
+
+    def test_current(self):
+        """Test that an atlas is no longer current when templates are added, or when a hash changes."""
+        self.assertTrue(self.atlas.current(sources=self.sources))
+        self.assertFalse(self.atlas.current(sources=template_sources(images=IMAGES)))
+
+        with open(self.index_path, "r") as f:
+            index = json.load(f)
+        index["templates"][next(iter(self.sources))]["hash"] = "outdated"
+        with open(self.index_path, "w") as f:
+            json.dump(index, f)
+
+        self.assertFalse(TemplateAtlas.open(path=self.path, index_path=self.index_path).current(sources=self.sources))
+
+    def test_registry_from_atlas(self):
+        """Test that the registry reads its templates from the atlas when one is available."""
+        registry = TemplateRegistry()
+        registry._atlas = self.atlas
+        registry.load(images={"GENERIC": IMAGES["GENERIC"]})
+
+        template = registry.get("exit_panel")
+        self.assertFalse(template.gray.flags.writeable)
+        self.assertTrue(np.array_equal(template.gray, cv2.imread(template.path, 0)))
+
+    def test_rebuild(self):
+        """Test that rebuilding never writes over the data of an atlas that is still open."""
+        previous = self.atlas
+        rebuilt = TemplateAtlas.build(sources=self.sources, path=self.path, index_path=self.index_path)
+
+        self.assertNotEqual(rebuilt.index["build"], previous.index["build"])
+        self.assertNotEqual(rebuilt.path, previous.path)
+        for path in self.sources:
+            self.assertTrue(np.array_equal(previous.get(path), rebuilt.get(path)))
+
+        # The index swapped into place names the data file of the latest build.
+        self.assertEqual(TemplateAtlas.open(path=self.path, index_path=self.index_path).index["build"], rebuilt.index["build"])
+
+    def test_concurrent_builds(self):
+        """Test that concurrent builds always leave an index paired with the data of its own build."""
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            builds = list(executor.map(lambda i: TemplateAtlas.build(sources=self.sources, path=self.path, index_path=self.index_path), range(4)))
+
+        atlas = TemplateAtlas.open(path=self.path, index_path=self.index_path)
+        self.assertIn(atlas.index["build"], [build.index["build"] for build in builds])
+        for path in self.sources:
+            self.assertTrue(np.array_equal(atlas.get(path), cv2.imread(path, 0)))
+
+        # No temporary files are left behind.
+        self.assertFalse([name for name in os.listdir(self.directory.name) if name.endswith(".tmp")])
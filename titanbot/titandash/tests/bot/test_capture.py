@@ -0,0 +1,112 @@
+"""
+test_capture.py
+
+Test the functionality related to capturing the game window in the background.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.capture import CaptureThread, CaptureTimeout
+from titandash.bot.core.frame import as_frame
+from titandash.bot.core.grabber import Grabber
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+
+from PIL import Image
+
+import time
+import logging
+import threading
+
+
+class CaptureWindow(object):
+    """Minimal window that "captures" a test image, counting every capture taken."""
+    x, y, width, height = 0, 0, 480, 800
+
+    def __init__(self):
+        self.frame = as_frame(Image.open(TEST_IMAGES["PANELS"]["no_panel_open"])).crop(box=(0, 32, 480, 832))
+        self.captures = 0
+
+    def screenshot(self, region=None):
+        self.captures += 1
+        frame = self.frame.copy()
+        return frame.crop(box=region) if region else frame
+
+
+class TestCaptureThread(TestCase):
+    """Test functionality related to the capture thread and its ring buffer."""
+    def setUp(self):
+        self.window = CaptureWindow()
+        self.capture = CaptureThread(window=self.window, size=3, interval=0.01)
+
+    def tearDown(self):
+        self.capture.stop()
+
+    def test_ring_buffer(self):
+        """Test that captures are sequenced and only the most recent captures are buffered."""
+        for i in range(5):
+            self.capture.publish(frame=self.window.screenshot())
+
+        self.assertEqual(self.capture.latest().sequence, 5)
+        self.assertEqual([capture.sequence for capture in self.capture._buffer], [3, 4, 5])
+
+    def test_after(self):
+        """Test that consumers wait for a capture newer than a sequence."""
+        self.capture.publish(frame=self.window.screenshot())
+        threading.Timer(0.05, lambda: self.capture.publish(frame=self.window.screenshot())).start()
+
+        self.assertEqual(self.capture.after(sequence=1, timeout=1).sequence, 2)
+        with self.assertRaises(CaptureTimeout):
+            self.capture.after(sequence=2, timeout=0.05)
+
+    def test_since(self):
+        """Test that consumers wait for a capture taken after a point in time."""
+        self.capture.publish(frame=self.window.screenshot(), timestamp=time.time() - 10)
+
+        with self.assertRaises(CaptureTimeout):
+            self.capture.since(timestamp=time.time() - 5, timeout=0.05)
+
+        self.capture.start()
+        self.assertGreater(self.capture.since(timestamp=time.time(), timeout=1).sequence, 1)
+
+    def test_grabber(self):
+        """Test that grabber snapshots use the capture thread, and are local to each thread."""
+        grabber = Grabber(window=self.window, logger=logging.getLogger(__name__), capture=self.capture)
+        self.capture.start()
+
+        self.assertEqual(grabber.snapshot().size, (480, 800))
+        self.assertEqual(grabber.snapshot(region=(0, 0, 100, 100)).size, (100, 100))
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(grabber.current))
+        thread.start()
+        thread.join()
+
+        self.assertIsNone(other[0])
+
+    def test_grabber_stopped(self):
+        """Test that grabber snapshots capture the window directly when the capture thread is not running."""
+        grabber = Grabber(window=self.window, logger=logging.getLogger(__name__), capture=self.capture)
+        grabber.snapshot()
+
+        self.assertEqual(self.window.captures, 1)
+        self.assertIsNone(self.capture.latest())
+
+    def test_grabber_action(self):
+        """Test that captures beginning while an action is being performed are never used once it is performed."""
+        # The capture thread blocks within its first capture, it is running but never publishes on its own.
+        release = threading.Event()
+        self.window.screenshot = lambda region=None: release.wait(timeout=5) and self.window.frame.copy()
+        grabber = Grabber(window=self.window, logger=logging.getLogger(__name__), capture=self.capture)
+        self.capture.start()
+
+        before, after = self.window.frame.copy(), self.window.frame.copy()
+        try:
+            grabber.expire()
+            # A capture begins while the action is being sent to the window, showing the screen before the action.
+            self.capture.publish(frame=before, timestamp=time.time())
+            time.sleep(0.01)
+            grabber.expire(after=True)
+
+            threading.Timer(0.05, lambda: self.capture.publish(frame=after)).start()
+            self.assertIs(grabber.snapshot(), after)
+        finally:
+            release.set()
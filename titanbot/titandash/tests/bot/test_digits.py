@@ -0,0 +1,71 @@
+"""
+test_digits.py
+
+Test the functionality related to recognizing digits written in the games font without tesseract.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.digits import DigitRecognizer, digits
+from titandash.tests.bot.maps import STAGES, TEMPLATE_STAGES
+
+from PIL import Image
+
+import numpy as np
+
+
+class TestDigitRecognizer(TestCase):
+    """Test functionality related to segmenting and classifying digit glyphs."""
+    @classmethod
+    def setUpClass(cls):
+        super(TestDigitRecognizer, cls).setUpClass()
+        cls.samples = {path: (np.asarray(Image.open(path).convert("L")), expected) for path, expected in STAGES.items()}
+        cls.held_out = [sample for path, sample in cls.samples.items() if path not in TEMPLATE_STAGES]
+
+    def test_segment(self):
+        """Test that every stage image is segmented into one glyph per digit."""
+        for gray, expected in self.samples.values():
+            self.assertEqual(len(digits.segment(gray=gray)), len(expected))
+
+    def test_recognize_held_out(self):
+        """Test that stages never used to extract our templates are recognized, or left to tesseract."""
+        self.assertTrue(self.held_out)
+
+        confident = 0
+        for gray, expected in self.held_out:
+            text, confidence = digits.recognize(gray=gray)
+            if confidence >= digits.confidence:
+                confident += 1
+                self.assertEqual(text, expected)
+
+        self.assertGreater(confident, 0)
+
+    def test_recognize_cut_off(self):
+        """Test that a crop with a glyph cut off by its edge is never recognized with confidence."""
+        for gray, expected in self.samples.values():
+            for offset in range(1, 7):
+                for crop in (gray[:, offset:], gray[:, :-offset]):
+                    text, confidence = digits.recognize(gray=crop)
+                    if confidence >= digits.confidence:
+                        self.assertEqual(text, expected)
+
+        # The leading digit of this stage is cut off once the crop is shifted by four pixels.
+        gray, expected = self.samples[[path for path in STAGES if STAGES[path] == "10411"][0]]
+        self.assertEqual(digits.recognize(gray=gray[:, 4:]), ("", 0.0))
+        self.assertIsNone(digits.segment(gray=gray[:, 4:]))
+
+    def test_recognize_unseen(self):
+        """Test that stages are recognized by templates extracted without them, unless a digit was never seen."""
+        samples = list(self.samples.values())
+        for index, (gray, expected) in enumerate(samples):
+            templates = DigitRecognizer.extract(samples=samples[:index] + samples[index + 1:])
+            recognizer = DigitRecognizer(templates=templates)
+            text, confidence = recognizer.recognize(gray=gray)
+
+            if set(expected) <= set(templates):
+                self.assertEqual(text, expected)
+            else:
+                self.assertLess(confidence, recognizer.confidence)
+
+    def test_recognize_empty(self):
+        """Test that an image without any glyphs is recognized with no confidence."""
+        self.assertEqual(digits.recognize(gray=np.zeros((16, 48), dtype=np.uint8)), ("", 0.0))
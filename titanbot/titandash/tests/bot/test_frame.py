@@ -0,0 +1,148 @@
+"""
+test_frame.py
+
+Test the functionality related to the Frame objects used to represent captures of the game screen.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.constants import FRAME_MAX_AGE
+from titandash.bot.core.frame import Frame, as_frame, as_image
+from titandash.bot.core.grabber import Grabber
+from titandash.bot.core.maps import IMAGES as BOT_IMAGES
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+
+from PIL import Image
+
+import numpy as np
+import logging
+import threading
+
+
+class TestFrame(TestCase):
+    """Test functionality related to the Frame conversions and cached views."""
+    def setUp(self):
+        self.image = Image.open(TEST_IMAGES["PANELS"]["heroes_expanded"]).convert("RGB")
+        self.frame = as_frame(self.image)
+
+    def test_round_trip(self):
+        """Test that converting an image into a frame and back retains all pixel data."""
+        self.assertTrue(np.array_equal(np.array(self.image), np.array(as_image(self.frame))))
+
+    def test_getpixel(self):
+        """Test that frame pixels are retrieved as RGB colors, mirroring the PIL Image api."""
+        for point in [(0, 0), (10, 10), (240, 400)]:
+            self.assertEqual(self.frame.getpixel(point), self.image.getpixel(point))
+
+    def test_crop_cached(self):
+        """Test that repeated crops of the same region return the same frame."""
+        region = (10, 10, 50, 60)
+
+        self.assertIs(self.frame.crop(box=region), self.frame.crop(box=region))
+        self.assertEqual(self.frame.crop(box=region).size, (40, 50))
+
+    def test_crop_gray_from_parent(self):
+        """Test that cropped frames derive their grayscale view from the parent frame."""
+        gray = self.frame.gray
+        crop = self.frame.crop(box=(10, 10, 50, 60))
+
+        self.assertTrue(np.array_equal(crop.gray, gray[10:60, 10:50]))
+        self.assertTrue(np.shares_memory(crop.gray, gray))
+
+    def test_as_frame(self):
+        """Test that frames are returned as is when coerced."""
+        self.assertIs(as_frame(self.frame), self.frame)
+        self.assertIsInstance(as_frame(np.zeros((10, 10, 3), dtype=np.uint8)), Frame)
+
+
+class FrameWindow(object):
+    """Minimal window that "captures" a test image, counting every capture taken."""
+    x, y, width, height = 0, 0, 480, 800
+
+    def __init__(self):
+        self.frame = as_frame(Image.open(TEST_IMAGES["PANELS"]["no_panel_open"])).crop(box=(0, 32, 480, 832))
+        self.captures = 0
+
+    def screenshot(self, region=None):
+        self.captures += 1
+        frame = self.frame.copy()
+        return frame.crop(box=region) if region else frame
+
+
+class TestFrameContext(TestCase):
+    """Test functionality related to evaluating many checks against a single capture."""
+    def setUp(self):
+        self.window = FrameWindow()
+        self.grabber = Grabber(window=self.window, logger=logging.getLogger(__name__))
+        self.images = [BOT_IMAGES["NO_PANELS"]["settings"], BOT_IMAGES["NO_PANELS"]["tournament"], BOT_IMAGES["GENERIC"]["exit_panel"]]
+
+    def test_single_capture(self):
+        """Test that every search, color check and crop within a context is evaluated against a single capture."""
+        with self.grabber.frame() as frame:
+            for image in self.images:
+                frame.search(image=image, bool_only=True)
+            frame.search(image=self.images, bool_only=True)
+            frame.search_many(images=self.images, first=False)
+            frame.pixel(point=(10, 10), color=(0, 0, 0))
+            frame.crop(region=(0, 0, 100, 100))
+            self.grabber.snapshot(region=(0, 0, 100, 100))
+
+        self.assertEqual(self.window.captures, 1)
+
+    def test_outside_context(self):
+        """Test that every search outside of a context takes its own capture."""
+        for image in self.images:
+            self.grabber.search(image=image, bool_only=True)
+
+        self.assertEqual(self.window.captures, len(self.images))
+        self.assertIsNone(self.grabber.active)
+
+    def test_nested(self):
+        """Test that nested contexts re-use the capture of the outermost context."""
+        with self.grabber.frame() as outer:
+            image = outer.get()
+            with self.grabber.frame() as inner:
+                self.assertIs(inner, outer)
+                self.assertIs(inner.get(), image)
+            # Closing the nested context leaves the outer context active.
+            self.assertIs(self.grabber.active, outer)
+            self.assertIs(outer.get(), image)
+
+        self.assertIsNone(self.grabber.active)
+        self.assertEqual(self.window.captures, 1)
+
+    def test_expire(self):
+        """Test that actions modifying the screen (clicks, drags) force a new capture."""
+        with self.grabber.frame() as frame:
+            image = frame.get()
+            frame.search(image=self.images[0], bool_only=True)
+
+            # Clicks and drags performed by the bot expire the grabber before acting.
+            self.grabber.expire()
+            self.assertIsNot(frame.get(), image)
+            self.assertEqual(self.window.captures, 2)
+
+            # Fresh snapshots always expire the current capture.
+            self.grabber.snapshot(fresh=True)
+            self.assertEqual(self.window.captures, 3)
+
+    def test_max_age(self):
+        """Test that captures older than the maximum frame age are taken again."""
+        with self.grabber.frame() as frame:
+            image = frame.get()
+            frame.timestamp -= FRAME_MAX_AGE / 2
+            self.assertIs(frame.get(), image)
+
+            frame.timestamp -= FRAME_MAX_AGE
+            self.assertIsNot(frame.get(), image)
+
+        self.assertEqual(self.window.captures, 2)
+
+    def test_thread_local(self):
+        """Test that contexts are local to the thread that opened them."""
+        active = []
+        with self.grabber.frame():
+            thread = threading.Thread(target=lambda: active.append(self.grabber.active))
+            thread.start()
+            thread.join()
+
+        self.assertEqual(active, [None])
@@ -0,0 +1,76 @@
+"""
+test_grid.py
+
+Test the functionality related to scanning every slot of a panel against a single capture.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.frame import as_frame
+from titandash.bot.core.grid import GridScanner
+from titandash.bot.core.maps import IMAGES as BOT_IMAGES, HERO_COORDS, EQUIPMENT_COORDS
+from titandash.bot.core.templates import registry
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+
+from PIL import Image
+
+import cv2
+
+HERO_CHECKS = {
+    "melee": ("type", BOT_IMAGES["HEROES"]["melee_type"]),
+    "spell": ("type", BOT_IMAGES["HEROES"]["spell_type"]),
+    "ranged": ("type", BOT_IMAGES["HEROES"]["ranged_type"]),
+    "zero_dps": ("dps", BOT_IMAGES["HEROES"]["zero_dps"]),
+}
+GEAR_CHECKS = {
+    "equip": ("base", BOT_IMAGES["EQUIPMENT"]["equip"]),
+    "locked": ("locked", BOT_IMAGES["EQUIPMENT"]["locked"]),
+    "melee": ("bonus", BOT_IMAGES["HEROES"]["bonus_melee"]),
+}
+
+
+class TestGridScanner(TestCase):
+    """Test functionality related to scanning the slots of the heroes and equipment panels."""
+    @staticmethod
+    def frame(image):
+        # Test images are captures of the entire emulator window, the emulator title bar is cropped.
+        return as_frame(as_frame(Image.open(image)).crop(box=(0, 32, 480, 832)).array.copy())
+
+    def assertScoresMatch(self, frame, slots, checks):
+        """Assert that the score of every slot is identical to matching each slot individually."""
+        scores = GridScanner(slots=slots, checks=checks).scores(frame=frame)
+        for index, slot in enumerate(slots):
+            for name, (field, image) in checks.items():
+                region = slot[field]
+                expected = cv2.minMaxLoc(cv2.matchTemplate(frame.gray[region[1]:region[3], region[0]:region[2]], registry.get(image).gray, cv2.TM_CCOEFF_NORMED))[1]
+                self.assertAlmostEqual(scores[name][index], expected, places=3)
+
+    def test_scores_heroes(self):
+        """Test that every hero slot scores the same as matching each slot individually."""
+        self.assertScoresMatch(frame=self.frame(TEST_IMAGES["PANELS"]["heroes_expanded"]), slots=HERO_COORDS["heroes"], checks=HERO_CHECKS)
+
+    def test_scores_gear(self):
+        """Test that every gear slot scores the same as matching each slot individually."""
+        self.assertScoresMatch(frame=self.frame(TEST_IMAGES["PANELS"]["equipment_expanded"]), slots=EQUIPMENT_COORDS["gear"], checks=GEAR_CHECKS)
+
+    def test_scan_heroes(self):
+        """Test that the hero table represents the heroes present on the heroes panel."""
+        table = GridScanner(slots=HERO_COORDS["heroes"], checks=HERO_CHECKS).scan(frame=self.frame(TEST_IMAGES["PANELS"]["heroes_expanded"]))
+
+        self.assertEqual(len(table), len(HERO_COORDS["heroes"]))
+        self.assertEqual(table[0], {"melee": False, "spell": False, "ranged": True, "zero_dps": True})
+        self.assertEqual(table[1], {"melee": False, "spell": True, "ranged": False, "zero_dps": False})
+        self.assertEqual(table[2], {"melee": False, "spell": False, "ranged": True, "zero_dps": False})
+
+    def test_scan_gear(self):
+        """Test that the gear table represents the locked gear present on the equipment panel."""
+        table = GridScanner(slots=EQUIPMENT_COORDS["gear"], checks=GEAR_CHECKS).scan(frame=self.frame(TEST_IMAGES["PANELS"]["equipment_expanded"]))
+
+        self.assertEqual(len(table), len(EQUIPMENT_COORDS["gear"]))
+        self.assertEqual([index for index, slot in enumerate(table) if slot["locked"]], [3])
+
+    def test_scan_template_too_large(self):
+        """Test that slots smaller than a template never contain the template."""
+        slots = [{"small": (0, 0, 5, 5)}, {"small": (10, 10, 15, 15)}]
+        scanner = GridScanner(slots=slots, checks={"zero_dps": ("small", BOT_IMAGES["HEROES"]["zero_dps"])})
+
+        self.assertEqual(scanner.scores(frame=self.frame(TEST_IMAGES["PANELS"]["heroes_expanded"]))["zero_dps"], [-1.0, -1.0])
@@ -0,0 +1,160 @@
+"""
+test_ocr_engines.py
+
+Test the functionality related to the pool of long lived ocr engines, caching their results and recognizing
+stitched images at once.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.engines import OcrConfig, OcrEnginePool, OcrCache
+from titandash.bot.core.ocr import stitch, assign
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+from PIL import Image
+
+import numpy as np
+
+
+class CountingEngine(object):
+    """Engine returning its configuration along with the amount of images it has recognized."""
+    def __init__(self, config):
+        self.config = config
+        self.recognized = 0
+        self.closed = False
+
+    def recognize(self, image):
+        self.recognized += 1
+        return "{config}:{recognized}".format(config=self.config, recognized=self.recognized)
+
+    def close(self):
+        self.closed = True
+
+
+class TestOcrConfig(TestCase):
+    """Test functionality related to parsing tesseract command line configurations."""
+    def test_parse(self):
+        """Test that every part of a configuration is parsed."""
+        config = OcrConfig.parse("--psm 7 --oem 0 -c tessedit_char_whitelist=0123456789 nobatch digits")
+
+        self.assertEqual(config.psm, 7)
+        self.assertEqual(config.oem, 0)
+        self.assertEqual(config.configs, ("nobatch", "digits"))
+        self.assertEqual(config.variables, (("tessedit_char_whitelist", "0123456789"),))
+
+    def test_parse_defaults(self):
+        """Test that an empty configuration leaves every part unspecified."""
+        self.assertEqual(OcrConfig.parse(""), OcrConfig(psm=None, oem=None, configs=(), variables=()))
+
+    def test_lines(self):
+        """Test that a line configuration only replaces the page segmentation mode."""
+        self.assertEqual(OcrConfig.lines("--psm 7 --oem 0 nobatch digits"), "--psm 6 --oem 0 nobatch digits")
+        self.assertEqual(OcrConfig.lines(""), "--psm 6")
+
+
+class TestOcrEnginePool(TestCase):
+    """Test functionality related to re-using ocr engines between images recognized."""
+    def test_engines_reused(self):
+        """Test that a single engine is created and re-used for a single configuration."""
+        pool = OcrEnginePool(size=2, factory=CountingEngine)
+
+        self.assertEqual(pool.image_to_string(image=None, config="--psm 7"), "--psm 7:1")
+        self.assertEqual(pool.image_to_string(image=None, config="--psm 7"), "--psm 7:2")
+        self.assertEqual(pool.counts, {"engines": 1, "recognized": 2})
+
+    def test_engines_keyed_by_config(self):
+        """Test that each configuration receives its own engines."""
+        pool = OcrEnginePool(size=2, factory=CountingEngine)
+
+        self.assertEqual(pool.image_to_string(image=None, config="--psm 7"), "--psm 7:1")
+        self.assertEqual(pool.image_to_string(image=None, config="--psm 7 --oem 0"), "--psm 7 --oem 0:1")
+        self.assertEqual(pool.counts["engines"], 2)
+
+    def test_engines_bounded(self):
+        """Test that concurrent recognition never creates more engines than the pool size."""
+        release = Event()
+
+        class BlockingEngine(CountingEngine):
+            def recognize(self, image):
+                release.wait(timeout=5)
+                return super(BlockingEngine, self).recognize(image)
+
+        pool = OcrEnginePool(size=2, factory=BlockingEngine)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(pool.image_to_string, None, "--psm 7") for _ in range(4)]
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual(pool.counts, {"engines": 2, "recognized": 4})
+
+    def test_close(self):
+        """Test that closing the pool closes every idle engine."""
+        pool = OcrEnginePool(size=2, factory=CountingEngine)
+        engine = pool.acquire(config="--psm 7")
+        pool.release(engine=engine)
+        pool.close()
+
+        self.assertTrue(engine.closed)
+        self.assertIsNot(pool.acquire(config="--psm 7"), engine)
+
+
+class TestOcrCache(TestCase):
+    """Test functionality related to caching the text recognized for each processed image."""
+    def setUp(self):
+        self.image = Image.fromarray(np.zeros((10, 30), dtype=np.uint8))
+        self.changed = Image.fromarray(np.full((10, 30), 255, dtype=np.uint8))
+
+    def test_key(self):
+        """Test that keys differ whenever the image contents or configuration differ."""
+        key = OcrCache.key(image=self.image, config="--psm 7")
+
+        self.assertEqual(key, OcrCache.key(image=self.image.copy(), config="--psm 7"))
+        self.assertNotEqual(key, OcrCache.key(image=self.changed, config="--psm 7"))
+        self.assertNotEqual(key, OcrCache.key(image=self.image, config="--psm 7 --oem 0"))
+
+    def test_pool_cached(self):
+        """Test that an unchanged image is only ever recognized once."""
+        cache = OcrCache(size=8, ttl=60)
+        pool = OcrEnginePool(size=2, factory=CountingEngine, cache=cache)
+
+        self.assertEqual(pool.image_to_string(image=self.image, config="--psm 7"), "--psm 7:1")
+        self.assertEqual(pool.image_to_string(image=self.image, config="--psm 7"), "--psm 7:1")
+        self.assertEqual(pool.image_to_string(image=self.changed, config="--psm 7"), "--psm 7:2")
+        self.assertEqual(pool.counts["recognized"], 2)
+        self.assertEqual(cache.rates, {"lookups": 3, "hit_rate": 1 / 3})
+
+    def test_bounds(self):
+        """Test that results expire after the ttl, and the least recently used results are dropped."""
+        cache = OcrCache(size=2, ttl=60)
+        cache.set(key="first", result="1")
+        cache.set(key="second", result="2")
+        cache.get(key="first")
+        cache.set(key="third", result="3")
+
+        self.assertEqual(cache.get(key="first"), "1")
+        self.assertIsNone(cache.get(key="second"))
+
+        cache.ttl = -1
+        self.assertIsNone(cache.get(key="third"))
+
+
+class TestOcrStitch(TestCase):
+    """Test functionality related to stitching processed images together and mapping lines back to each image."""
+    def test_stitch(self):
+        """Test that every image is placed within its band, padded with its own background."""
+        images = {"first": np.full((10, 30), 255, dtype=np.uint8), "second": np.zeros((20, 50), dtype=np.uint8)}
+        stitched, bands = stitch(images=images, gap=5)
+
+        self.assertEqual(stitched.shape, (10 + 20 + 5 * 4, 50 + 5 * 2))
+        self.assertEqual(bands, {"first": (5, 15), "second": (25, 45)})
+        self.assertTrue((stitched[0:20] == 255).all())
+        self.assertTrue((stitched[20:] == 0).all())
+
+    def test_assign(self):
+        """Test that lines are assigned to the band containing them, in order."""
+        bands = {"first": (5, 15), "second": (25, 45), "third": (55, 65)}
+        lines = [("456", 27, 36), ("123", 4, 14), ("789", 34, 44), ("noise", 18, 20)]
+
+        self.assertEqual(assign(lines=lines, bands=bands), {"first": "123", "second": "456 789", "third": ""})
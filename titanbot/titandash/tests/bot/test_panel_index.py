@@ -0,0 +1,60 @@
+"""
+test_panel_index.py
+
+Test the functionality related to indexing the contents of scrollable panels.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.panels import PanelIndex, ARTIFACTS_PANEL, STATS_PANEL, PANEL_END
+
+import os
+import tempfile
+
+
+class TestPanelIndex(TestCase):
+    """Test functionality related to recording and persisting the distance of items within a panel."""
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "panels.json")
+        self.index = PanelIndex(path=self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_record(self):
+        """Test that recorded items are retrieved by panel, unknown items have no distance."""
+        self.index.record(panel=ARTIFACTS_PANEL, item="book_of_shadows", distance=900)
+        self.index.record(panel=STATS_PANEL, item=PANEL_END, distance=1800)
+
+        self.assertEqual(self.index.distance(panel=ARTIFACTS_PANEL, item="book_of_shadows"), 900)
+        self.assertEqual(self.index.distance(panel=STATS_PANEL, item=PANEL_END), 1800)
+        self.assertIsNone(self.index.distance(panel=STATS_PANEL, item="book_of_shadows"))
+
+    def test_forget(self):
+        """Test that forgotten items no longer have a distance."""
+        self.index.record(panel=ARTIFACTS_PANEL, item="book_of_shadows", distance=900)
+        self.index.forget(panel=ARTIFACTS_PANEL, item="book_of_shadows")
+        self.index.forget(panel=ARTIFACTS_PANEL, item="charm_of_the_ancient")
+
+        self.assertIsNone(self.index.distance(panel=ARTIFACTS_PANEL, item="book_of_shadows"))
+
+    def test_drags(self):
+        """Test that distances are split into drags no longer than the length specified."""
+        self.assertEqual(PanelIndex.drags(distance=900, length=450), [450, 450])
+        self.assertEqual(PanelIndex.drags(distance=1000, length=450), [450, 450, 100])
+        self.assertEqual(PanelIndex.drags(distance=200, length=450), [200])
+
+    def test_save_load(self):
+        """Test that the index persists across instances."""
+        self.index.record(panel=ARTIFACTS_PANEL, item="book_of_shadows", distance=900)
+        self.index.save()
+
+        self.assertEqual(PanelIndex(path=self.path).distance(panel=ARTIFACTS_PANEL, item="book_of_shadows"), 900)
+
+    def test_rates(self):
+        """Test that jumps to learned distances are counted separately from scans."""
+        self.index.count(jump=True, hit=True)
+        self.index.count(jump=True, hit=False)
+        self.index.count(jump=False)
+
+        self.assertEqual(self.index.rates, {"jumps": 2, "scans": 1, "hit_rate": 0.5})
@@ -0,0 +1,59 @@
+"""
+test_plans.py
+
+Test the functionality related to reading multiple fields from a single capture through ocr plans.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.maps import STATS_COORDS, TOURNAMENT_COORDS
+from titandash.bot.core.plans import (
+    OcrPlan, STATS_PLAN, STAGE_PLAN, DIGITS_CONFIG, tournament_plan, integer, skill_level, time_since
+)
+from titandash.tests.bot.maps import STAGES, TEMPLATE_STAGES
+
+from PIL import Image
+
+import numpy as np
+import datetime
+
+
+class TestOcrPlans(TestCase):
+    """Test functionality related to running ocr plans and parsing their results."""
+    def test_stage_plan(self):
+        """Test that stage test images are read through the stage plan."""
+        for path in TEMPLATE_STAGES:
+            self.assertEqual(STAGE_PLAN.run(image=Image.open(path), crop=False), {"stage": STAGES[path]})
+
+    def test_plan_single_frame(self):
+        """Test that every field is cropped from the single image specified."""
+        stages = [np.asarray(Image.open(path).convert("RGB")) for path in TEMPLATE_STAGES[:2]]
+        height, width = max(s.shape[0] for s in stages), sum(s.shape[1] for s in stages)
+
+        # Both stages are placed side by side within a single image, each field reads one of them.
+        image = np.zeros((height, width, 3), dtype=np.uint8)
+        image[:stages[0].shape[0], :stages[0].shape[1]] = stages[0]
+        image[:stages[1].shape[0], stages[0].shape[1]:] = stages[1]
+
+        plan = OcrPlan(name="stages", fields=[
+            ("first", (0, 0, stages[0].shape[1], stages[0].shape[0]), "integer", DIGITS_CONFIG),
+            ("second", (stages[0].shape[1], 0, width, stages[1].shape[0]), "integer", DIGITS_CONFIG),
+        ])
+        self.assertEqual(plan.run(image=Image.fromarray(image)), {"first": STAGES[TEMPLATE_STAGES[0]], "second": STAGES[TEMPLATE_STAGES[1]]})
+
+    def test_plans(self):
+        """Test that plans contain every field expected."""
+        self.assertEqual([f.field for f in STATS_PLAN.fields], list(STATS_COORDS))
+        self.assertEqual([f.field for f in STATS_PLAN.subset("prestiges", "taps").fields], ["taps", "prestiges"])
+        self.assertEqual(
+            [f.field for f in tournament_plan(coords=TOURNAMENT_COORDS["not_in_top_ten"], count=7, ranks=range(5, 7)).fields],
+            ["rank_5", "rank_6"] + ["user_{i}".format(i=i) for i in range(7)] + ["stage_{i}".format(i=i) for i in range(7)]
+        )
+
+    def test_parsers(self):
+        """Test that recognized text is parsed into each fields value."""
+        self.assertEqual(integer("1,234 "), "1234")
+        self.assertEqual(integer(""), "1")
+        self.assertEqual(skill_level("Lv. 24"), 24)
+        self.assertIsNone(skill_level("Lv."))
+        self.assertEqual(time_since("01:24:32"), datetime.timedelta(hours=1, minutes=24, seconds=32))
+        self.assertIsNone(time_since("01:24"))
@@ -0,0 +1,47 @@
+"""
+test_scanner.py
+
+Test the functionality related to scanning captures of the artifacts panel for owned artifacts.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.frame import as_frame
+from titandash.bot.core.maps import ARTIFACT_MAP, ARTIFACT_COORDS
+from titandash.bot.core.scanner import ArtifactScanner
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+
+from PIL import Image
+
+# Artifacts present on the expanded artifacts panel test image.
+PRESENT = {
+    "stone_of_the_valrunes", "book_of_prophecy", "chest_of_contentment", "heroic_shield",
+    "glacial_axe", "swamp_gauntlet", "egg_of_fortune", "divine_chalice",
+}
+
+
+class TestArtifactScanner(TestCase):
+    """Test functionality related to scanning every capture for the candidate artifacts."""
+    def setUp(self):
+        # Test images are captures of the entire emulator window, the emulator title bar is cropped.
+        frame = as_frame(Image.open(TEST_IMAGES["PANELS"]["artifacts_expanded"])).crop(box=(0, 32, 480, 832))
+        self.capture = as_frame(frame.crop(box=ARTIFACT_COORDS["parse_region"]).array.copy())
+        self.empty = as_frame(as_frame(Image.open(TEST_IMAGES["PANELS"]["no_panel_open"])).crop(box=ARTIFACT_COORDS["parse_region"]).array.copy())
+
+    def test_scan(self):
+        """Test that every artifact present is found, along with the first capture it was present in."""
+        scanner = ArtifactScanner(candidates=ARTIFACT_MAP)
+        scanner.submit(frame=self.empty, index=0)
+        scanner.submit(frame=self.capture, index=1)
+        scanner.submit(frame=self.capture, index=2)
+
+        self.assertEqual(scanner.finish(), {name: 1 for name in PRESENT})
+        self.assertEqual(scanner.remaining, len(ARTIFACT_MAP) - len(PRESENT))
+
+    def test_scan_candidates(self):
+        """Test that only candidate artifacts are ever found."""
+        candidates = {name: ARTIFACT_MAP[name] for name in ("heroic_shield", "book_of_shadows")}
+        scanner = ArtifactScanner(candidates=candidates)
+        scanner.submit(frame=self.capture, index=0)
+
+        self.assertEqual(scanner.finish(), {"heroic_shield": 0})
+        self.assertEqual(scanner.remaining, 1)
@@ -0,0 +1,144 @@
+"""
+test_screens.py
+
+Test the functionality related to classifying the current game screen.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.frame import as_frame
+from titandash.bot.core.screens import (
+    ScreenClassifier, is_game_screen, SCREEN_COLLAPSED, SCREEN_PANEL, SCREEN_AD, SCREEN_WELCOME, SCREEN_PRESTIGE, SCREEN_UNKNOWN
+)
+from titandash.bot.core.utilities import in_transition_func, globals
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from PIL import Image
+
+# Expected label of every test image that represents an entire game screen.
+LABELS = {
+    ("PANELS", "artifacts_collapsed"): SCREEN_PANEL.format(panel="artifacts"),
+    ("PANELS", "artifacts_expanded"): SCREEN_PANEL.format(panel="artifacts"),
+    ("PANELS", "equipment_collapsed"): SCREEN_PANEL.format(panel="equipment"),
+    ("PANELS", "equipment_expanded"): SCREEN_PANEL.format(panel="equipment"),
+    ("PANELS", "heroes_collapsed"): SCREEN_PANEL.format(panel="heroes"),
+    ("PANELS", "heroes_expanded"): SCREEN_PANEL.format(panel="heroes"),
+    ("PANELS", "master_buy_option_open_collapsed"): SCREEN_PANEL.format(panel="master"),
+    ("PANELS", "master_buy_option_open_expanded"): SCREEN_PANEL.format(panel="master"),
+    ("PANELS", "master_collapsed"): SCREEN_PANEL.format(panel="master"),
+    ("PANELS", "master_expanded"): SCREEN_PANEL.format(panel="master"),
+    ("PANELS", "no_panel_open"): SCREEN_COLLAPSED,
+    ("PANELS", "no_panel_open_clan_battle"): SCREEN_COLLAPSED,
+    ("PANELS", "pets_collapsed"): SCREEN_PANEL.format(panel="pets"),
+    ("PANELS", "pets_expanded"): SCREEN_PANEL.format(panel="pets"),
+    ("PANELS", "shop_open"): SCREEN_PANEL.format(panel="shop"),
+    ("MASTER", "master_bottom_collapsed"): SCREEN_PANEL.format(panel="master"),
+    ("MASTER", "master_bottom_expanded"): SCREEN_PANEL.format(panel="master"),
+    ("MASTER", "master_prestige_open"): SCREEN_PRESTIGE,
+    ("HEROES", "heroes_stats_bottom"): SCREEN_UNKNOWN,
+    ("ADS", "skill_prompt"): SCREEN_AD,
+}
+
+
+def game_screen(path):
+    """
+    Test images are captures of the entire emulator window, the emulator title bar is cropped
+    so that the test image represents a capture of the game screen.
+    """
+    return as_frame(as_frame(Image.open(path)).crop(box=(0, 32, 480, 832)).array.copy())
+
+
+class TestScreenClassifier(TestCase):
+    """Test functionality related to the screen classifier."""
+    def setUp(self):
+        self.classifier = ScreenClassifier()
+
+    def test_labels(self):
+        """Test that every test image is classified with the expected label."""
+        for (group, key), label in LABELS.items():
+            self.assertEqual(self.classifier.classify(frame=game_screen(TEST_IMAGES[group][key])), label, msg=key)
+
+    def test_cached(self):
+        """Test that classifying the same capture again uses the cached label."""
+        frame = game_screen(TEST_IMAGES["PANELS"]["no_panel_open"])
+
+        self.assertEqual(self.classifier.classify(frame=frame), self.classifier.classify(frame=frame))
+        self.assertEqual(self.classifier.counts, {"classified": 1, "cached": 1})
+
+    def test_prompt_checks(self):
+        """Test that the welcome and rate prompts are only searched for while their checks are enabled."""
+        frame = game_screen(TEST_IMAGES["PANELS"]["no_panel_open"])
+
+        with patch.object(globals, "welcome_screen_checks", return_value=False), patch.object(globals, "rate_screen_checks", return_value=False):
+            with patch.object(self.classifier, "_found", return_value=True) as found:
+                self.assertEqual(self.classifier.classify(frame=frame), SCREEN_COLLAPSED)
+                found.assert_not_called()
+
+        with patch.object(globals, "welcome_screen_checks", return_value=True):
+            with patch.object(self.classifier, "_found", return_value=True):
+                self.assertEqual(self.classifier.classify(frame=game_screen(TEST_IMAGES["PANELS"]["no_panel_open"])), SCREEN_WELCOME)
+
+    def test_is_game_screen(self):
+        """Test that only the game screen itself (collapsed, or with a panel open) is considered the game screen."""
+        self.assertTrue(is_game_screen(label=SCREEN_COLLAPSED))
+        self.assertTrue(is_game_screen(label=SCREEN_PANEL.format(panel="heroes")))
+        self.assertFalse(is_game_screen(label=SCREEN_AD))
+        self.assertFalse(is_game_screen(label=SCREEN_UNKNOWN))
+
+
+class TransitionBot(object):
+    """Bot displaying the game screen, covered by an in game panel and an ad until each is closed."""
+    def __init__(self, panel=False, ad=False):
+        self.panel = panel
+        self.ad = ad
+        self.clicks = 0
+
+        self.classifier = ScreenClassifier()
+        self.grabber = self
+        self.images = self
+        self.logger = self
+
+    def __getattr__(self, name):
+        # Image names are used as is, no image is ever searched for.
+        return name
+
+    @contextmanager
+    def frame(self):
+        yield self
+
+    def get(self):
+        return game_screen(TEST_IMAGES["PANELS"]["no_panel_open"])
+
+    def search(self, image, bool_only):
+        return True
+
+    def find_and_click(self, image):
+        closed, self.panel = self.panel, False
+        return closed
+
+    def collect_ad_no_transition(self):
+        collected, self.ad = self.ad, False
+        return collected
+
+    def click(self, point, clicks, pause):
+        self.clicks += 1
+
+
+class TestTransition(TestCase):
+    """Test functionality related to resolving a transition state of the game."""
+    def test_game_screen(self):
+        """Test that the game screen is not in a transition once no panel or ad covers it."""
+        bot = TransitionBot()
+        in_transition_func(bot, max_loops=3)
+
+        self.assertEqual(bot.clicks, 0)
+
+    def test_covered(self):
+        """Test that a panel or ad covering the game screen is closed before leaving the transition check."""
+        for panel, ad in ((True, False), (False, True), (True, True)):
+            bot = TransitionBot(panel=panel, ad=ad)
+            in_transition_func(bot, max_loops=3)
+
+            self.assertFalse(bot.panel or bot.ad)
@@ -0,0 +1,123 @@
+"""
+test_scrolling.py
+
+Test the functionality related to tracking the scroll offset of panels being dragged.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.frame import as_frame
+from titandash.bot.core.maps import PANEL_COORDS
+from titandash.bot.core.scrolling import ScrollTracker, estimate_shift
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+
+from PIL import Image
+
+import numpy as np
+
+
+class ScrollingPanel(object):
+    """Panel that is "scrolled" by cropping a region of a test image at an increasing offset."""
+    def __init__(self, offsets):
+        self.frame = as_frame(Image.open(TEST_IMAGES["PANELS"]["heroes_expanded"]))
+        self.offsets = list(offsets)
+
+    def capture(self):
+        offset = self.offsets.pop(0) if len(self.offsets) > 1 else self.offsets[0]
+        return self.frame.crop(box=(0, 332 + offset, 232, 544 + offset))
+
+
+class TallPanel(object):
+    """Panel taller than the screen (the contents of every expanded panel, one after another), scrolled within the scroll region."""
+    def __init__(self, offsets, header=0):
+        x1, y1, x2, y2 = PANEL_COORDS["panel_scroll"]
+        self.contents = np.vstack([
+            as_frame(Image.open(TEST_IMAGES["PANELS"][panel])).array[y1:y2, x1:x2]
+            for panel in ("heroes_expanded", "artifacts_expanded", "master_expanded", "pets_expanded")
+        ])
+        self.header = self.contents[-header:] if header else None
+        self.height = y2 - y1
+        self.offsets = list(offsets)
+
+    def window(self, offset):
+        return self.contents[offset:offset + self.height]
+
+    def capture(self):
+        offset = self.offsets.pop(0) if len(self.offsets) > 1 else self.offsets[0]
+        if self.header is None:
+            return self.window(offset=offset)
+
+        return np.ascontiguousarray(np.vstack([self.header, self.window(offset=offset)]))
+
+
+class TestScrollTracker(TestCase):
+    """Test functionality related to estimating the shift of a panel between captures."""
+    def setUp(self):
+        self.panel = ScrollingPanel(offsets=[0])
+
+    def test_estimate_shift(self):
+        """Test that the shift between captures is estimated exactly, in both directions."""
+        previous = self.panel.capture()
+        for offset in (1, 5, 20, 60, -30):
+            current = self.panel.frame.crop(box=(0, 332 + offset, 232, 544 + offset))
+            self.assertEqual(estimate_shift(previous=previous, current=current)[0], offset)
+
+    def test_estimate_shift_unknown(self):
+        """Test that shifts too large to be resolved are unknown."""
+        previous = self.panel.capture()
+        current = self.panel.frame.crop(box=(0, 332 + 180, 232, 544 + 180))
+
+        self.assertIsNone(estimate_shift(previous=previous, current=current)[0])
+
+    def test_estimate_shift_uniform(self):
+        """Test that uniform captures are only still when they are identical."""
+        black, white = np.zeros((100, 100, 3), dtype=np.uint8), np.full((100, 100, 3), 255, dtype=np.uint8)
+
+        self.assertEqual(estimate_shift(previous=black, current=black.copy())[0], 0)
+        self.assertIsNone(estimate_shift(previous=black, current=white)[0])
+
+    def test_scrolled(self):
+        """Test that the tracker waits for the panel to stop moving before determining how far it moved."""
+        panel = ScrollingPanel(offsets=[0, 10, 25, 30, 30, 30, 30])
+        scroll = ScrollTracker(capture=panel.capture, interval=0, delay=0.05)
+        scroll.start()
+
+        self.assertEqual(scroll.scrolled().shift, 30)
+        self.assertTrue(scroll.scrolled().end)
+        self.assertEqual((scroll.offset, scroll.drags), (30, 2))
+
+    def test_estimate_shift_drag(self):
+        """Test that the shift of a full drag of a panel is estimated exactly within the scroll region."""
+        panel = TallPanel(offsets=[0])
+        for offset in (450, 900, 1200):
+            for shift in (450, -450, 300, -120):
+                self.assertEqual(estimate_shift(previous=panel.window(offset=offset), current=panel.window(offset=offset + shift))[0], shift)
+
+        self.assertIsNone(estimate_shift(previous=panel.window(offset=0), current=panel.window(offset=560))[0])
+
+    def test_scrolled_region(self):
+        """Test that the panel is only tracked within the region specified, static headers are ignored."""
+        panel = TallPanel(offsets=[0, 450, 450], header=100)
+        scroll = ScrollTracker(capture=panel.capture, region=(0, 100, 232, 100 + panel.height), interval=0, delay=0.05)
+        scroll.start()
+
+        self.assertEqual(scroll.scrolled().shift, 450)
+        self.assertEqual(scroll.offset, 450)
+
+    def test_scrolled_delayed(self):
+        """Test that a panel that is still when first captured after a drag is not considered stopped until it moves."""
+        panel = ScrollingPanel(offsets=[0, 0, 0, 0, 0, 20, 40, 40, 40])
+        scroll = ScrollTracker(capture=panel.capture, interval=0, delay=60)
+        scroll.start()
+
+        scrolled = scroll.scrolled()
+        self.assertEqual(scrolled.shift, 40)
+        self.assertFalse(scrolled.end)
+
+    def test_scrolled_still(self):
+        """Test that a panel that never moves is considered stopped (the end of the panel) once the delay has passed."""
+        panel = ScrollingPanel(offsets=[0])
+        scroll = ScrollTracker(capture=panel.capture, interval=0.01, delay=0.05)
+        scroll.start()
+
+        self.assertTrue(scroll.scrolled().end)
+        self.assertEqual(scroll.offset, 0)
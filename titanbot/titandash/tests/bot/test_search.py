@@ -0,0 +1,400 @@
+"""
+test_search.py
+
+Test the functionality related to batched image searches.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.grabber import Grabber
+from titandash.bot.core.frame import as_frame
+from titandash.bot.core.anchors import anchors
+from titandash.bot.core.maps import IMAGES as BOT_IMAGES, ANCHORS
+from titandash.bot.core.regions import LearnedRegions
+from titandash.bot.core.ordering import CandidateOrdering
+from titandash.bot.core.changes import SearchCache
+from titandash.bot.core.telemetry import SearchTelemetry
+from titandash.bot.core.constants import SEARCH_POOL_WORKERS
+from titandash.bot.external.imagesearch import imagesearcharea, imagesearchbatch
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+
+from PIL import Image
+
+import os
+import logging
+import tempfile
+
+
+class SearchWindow(object):
+    """Minimal window used by the grabber while searching test images."""
+    x, y, width, height = 0, 0, 480, 800
+
+
+class TestBatchSearch(TestCase):
+    """Test functionality related to searching for many images at once."""
+    def setUp(self):
+        self.window = SearchWindow()
+        self.grabber = Grabber(window=self.window, logger=logging.getLogger(__name__))
+        self.frame = as_frame(Image.open(TEST_IMAGES["PANELS"]["heroes_expanded"]))
+        self.images = [
+            BOT_IMAGES["GENERIC"]["expand_panel"],
+            BOT_IMAGES["GENERIC"]["collapse_panel"],
+            BOT_IMAGES["GENERIC"]["exit_panel"],
+        ]
+
+    def test_first(self):
+        """Test that only the first image found (in priority order) is returned."""
+        found = self.grabber.search_many(images=self.images, im=self.frame)
+
+        self.assertEqual(len(found), 1)
+        self.assertEqual(found[0][0], BOT_IMAGES["GENERIC"]["collapse_panel"])
+
+    def test_first_stops(self):
+        """Test that no further images are searched for once a higher priority image is found."""
+        telemetry = SearchTelemetry()
+        images = self.images[1:] + [BOT_IMAGES["GENERIC"][key] for key in ("master_active", "heroes_active", "equipment_active")] * 4
+        found = imagesearchbatch(images=images, im=self.frame, precision=0.8, first=True, telemetry=telemetry)
+
+        self.assertEqual([f[0] for f in found], images[:1])
+        self.assertLessEqual(telemetry.report()["searches"], SEARCH_POOL_WORKERS)
+
+    def test_all(self):
+        """Test that every image found is returned along with its score."""
+        found = self.grabber.search_many(images=self.images, im=self.frame, first=False)
+
+        self.assertEqual([f[0] for f in found], self.images[1:])
+        for image, position, score in found:
+            self.assertGreaterEqual(score, 0.8)
+
+    def test_regions(self):
+        """Test that images are searched for within their own region when specified."""
+        found = self.grabber.search_many(images=self.images[1:], regions=[(0, 400, 480, 800), None], im=self.frame, first=False)
+
+        self.assertEqual([f[0] for f in found], self.images[2:])
+
+    def test_matches_sequential(self):
+        """Test that searching for a list of images agrees with searching for each image sequentially."""
+        self.grabber.current = self.frame
+        found, position, image = self.grabber.search(image=self.images, testing=True, return_image=True)
+
+        for _image in self.images:
+            _position = imagesearcharea(window=self.window, image=_image, x1=0, y1=0, x2=480, y2=800, im=self.frame)
+            if _position[0] != -1:
+                self.assertEqual((image, tuple(position)), (_image, tuple(_position)))
+                break
+
+
+class TestPyramidSearch(TestCase):
+    """Test functionality related to coarse to fine (pyramid) image searches."""
+    def setUp(self):
+        self.window = SearchWindow()
+
+    def search(self, game_image, find_image, pyramid):
+        return tuple(imagesearcharea(
+            window=self.window, image=find_image, x1=0, y1=0, x2=480, y2=800,
+            im=as_frame(Image.open(game_image)), pyramid=pyramid
+        ))
+
+    def test_agrees_with_exhaustive(self):
+        """Test that a pyramid search finds the same images in the same locations as an exhaustive search."""
+        for game_image in TEST_IMAGES["PANELS"].values():
+            for find_image in BOT_IMAGES["GENERIC"].values():
+                self.assertEqual(
+                    self.search(game_image=game_image, find_image=find_image, pyramid=False),
+                    self.search(game_image=game_image, find_image=find_image, pyramid=True)
+                )
+
+
+class TestLearnedRegions(TestCase):
+    """Test functionality related to searching within learned search regions."""
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "regions.json")
+        self.regions = LearnedRegions(width=480, height=800, path=self.path)
+        self.grabber = Grabber(window=SearchWindow(), logger=logging.getLogger(__name__), regions=self.regions)
+        self.image = BOT_IMAGES["GENERIC"]["collapse_panel"]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def search(self, game_image):
+        self.grabber.current = as_frame(Image.open(TEST_IMAGES["PANELS"][game_image]))
+        return self.grabber.search(image=self.image, testing=True)
+
+    def test_learned_hit(self):
+        """Test that an image found previously is found within its learned region, in the same location."""
+        found, position = self.search(game_image="heroes_expanded")
+        self.assertEqual(self.regions.counts["searches"], 0)
+
+        self.assertEqual(self.search(game_image="heroes_expanded"), (found, position))
+        self.assertEqual(self.regions.rates["hit_rate"], 1)
+        self.assertGreater(self.regions.rates["area_saved"], 0)
+
+    def test_learned_fallback(self):
+        """Test that an image not found within its learned region falls back to a full search."""
+        self.regions.record(image=self.image, position=(0, 700), width=10, height=10)
+
+        found, position = self.search(game_image="heroes_expanded")
+        self.assertTrue(found)
+        self.assertEqual(self.regions.rates["fallback_rate"], 1)
+        self.assertEqual(self.regions.region(image=self.image)[1], 37 - self.regions.margin)
+
+    def test_persisted(self):
+        """Test that learned regions are saved and loaded from the regions file."""
+        self.search(game_image="heroes_expanded")
+        self.regions.save()
+
+        regions = LearnedRegions(width=480, height=800, path=self.path)
+        self.assertEqual(regions.region(image=self.image), self.regions.region(image=self.image))
+
+    def test_persisted_merged(self):
+        """Test that regions saved by other bot instances are merged into the regions file, and not overwritten."""
+        other = LearnedRegions(width=480, height=800, path=self.path)
+        image = BOT_IMAGES["GENERIC"]["expand_panel"]
+
+        self.regions.record(image=self.image, position=(10, 10), width=10, height=10)
+        other.record(image=image, position=(20, 20), width=10, height=10)
+        self.regions.save()
+        other.save()
+
+        regions = LearnedRegions(width=480, height=800, path=self.path)
+        self.assertEqual(regions.region(image=self.image), self.regions.region(image=self.image))
+        self.assertEqual(regions.region(image=image), other.region(image=image))
+        self.assertEqual(os.listdir(self.directory.name), ["regions.json"])
+
+
+class TestAnchors(TestCase):
+    """Test functionality related to the anchored image fingerprint checks."""
+    def setUp(self):
+        # Test images are captures of the entire emulator window, the emulator
+        # title bar is cropped so that the anchor positions line up.
+        self.frames = {
+            key: as_frame(as_frame(Image.open(path)).crop(box=(0, 32, 480, 832)).array.copy())
+            for key, path in TEST_IMAGES["PANELS"].items()
+        }
+
+    def test_agrees_with_search(self):
+        """Test that conclusive anchor checks always agree with a full search."""
+        for image in ANCHORS:
+            for key, frame in self.frames.items():
+                anchored, position = anchors.check(frame=frame, image=image)
+                if anchored is None:
+                    continue
+
+                _position = imagesearcharea(window=None, image=image, x1=0, y1=0, x2=480, y2=800, im=frame)
+                self.assertEqual(anchored, _position[0] != -1, msg="{image}: {key}".format(image=image, key=key))
+                if anchored:
+                    self.assertLessEqual(abs(position[0] - _position[0]) + abs(position[1] - _position[1]), 2)
+
+    def test_other_sizes_inconclusive(self):
+        """Test that frames that are not the size of the game screen are always inconclusive."""
+        frame = as_frame(Image.open(TEST_IMAGES["PANELS"]["heroes_expanded"]))
+
+        self.assertEqual(anchors.check(frame=frame, image=BOT_IMAGES["GENERIC"]["collapse_panel"]), (None, (-1, -1)))
+
+    def test_search_list(self):
+        """Test that searching for a list of images prefers the first image found when anchored images are present."""
+        grabber = Grabber(window=SearchWindow(), logger=logging.getLogger(__name__))
+        images = [BOT_IMAGES["GENERIC"]["exit_panel"], BOT_IMAGES["GENERIC"]["collapse_panel"]]
+
+        found, position, image = grabber.search(image=images, im=self.frames["heroes_expanded"], return_image=True)
+        self.assertEqual(image, BOT_IMAGES["GENERIC"]["exit_panel"])
+
+        found, position, image = grabber.search(image=images[::-1], im=self.frames["heroes_expanded"], return_image=True)
+        self.assertEqual(image, BOT_IMAGES["GENERIC"]["collapse_panel"])
+
+
+class TestCandidateOrdering(TestCase):
+    """Test functionality related to ordering lists of images by how often each image is found."""
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.ordering = CandidateOrdering(path=os.path.join(self.directory.name, "ordering.json"), explore=5)
+        self.grabber = Grabber(window=SearchWindow(), logger=logging.getLogger(__name__), ordering=self.ordering)
+        self.frame = as_frame(Image.open(TEST_IMAGES["PANELS"]["heroes_expanded"]))
+        self.images = [
+            BOT_IMAGES["GENERIC"]["expand_panel"],
+            BOT_IMAGES["GENERIC"]["large_exit_panel"],
+            BOT_IMAGES["GENERIC"]["exit_panel"],
+        ]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_reordered(self):
+        """Test that images found more often are moved to the front of the list."""
+        self.assertEqual(self.ordering.order(images=self.images), self.images)
+        self.assertTrue(self.grabber.search(image=self.images, im=self.frame, bool_only=True))
+
+        ordered = self.ordering.order(images=self.images)
+        self.assertEqual(ordered[0], BOT_IMAGES["GENERIC"]["exit_panel"])
+        self.assertEqual(ordered[1:], self.images[:2])
+
+        stats = self.ordering.stats[self.ordering.key(images=self.images)]
+        self.assertEqual(stats["average_position_original"], 3)
+
+    def test_explore(self):
+        """Test that the original order is used every exploration interval."""
+        for i in range(4):
+            self.ordering.record(images=self.images, ordered=self.images, image=self.images[2])
+
+        self.assertEqual(self.ordering.order(images=self.images), self.images)
+
+    def test_found_image_reported(self):
+        """Test that the image returned is the image found, and that lists are only reordered when specified."""
+        self.ordering.record(images=self.images, ordered=self.images, image=self.images[2])
+
+        found, position, image = self.grabber.search(image=self.images, im=self.frame, return_image=True)
+        self.assertEqual(image, BOT_IMAGES["GENERIC"]["exit_panel"])
+        self.assertEqual(self.ordering.stats[self.ordering.key(images=self.images)]["searches"], 1)
+
+        self.grabber.search(image=self.images, im=self.frame, return_image=True, reorder=True)
+        self.assertEqual(self.ordering.stats[self.ordering.key(images=self.images)]["searches"], 2)
+
+    def test_persisted_merged(self):
+        """Test that statistics saved by other bot instances are merged into the ordering file, and not overwritten."""
+        path = os.path.join(self.directory.name, "ordering.json")
+        other = CandidateOrdering(path=path, explore=5)
+
+        self.ordering.record(images=self.images, ordered=self.images, image=self.images[2])
+        other.record(images=self.images[:2], ordered=self.images[:2], image=self.images[0])
+        other.save()
+        self.ordering.save()
+
+        ordering = CandidateOrdering(path=path, explore=5)
+        self.assertEqual(ordering.stats[ordering.key(images=self.images)]["searches"], 1)
+        self.assertEqual(ordering.stats[ordering.key(images=self.images[:2])]["searches"], 1)
+        self.assertEqual(os.listdir(self.directory.name), ["ordering.json"])
+
+
+class TestSearchCache(TestCase):
+    """Test functionality related to caching search results while the screen remains unchanged."""
+    def setUp(self):
+        self.cache = SearchCache()
+        self.grabber = Grabber(window=SearchWindow(), logger=logging.getLogger(__name__), cache=self.cache)
+        self.array = as_frame(Image.open(TEST_IMAGES["PANELS"]["heroes_expanded"])).array
+        self.image = BOT_IMAGES["GENERIC"]["collapse_panel"]
+
+    def search(self, array, region=None):
+        # Every search is performed against a new capture, as the bot would.
+        self.grabber.current = as_frame(array.copy())
+        return self.grabber.search(image=self.image, region=region, testing=True)
+
+    def test_unchanged(self):
+        """Test that searching an unchanged screen returns the cached result."""
+        result = self.search(array=self.array)
+
+        self.assertEqual(self.search(array=self.array), result)
+        self.assertEqual(self.cache.rates["hit_rate"], 0.5)
+
+    def test_changed(self):
+        """Test that changes overlapping a search invalidate the cached result, and other changes do not."""
+        region = (300, 0, 480, 100)
+        self.search(array=self.array, region=region)
+
+        changed = self.array.copy()
+        changed[600:700, 0:100] = 0
+        self.assertTrue(self.search(array=changed, region=region)[0])
+        self.assertEqual(self.cache.counts["hits"], 1)
+
+        changed[30:60, 360:410] = 0
+        self.assertFalse(self.search(array=changed, region=region)[0])
+        self.assertEqual(self.cache.counts["hits"], 1)
+
+
+class TestProbe(TestCase):
+    """Test functionality related to checking the color of many points at once."""
+    def setUp(self):
+        self.grabber = Grabber(window=SearchWindow(), logger=logging.getLogger(__name__))
+        self.frame = as_frame(Image.open(TEST_IMAGES["PANELS"]["heroes_expanded"]))
+        self.points = [(0, 0), (10, 10), (240, 400), (100, 700)]
+        self.colors = [self.frame.getpixel(point) for point in self.points]
+
+    def test_colors(self):
+        """Test that every point is checked against its own color."""
+        self.assertEqual(self.grabber.probe(points=self.points, colors=self.colors, im=self.frame).tolist(), [True] * 4)
+        self.assertEqual(self.grabber.probe(points=self.points, colors=self.colors[::-1], im=self.frame).tolist(), [
+            self.colors[i] == self.colors[-i - 1] for i in range(4)
+        ])
+
+    def test_single_color(self):
+        """Test that a single color is checked against every point."""
+        self.assertEqual(self.grabber.probe(points=self.points, colors=self.colors[2], im=self.frame).tolist(), [
+            color == self.colors[2] for color in self.colors
+        ])
+
+    def test_color_ranges(self):
+        """Test that every point is checked against a color range."""
+        ranges = [[(c - 2, c + 2) for c in color] for color in self.colors]
+        self.assertEqual(self.grabber.probe(points=self.points, color_ranges=ranges, im=self.frame).tolist(), [True] * 4)
+        self.assertFalse(self.grabber.probe(points=self.points[:1], color_ranges=((256, 300), (0, 255), (0, 255)), im=self.frame)[0])
+
+    def test_invalid(self):
+        """Test that exactly one of colors or color ranges must be specified."""
+        with self.assertRaises(ValueError):
+            self.grabber.probe(points=self.points, im=self.frame)
+
+
+class TestSearchTelemetry(TestCase):
+    """Test functionality related to recording the results of every search performed."""
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.telemetry = SearchTelemetry()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_record(self):
+        """Test that hits, misses and near misses are recorded per template."""
+        self.telemetry.record(image="exit_panel", size=(480, 800), score=0.95, precision=0.8, latency=0.01)
+        self.telemetry.record(image="exit_panel", size=(480, 800), score=0.75, precision=0.8, latency=0.03)
+        self.telemetry.record(image="exit_panel", size=(480, 800), score=0.2, precision=0.8, latency=0.02)
+
+        summary = self.telemetry.summary(key="exit_panel")
+        self.assertEqual(summary["searches"], 3)
+        self.assertAlmostEqual(summary["hit_rate"], 1 / 3)
+        self.assertEqual(summary["near_misses"], 1)
+        self.assertAlmostEqual(summary["max_latency"], 30)
+        self.assertEqual(sum(summary["histogram"]), 3)
+
+    def test_report(self):
+        """Test that reports include the slowest templates, near misses and search volume per loop."""
+        for i in range(3):
+            self.telemetry.loop()
+            for j in range(i + 1):
+                self.telemetry.record(image="slow", size=(10, 10), score=0.75, precision=0.8, latency=0.1)
+            self.telemetry.record(image="fast", size=(10, 10), score=0.9, precision=0.8, latency=0.001)
+        self.telemetry.loop()
+
+        report = self.telemetry.report()
+        self.assertEqual(report["searches"], 9)
+        self.assertEqual(report["loops"], {"count": 4, "average_searches": 3, "max_searches": 4})
+        self.assertEqual([s["template"] for s in report["slowest"]], ["slow", "fast"])
+        self.assertEqual([s["template"] for s in report["near_misses"]], ["slow"])
+
+    def test_save(self):
+        """Test that telemetry can be saved and loaded again."""
+        path = os.path.join(self.directory.name, "telemetry.json")
+        self.telemetry.record(image=BOT_IMAGES["GENERIC"]["exit_panel"], size=(10, 10), score=0.9, precision=0.8, latency=0.001)
+        self.telemetry.save(path=path)
+
+        self.assertEqual(SearchTelemetry.load(path=path).report(), self.telemetry.report())
+        self.assertEqual(self.telemetry.report()["slowest"][0]["template"], "generic/exit_panel.png")
+        self.assertIsNone(SearchTelemetry.load(path=path + ".missing"))
+
+    def test_search(self):
+        """Test that searches are recorded into the telemetry specified."""
+        imagesearcharea(window=None, image=BOT_IMAGES["GENERIC"]["exit_panel"], x1=0, y1=0, x2=480, y2=800, im=as_frame(Image.open(TEST_IMAGES["PANELS"]["heroes_expanded"])), telemetry=self.telemetry)
+
+        self.assertEqual(self.telemetry.report()["searches"], 1)
+
+    def test_grabber(self):
+        """Test that each grabber records its searches into its own telemetry only."""
+        frame = as_frame(Image.open(TEST_IMAGES["PANELS"]["heroes_expanded"]))
+        first = Grabber(window=SearchWindow(), logger=logging.getLogger(__name__), telemetry=self.telemetry)
+        second = Grabber(window=SearchWindow(), logger=logging.getLogger(__name__), telemetry=SearchTelemetry())
+
+        first.search(image=BOT_IMAGES["GENERIC"]["exit_panel"], im=frame)
+        first.search_many(images=[BOT_IMAGES["GENERIC"]["exit_panel"], BOT_IMAGES["GENERIC"]["collapse_panel"]], im=frame, first=False)
+        second.telemetry.reset()
+
+        self.assertEqual(first.telemetry.report()["searches"], 3)
+        self.assertEqual(second.telemetry.report()["searches"], 0)
@@ -0,0 +1,69 @@
+"""
+test_tapping.py
+
+Test the functionality related to detecting targets to tap within the sky band of the game screen.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.frame import as_frame
+from titandash.bot.core.tapping import TapDetector
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+
+from PIL import Image
+
+import numpy as np
+import cv2
+
+
+class TestTapDetector(TestCase):
+    """Test functionality related to detecting tapping targets against a background of recent captures."""
+    def setUp(self):
+        # Test images are captures of the entire emulator window, the emulator title bar is cropped.
+        self.frame = as_frame(Image.open(TEST_IMAGES["PANELS"]["no_panel_open"])).crop(box=(0, 32, 480, 832)).array.copy()
+        self.detector = TapDetector()
+
+    def target(self, points, radius=8):
+        """Generate a capture of the game screen with a target drawn at each point specified."""
+        frame = self.frame.copy()
+        for point in points:
+            cv2.circle(frame, point, radius, (255, 0, 255), -1)
+        return as_frame(frame)
+
+    def observe(self):
+        """Observe enough captures (without any targets) to establish the background."""
+        for i in range(self.detector._history.maxlen - 1):
+            self.assertIsNone(self.detector.detect(frame=as_frame(self.frame.copy())))
+
+    def test_detect_inconclusive_background(self):
+        """Test that detection is inconclusive until the background is established."""
+        self.assertIsNone(self.detector.detect(frame=self.target(points=[(200, 140)])))
+
+    def test_detect_inconclusive_size(self):
+        """Test that detection is inconclusive against a capture that is not the game screen."""
+        self.assertIsNone(self.detector.detect(frame=as_frame(np.zeros((100, 100, 3), dtype=np.uint8))))
+
+    def test_detect_none(self):
+        """Test that no targets are detected when the sky band is unchanged."""
+        self.observe()
+        self.assertEqual(self.detector.detect(frame=as_frame(self.frame.copy())), [])
+
+    def test_detect_targets(self):
+        """Test that targets are detected at their positions, targets outside of the sky band are ignored."""
+        self.observe()
+        targets = self.detector.detect(frame=self.target(points=[(120, 100), (350, 180), (240, 500)]))
+
+        self.assertEqual(len(targets), 2)
+        for expected, target in zip(((120, 100), (350, 180)), sorted(targets)):
+            self.assertLessEqual(abs(expected[0] - target[0]), 1)
+            self.assertLessEqual(abs(expected[1] - target[1]), 1)
+
+    def test_detect_small(self):
+        """Test that specks of noise are not detected as targets."""
+        self.observe()
+        self.assertEqual(self.detector.detect(frame=self.target(points=[(200, 140)], radius=1)), [])
+
+    def test_detect_scene_change(self):
+        """Test that a change of the entire sky band is inconclusive, and that the background is rebuilt."""
+        self.observe()
+        self.assertIsNone(self.detector.detect(frame=as_frame(255 - self.frame)))
+        self.assertEqual(len(self.detector._history), 1)
@@ -0,0 +1,36 @@
+"""
+test_templates.py
+
+Test the functionality related to the in memory template registry.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.maps import IMAGES
+from titandash.bot.core.templates import TemplateRegistry, TemplateNotFoundError
+
+
+class TestTemplateRegistry(TestCase):
+    """Test functionality related to loading and retrieving templates from the registry."""
+    def setUp(self):
+        self.registry = TemplateRegistry()
+        self.registry.load(images={"GENERIC": IMAGES["GENERIC"]}, atlas=False)
+
+    def test_get_by_path_and_name(self):
+        """Test that templates can be retrieved by either their path or name."""
+        template = self.registry.get(IMAGES["GENERIC"]["exit_panel"])
+
+        self.assertIs(template, self.registry.get("exit_panel"))
+        self.assertEqual(template.gray.ndim, 2)
+        self.assertEqual((template.height, template.width), template.gray.shape)
+
+    def test_load_skips_loaded(self):
+        """Test that loading the same templates again does not re-register them."""
+        template = self.registry.get("exit_panel")
+        self.registry.load(images={"GENERIC": IMAGES["GENERIC"]}, atlas=False)
+
+        self.assertIs(template, self.registry.get("exit_panel"))
+
+    def test_get_missing(self):
+        """Test that attempting to retrieve a template that does not exist raises an error."""
+        with self.assertRaises(TemplateNotFoundError):
+            self.registry.get("/does/not/exist.png")
@@ -0,0 +1,90 @@
+"""
+test_workers.py
+
+Test the functionality related to offloading matching and ocr preprocessing to the vision pool.
+"""
+from django.test import TestCase
+
+from titandash.bot.core.frame import as_frame
+from titandash.bot.core.maps import IMAGES as BOT_IMAGES
+from titandash.bot.core.ocr import preprocess
+from titandash.bot.core.workers import VisionPool, shared_memory
+from titandash.bot.external.imagesearch import imagesearchbatch
+from titandash.tests.bot.maps import IMAGES as TEST_IMAGES
+
+from unittest import skipIf
+
+from PIL import Image
+
+import numpy as np
+
+
+@skipIf(shared_memory is None, "shared memory requires python 3.8+")
+class TestVisionPool(TestCase):
+    """Test functionality related to matching and preprocessing on the vision pool."""
+    @classmethod
+    def setUpClass(cls):
+        super(TestVisionPool, cls).setUpClass()
+        cls.pool = VisionPool(workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+        super(TestVisionPool, cls).tearDownClass()
+
+    def setUp(self):
+        self.frame = as_frame(Image.open(TEST_IMAGES["PANELS"]["no_panel_open"]))
+        self.images = [BOT_IMAGES["GENERIC"][key] for key in ("master_active", "heroes_active", "equipment_active")] + [
+            BOT_IMAGES["NO_PANELS"][key] for key in ("settings", "icon_boss", "tournament")
+        ]
+
+    def test_search(self):
+        """Test that every image searched for on the pool matches the same as an in process search."""
+        expected = imagesearchbatch(images=self.images, im=self.frame, precision=0.8, first=False)
+        self.assertTrue(expected)
+        self.assertEqual(imagesearchbatch(images=self.images, im=self.frame, precision=0.8, first=False, pool=self.pool), expected)
+
+    def test_search_regions(self):
+        """Test that regions are cropped by the workers, positions are relative to each region."""
+        regions = [(0, 600, 480, 800)] * len(self.images)
+        expected = imagesearchbatch(images=self.images, im=self.frame, regions=regions, precision=0.8, first=False)
+        self.assertEqual(imagesearchbatch(images=self.images, im=self.frame, regions=regions, precision=0.8, first=False, pool=self.pool), expected)
+
+    def test_search_order(self):
+        """Test that the matches returned by the pool retain the order of the searches."""
+        searches = [(image, None) for image in self.images * 2]
+        matches = self.pool.search(gray=self.frame.gray, searches=searches)
+
+        self.assertEqual(len(matches), len(searches))
+        self.assertEqual([m[:2] for m in matches[:len(self.images)]], [m[:2] for m in matches[len(self.images):]])
+
+    def test_search_first(self):
+        """Test that searches specifying a precision stop after the first wave an image is found in."""
+        searches = [(image, None) for image in self.images * 2]
+        expected = self.pool.search(gray=self.frame.gray, searches=searches)
+        found = [m.score >= 0.8 for m in expected].index(True)
+
+        matches = self.pool.search(gray=self.frame.gray, searches=searches, precision=0.8)
+        self.assertEqual(len(matches), (found // self.pool.workers + 1) * self.pool.workers)
+        self.assertLess(len(matches), len(searches))
+        self.assertEqual([m[:2] for m in matches], [m[:2] for m in expected[:len(matches)]])
+
+    def test_preprocess(self):
+        """Test that preprocessing a batch on the pool is identical to preprocessing in process."""
+        images = [
+            (self.frame.crop(box=region).gray, kwargs)
+            for region in ((200, 60, 280, 90), (10, 40, 90, 65), (0, 600, 480, 800))
+            for kwargs in ({"scale": 5}, {"scale": 5, "threshold": 150, "invert": True})
+        ]
+        processed = self.pool.preprocess(images=images)
+
+        self.assertEqual(len(processed), len(images))
+        for (gray, kwargs), image in zip(images, processed):
+            self.assertTrue(np.array_equal(image, preprocess(gray=gray, **kwargs)))
+
+    def test_preprocess_small(self):
+        """Test that batches smaller than the minimum pixels are left to be preprocessed in process."""
+        gray = self.frame.crop(box=(200, 60, 280, 90)).gray
+
+        self.assertIsNone(self.pool.preprocess(images=[(gray, {"scale": 5})]))
+        self.assertIsNotNone(self.pool.preprocess(images=[(gray, {"scale": 5})], min_pixels=0))
@@ -22,6 +22,7 @@ from titandash.models.queue import Queue
 
 from titandash.bot.core.window import WindowHandler, Window
 from titandash.bot.core.decorators import BotProperty
+from titandash.bot.core.telemetry import SearchTelemetry
 
 from io import BytesIO
 
@@ -342,10 +343,13 @@ def save_globals(request):
     pihole_ads_settings = request.POST.get("pihole_ads_settings")
     welcome_screen_checks_settings = request.POST.get("welcome_screen_checks_settings")
     rate_screen_checks_settings = request.POST.get("rate_screen_checks_settings")
+    capture_thread_settings = request.POST.get("capture_thread_settings")
+    vision_pool_settings = request.POST.get("vision_pool_settings")
     logging_level = request.POST.get("logging_level")
 
     if not failsafe_settings or not event_settings or not pihole_ads_settings or not \
-            welcome_screen_checks_settings or not rate_screen_checks_settings or not logging_level:
+            welcome_screen_checks_settings or not rate_screen_checks_settings or not capture_thread_settings or not \
+            vision_pool_settings or not logging_level:
         return JsonResponse(data={
             "status": "error",
             "message": "Missing required values."
@@ -356,6 +360,8 @@ def save_globals(request):
     pihole_ads_settings = pihole_ads_settings.lower()
     welcome_screen_checks_settings = welcome_screen_checks_settings.lower()
     rate_screen_checks_settings = rate_screen_checks_settings.lower()
+    capture_thread_settings = capture_thread_settings.lower()
+    vision_pool_settings = vision_pool_settings.lower()
     logging_level = logging_level.upper()
 
     GlobalSettings.objects.grab(qs=True).update(**{
@@ -364,6 +370,8 @@ def save_globals(request):
         "pihole_ads_settings": pihole_ads_settings,
         "welcome_screen_checks_settings": welcome_screen_checks_settings,
         "rate_screen_checks_settings": rate_screen_checks_settings,
+        "capture_thread_settings": capture_thread_settings,
+        "vision_pool_settings": vision_pool_settings,
         "logging_level": logging_level
     })
     return JsonResponse(data={
@@ -408,6 +416,16 @@ def session(request, uuid):
     ctx = {"session": Session.objects.get(uuid=uuid).json()}
     ctx["SESSION_JSON"] = json.dumps(ctx)
 
+    # Include the search telemetry recorded during the session, if it's available.
+    telemetry = SearchTelemetry.load(path=os.path.join(settings.LOCAL_DATA_TELEMETRY_DIR, "{uuid}.json".format(uuid=uuid)))
+    ctx["telemetry"] = telemetry.report() if telemetry else None
+    if telemetry:
+        ctx["telemetry_tables"] = (
+            ("Slowest Templates", ctx["telemetry"]["slowest"]),
+            ("Near Misses", ctx["telemetry"]["near_misses"]),
+            ("Most Searched Templates", ctx["telemetry"]["busiest"]),
+        )
+
     return render(request, "sessions/session.html", context=ctx)
 
 
@@ -701,7 +719,7 @@ def screen(request):
     inst = BotInstance.objects.get(pk=request.GET.get("instance"))
     window = inst.window
 
-    grab = Window(hwnd=window["hwnd"]).screenshot().resize((360, 600), ANTIALIAS)
+    grab = Window(hwnd=window["hwnd"]).screenshot().image.resize((360, 600), ANTIALIAS)
     buffered = BytesIO()
     grab.save(buffered, format="JPEG", quality=30)
 